@@ -0,0 +1,327 @@
+"""
+Caching of published chart indexes in the content app.
+
+A publication never changes once it is created, so the index of a publication can be cached by
+publication pk without ever going stale. Entries only need to be dropped to make room, or because
+the distributions serving them switched to a different publication.
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+IDENTITY = "identity"
+GZIP = "gzip"
+
+
+class CachedIndex:
+    """
+    A published index, along with its ETag and its lazily built gzip variant.
+    """
+
+    __slots__ = ("data", "etag", "compressed")
+
+    def __init__(self, data, etag=None, compressed=None):
+        """
+        Wrap a published index.
+
+        Args:
+            data (bytes): The index as published
+            etag (str): The quoted ETag of the index, computed from data if not given
+            compressed (bytes): The gzip compressed index, if already known
+
+        """
+        self.data = data
+        self.etag = etag or '"{}"'.format(hashlib.sha256(data).hexdigest())
+        self.compressed = compressed
+
+    @property
+    def size(self):
+        """
+        The number of bytes held by the entry.
+        """
+        return len(self.data) + len(self.compressed or b"")
+
+    def compress(self):
+        """
+        Return the gzip variant of the index, compressing it on first use.
+        """
+        if self.compressed is None:
+            self.compressed = gzip.compress(self.data)
+        return self.compressed
+
+    def variant_etag(self, encoding):
+        """
+        Return the ETag of the given variant of the index.
+        """
+        if encoding == IDENTITY:
+            return self.etag
+        return '{}-{}"'.format(self.etag[:-1], encoding)
+
+
+class FilesystemCacheBackend:
+    """
+    A cache backend keeping indexes as files in a directory shared between processes.
+
+    Files are written to a temporary name and renamed into place, so readers never see a
+    partially written index. When the files exceed ``max_size`` bytes, the least recently used
+    ones are removed; reading a file marks it as used by touching it.
+    """
+
+    TEMP_PREFIX = "tmp"
+
+    def __init__(self, path, max_size=None):
+        """
+        Keep indexes in a directory.
+
+        Args:
+            path (str): The directory to keep the cached indexes in, created if missing
+            max_size (int): The number of bytes to keep in the directory at most, unbounded if
+                None
+
+        """
+        self.path = path
+        self.max_size = max_size
+        os.makedirs(path, exist_ok=True)
+
+    def _path(self, publication_pk, encoding):
+        return os.path.join(self.path, "{}.{}".format(publication_pk, encoding))
+
+    def get(self, publication_pk, encoding):
+        """
+        Return the cached index of a publication in the given encoding, None if not cached.
+        """
+        path = self._path(publication_pk, encoding)
+        try:
+            with open(path, "rb") as fp:
+                data = fp.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def set(self, publication_pk, encoding, data):
+        """
+        Cache the index of a publication in the given encoding.
+        """
+        if self.max_size is not None and len(data) > self.max_size:
+            return
+        fd, temp = tempfile.mkstemp(dir=self.path, prefix=self.TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(temp, self._path(publication_pk, encoding))
+        except OSError:
+            try:
+                os.unlink(temp)
+            except OSError:
+                pass
+            return
+        self.evict()
+
+    def delete(self, publication_pk):
+        """
+        Drop every cached encoding of the index of a publication.
+        """
+        for encoding in (IDENTITY, GZIP):
+            try:
+                os.unlink(self._path(publication_pk, encoding))
+            except OSError:
+                pass
+
+    def evict(self):
+        """
+        Remove the least recently used files until the directory is within ``max_size`` bytes.
+        """
+        if self.max_size is None:
+            return
+        files = []
+        size = 0
+        for entry in os.scandir(self.path):
+            if entry.name.startswith(self.TEMP_PREFIX):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            size += stat.st_size
+        for _, file_size, path in sorted(files):
+            if size <= self.max_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            size -= file_size
+
+
+class IndexCache:
+    """
+    A size bounded, least recently used cache of published indexes, keyed by publication pk.
+
+    Other indexes of a publication than its ``index.yaml`` are keyed by the publication pk with a
+    suffix, e.g. ``<pk>-latest`` for its ``index-latest.yaml``.
+
+    Entries are kept in memory and, if a backend is given, also in a backend shared with other
+    processes. The shared backend is consulted on a miss of the memory cache before the caller
+    falls back to reading the index from storage.
+
+    The content app serves requests from a single thread, so no locking is done.
+    """
+
+    def __init__(self, max_size, backend=None):
+        """
+        Create an empty cache.
+
+        Args:
+            max_size (int): The number of bytes to keep in memory at most, 0 disables the cache
+            backend (FilesystemCacheBackend): An optional shared backend
+
+        """
+        self.max_size = max_size
+        self.backend = backend
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._entries = OrderedDict()
+        self._publications = {}
+
+    @classmethod
+    def from_settings(cls):
+        """
+        Create a cache as configured by the ``CHART_INDEX_CACHE_*`` settings.
+        """
+        path = getattr(settings, "CHART_INDEX_CACHE_DIR", None)
+        backend = None
+        if path:
+            backend = FilesystemCacheBackend(
+                path, max_size=getattr(settings, "CHART_INDEX_CACHE_DIR_SIZE", None)
+            )
+        return cls(getattr(settings, "CHART_INDEX_CACHE_SIZE", 0), backend=backend)
+
+    @property
+    def enabled(self):
+        """
+        Whether indexes are cached at all.
+        """
+        return self.max_size > 0
+
+    def get(self, publication_pk):
+        """
+        Return the cached index of a publication, None if it is not cached.
+
+        Args:
+            publication_pk: The pk of the publication
+
+        Returns:
+            CachedIndex: The cached index or None
+
+        """
+        entry = self._entries.get(publication_pk)
+        if entry is None and self.backend:
+            data = self.backend.get(publication_pk, IDENTITY)
+            if data is not None:
+                entry = CachedIndex(data, compressed=self.backend.get(publication_pk, GZIP))
+                self._store(publication_pk, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+        # Entries of the backend too large for memory are served without being kept
+        if publication_pk in self._entries:
+            self._entries.move_to_end(publication_pk)
+        self.hits += 1
+        self.bytes_saved += len(entry.data)
+        return entry
+
+    def put(self, publication_pk, data):
+        """
+        Cache the index of a publication.
+
+        Args:
+            publication_pk: The pk of the publication
+            data (bytes): The index as published
+
+        Returns:
+            CachedIndex: The new entry
+
+        """
+        entry = CachedIndex(data)
+        self._store(publication_pk, entry)
+        if self.backend:
+            self.backend.set(publication_pk, IDENTITY, data)
+        return entry
+
+    def compressed(self, publication_pk, entry):
+        """
+        Return the gzip variant of a cached index, compressing and caching it on first use.
+        """
+        if entry.compressed is None:
+            entry.compress()
+            if publication_pk in self._entries:
+                self.size += len(entry.compressed)
+                self._evict()
+            if self.backend:
+                self.backend.set(publication_pk, GZIP, entry.compressed)
+        return entry.compressed
+
+    def track(self, distribution_pk, publication_pk):
+        """
+        Record the publication a distribution serves, invalidating the one it served before.
+
+        The previous publication is only dropped if no other distribution known to this cache
+        still serves it.
+        """
+        previous = self._publications.get(distribution_pk)
+        self._publications[distribution_pk] = publication_pk
+        if previous is not None and previous != publication_pk:
+            if previous not in self._publications.values():
+                self.invalidate(previous)
+
+    def invalidate(self, publication_pk):
+        """
+        Drop the cached index of a publication.
+        """
+        entry = self._entries.pop(publication_pk, None)
+        if entry is not None:
+            self.size -= entry.size
+        if self.backend:
+            self.backend.delete(publication_pk)
+
+    def stats(self):
+        """
+        Return the counters of the cache, for monitoring.
+        """
+        lookups = self.hits + self.misses
+        return OrderedDict(
+            [
+                ("entries", len(self._entries)),
+                ("size", self.size),
+                ("max_size", self.max_size),
+                ("hits", self.hits),
+                ("misses", self.misses),
+                ("hit_ratio", self.hits / lookups if lookups else None),
+                ("bytes_saved", self.bytes_saved),
+            ]
+        )
+
+    def _store(self, publication_pk, entry):
+        if entry.size > self.max_size:
+            return
+        previous = self._entries.pop(publication_pk, None)
+        if previous is not None:
+            self.size -= previous.size
+        self._entries[publication_pk] = entry
+        self.size += entry.size
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_size and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
@@ -0,0 +1,354 @@
+"""
+Routes and handlers of the chart plugin in Pulp's content app.
+
+pulpcore imports this module when the content app starts, before it adds its own catch-all
+route, so the routes added here take precedence for the paths they match.
+"""
+import asyncio
+
+from aiohttp import web
+from aiohttp.web_exceptions import HTTPBadRequest, HTTPGone, HTTPNotFound
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+
+from pulpcore.content import app
+from pulpcore.content.handler import Handler
+
+from pulp_chart.app import metrics
+from pulp_chart.app.cache import GZIP, IDENTITY, IndexCache
+from pulp_chart.app.models import ChartContent, ChartDistribution, ChartPublication
+from pulp_chart.app.pull_through import PullThroughCache
+from pulp_chart.app.tasks.publishing import LATEST_INDEX_PATH, index_entry
+
+
+INDEX_PATH = "index.yaml"
+CHANGES_PATH = "changes"
+
+index_cache = IndexCache.from_settings()
+pull_through = PullThroughCache()
+
+
+class ChartHandler(Handler):
+    """
+    A Handler serving the chart index of ChartDistributions with conditional GET support.
+
+    The ETag of an index is the sha256 of its published artifact, so it is known without reading
+    the index from storage and clients polling an unchanged index get a bodiless 304.
+
+    Published indexes are kept in the :class:`~pulp_chart.app.cache.IndexCache` of the process,
+    so repeated requests are answered without reading the index from storage.
+
+    Distributions with a remote and no publication serve the index and charts of the remote, see
+    :mod:`pulp_chart.app.pull_through`.
+
+    Distributions with ``latest_only`` set serve the index of the latest chart versions of their
+    publication as their index.
+
+    Requests for other distributions are passed on to the default Handler behaviour.
+    """
+
+    @staticmethod
+    def accepts_gzip(request):
+        """
+        Check whether the client accepts a gzip encoded response.
+        """
+        for item in request.headers.get("Accept-Encoding", "").split(","):
+            coding, _, params = item.strip().partition(";")
+            if coding.strip().lower() in ("gzip", "*"):
+                return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+        return False
+
+    @staticmethod
+    def etag_matches(request, etag):
+        """
+        Check whether the If-None-Match header of a request matches an ETag.
+        """
+        header = request.headers.get("If-None-Match")
+        if not header:
+            return False
+        candidates = [candidate.strip() for candidate in header.split(",")]
+        return "*" in candidates or etag in candidates or "W/" + etag in candidates
+
+    async def serve_index(self, request):
+        """
+        The request handler for chart indexes.
+
+        Args:
+            request (:class:`aiohttp.web.request`): The request from the client.
+
+        Returns:
+            :class:`aiohttp.web.StreamResponse` or :class:`aiohttp.web.FileResponse`: The response
+                back to the client.
+        """
+        path = request.match_info["path"]
+        distribution = self._match_chart_distribution(path)
+        if self.is_pull_through(distribution):
+            self._permit(request, distribution)
+            rel_path = self._relative_path(distribution, path)
+            if rel_path != INDEX_PATH:
+                return await self.stream_content(request)
+            index = await pull_through.index(distribution.remote.cast())
+            return self._counted(self._cached_index_response(request, rel_path, index.cached))
+
+        if distribution is None or not distribution.publication_id:
+            return await self.stream_content(request)
+        self._permit(request, distribution)
+
+        rel_path = self._relative_path(distribution, path)
+        if rel_path != INDEX_PATH:
+            return await self.stream_content(request)
+
+        index_path, cache_key = INDEX_PATH, distribution.publication_id
+        if distribution.latest_only:
+            index_path = LATEST_INDEX_PATH
+            cache_key = "{}-latest".format(distribution.publication_id)
+
+        if index_cache.enabled:
+            index_cache.track(distribution.pk, cache_key)
+            entry = index_cache.get(cache_key)
+            metrics.INDEX_CACHE_LOOKUPS.inc(result="miss" if entry is None else "hit")
+            if entry is not None:
+                return self._counted(
+                    self._cached_index_response(request, rel_path, entry, cache_key)
+                )
+
+        # Publications created before latest indexes were published only have the full index,
+        # which stream_content serves
+        artifact = self._index_artifact(distribution, index_path)
+        if not artifact:
+            return await self.stream_content(request)
+
+        if index_cache.enabled:
+            # Reading from remote storage can take a while, and would block every other request
+            loop = asyncio.get_event_loop()
+            data = await loop.run_in_executor(None, self._read_artifact, artifact)
+            entry = index_cache.put(cache_key, data)
+            return self._counted(self._cached_index_response(request, rel_path, entry, cache_key))
+
+        etag = '"{}"'.format(artifact.sha256)
+        if self.etag_matches(request, etag):
+            return self._counted(web.Response(status=304, headers={"ETag": etag}))
+
+        headers = self.response_headers(rel_path)
+        headers["ETag"] = etag
+        return self._counted(self._handle_file_response(artifact.file, headers))
+
+    async def serve_chart(self, request):
+        """
+        The request handler for charts of pull-through distributions.
+
+        The chart is downloaded from the remote of the distribution on its first request, see
+        :mod:`pulp_chart.app.pull_through`. Requests for other distributions are passed on to
+        the default Handler behaviour.
+
+        Args:
+            request (:class:`aiohttp.web.request`): The request from the client.
+
+        Returns:
+            :class:`aiohttp.web.StreamResponse` or :class:`aiohttp.web.FileResponse`: The response
+                back to the client.
+        """
+        path = request.match_info["path"]
+        distribution = self._match_chart_distribution(path)
+        if not self.is_pull_through(distribution):
+            return await self.stream_content(request)
+        self._permit(request, distribution)
+
+        rel_path = self._relative_path(distribution, path)
+        artifact = await pull_through.chart(distribution.remote.cast(), rel_path)
+        if artifact is None:
+            raise HTTPNotFound()
+        return self._handle_file_response(artifact.file, self.response_headers(rel_path))
+
+    async def serve_changes(self, request):
+        """
+        The request handler for the changes of a chart index since a publication generation.
+
+        The response lists the entries added to the index, in the same format as the index, and
+        the charts removed from it since the publication of the given ``since`` generation.
+
+        Args:
+            request (:class:`aiohttp.web.request`): The request from the client.
+
+        Raises:
+            :class:`aiohttp.web_exceptions.HTTPBadRequest`: When ``since`` is not a generation.
+            :class:`aiohttp.web_exceptions.HTTPGone`: When the publication of the generation is
+                not known (anymore), clients should then fetch the full index.
+
+        Returns:
+            :class:`aiohttp.web.Response`: The changes as JSON.
+        """
+        path = request.match_info["path"]
+        distribution = self._match_chart_distribution(path)
+        if distribution is None or not distribution.publication_id:
+            return await self.stream_content(request)
+        self._permit(request, distribution)
+
+        rel_path = self._relative_path(distribution, path)
+        if rel_path != CHANGES_PATH:
+            return await self.stream_content(request)
+
+        try:
+            since = int(request.query["since"])
+        except (KeyError, ValueError):
+            raise HTTPBadRequest(reason="'since' must be a publication generation")
+
+        current = ChartPublication.objects.select_related("repository_version").get(
+            pk=distribution.publication_id
+        )
+        previous = (
+            ChartPublication.objects.select_related("repository_version")
+            .filter(
+                repository_version__repository=current.repository_version.repository_id,
+                generation=since,
+                complete=True,
+            )
+            .first()
+        )
+        if previous is None or since > current.generation:
+            raise HTTPGone(reason="Unknown generation {}".format(since))
+
+        added, removed = self._changes(previous.repository_version, current.repository_version)
+        return web.json_response(
+            {
+                "apiVersion": "v1",
+                "generation": current.generation,
+                "since": since,
+                "added": added,
+                "removed": removed,
+            }
+        )
+
+    @staticmethod
+    def _changes(previous, current):
+        """
+        Diff the charts of two repository versions.
+
+        Returns:
+            tuple: The index entries of the added charts by name, and the name, version and digest
+                of the removed charts.
+        """
+        added = {}
+        contents = (
+            ChartContent.objects.filter(pk__in=current.content)
+            .exclude(pk__in=previous.content)
+            .order_by("name", "-version_sort")
+            .prefetch_related("contentartifact_set")
+        )
+        for content in contents:
+            urls = [artifact.relative_path for artifact in content.contentartifact_set.all()]
+            added.setdefault(content.name, []).append(index_entry(content, urls))
+
+        removed = list(
+            ChartContent.objects.filter(pk__in=previous.content)
+            .exclude(pk__in=current.content)
+            .order_by("name", "-version_sort")
+            .values("name", "version", "digest")
+        )
+        return added, removed
+
+    @classmethod
+    def _match_chart_distribution(cls, path):
+        """
+        Match a ChartDistribution by the base paths of a path, None if it is not served by one.
+
+        The routes of this module also match paths of other plugins' distributions, so only the
+        ChartDistribution table is queried, with no cast, before such requests are passed on.
+        """
+        return ChartDistribution.objects.filter(base_path__in=cls._base_paths(path)).first()
+
+    @staticmethod
+    def is_pull_through(distribution):
+        """
+        Check whether a distribution serves the charts of its remote.
+
+        See :mod:`pulp_chart.app.pull_through`.
+        """
+        return (
+            distribution is not None
+            and not distribution.publication_id
+            and distribution.remote_id is not None
+        )
+
+    @staticmethod
+    def _counted(response):
+        """
+        Count an index response in the metrics of the process.
+        """
+        metrics.INDEX_REQUESTS.inc(status=response.status)
+        metrics.registry.maybe_flush()
+        return response
+
+    @staticmethod
+    def _relative_path(distribution, path):
+        return path.lstrip("/")[len(distribution.base_path):].lstrip("/")
+
+    @staticmethod
+    def _index_artifact(distribution, rel_path):
+        try:
+            published = distribution.publication.published_artifact.select_related(
+                "content_artifact__artifact"
+            ).get(relative_path=rel_path)
+        except ObjectDoesNotExist:
+            return None
+        return published.content_artifact.artifact
+
+    @staticmethod
+    def _read_artifact(artifact):
+        artifact.file.open("rb")
+        try:
+            return artifact.file.read()
+        finally:
+            artifact.file.close()
+
+    def _cached_index_response(self, request, rel_path, entry, cache_key=None):
+        encoding = GZIP if self.accepts_gzip(request) else IDENTITY
+        etag = entry.variant_etag(encoding)
+        headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+        if self.etag_matches(request, etag):
+            return web.Response(status=304, headers=headers)
+
+        headers.update(self.response_headers(rel_path))
+        if encoding == GZIP:
+            headers["Content-Encoding"] = GZIP
+            if cache_key is None:
+                body = entry.compress()
+            else:
+                body = index_cache.compressed(cache_key, entry)
+        else:
+            body = entry.data
+        return web.Response(body=body, headers=headers)
+
+
+async def cache_stats(request):
+    """
+    Report the counters of the index cache of this content app process as JSON.
+    """
+    return web.json_response(index_cache.stats())
+
+
+async def metrics_exposition(request):
+    """
+    Serve the metrics of the chart plugin in the Prometheus text exposition format.
+    """
+    return web.Response(
+        text=metrics.registry.render(), content_type="text/plain", charset="utf-8",
+        headers={"X-Content-Type-Options": "nosniff"},
+    )
+
+
+app.add_routes(
+    [
+        web.get(
+            settings.CONTENT_PATH_PREFIX + r"{path:.+/" + INDEX_PATH.replace(".", r"\.") + "}",
+            ChartHandler().serve_index,
+        ),
+        web.get(settings.CONTENT_PATH_PREFIX + r"{path:.+\.tgz}", ChartHandler().serve_chart),
+        web.get(
+            settings.CONTENT_PATH_PREFIX + r"{path:.+/" + CHANGES_PATH + "}",
+            ChartHandler().serve_changes,
+        ),
+        web.get(settings.CHART_CONTENT_STATUS_PREFIX + "cache/", cache_stats),
+        web.get(settings.CHART_CONTENT_STATUS_PREFIX + "metrics", metrics_exposition),
+    ]
+)
@@ -0,0 +1,267 @@
+import asyncio
+import os
+import ssl
+from tempfile import NamedTemporaryFile
+from urllib.parse import urlparse
+
+import aiohttp
+import backoff
+
+from pulpcore.plugin.download import DownloaderFactory, HttpDownloader
+from pulpcore.plugin.exceptions import DigestValidationError, SizeValidationError
+
+from pulp_chart.app.metrics import DOWNLOADED_BYTES
+
+
+THROTTLED = (429, 503)
+"""The response codes telling a client to slow down."""
+
+
+def http_giveup(exc):
+    """
+    Give up on retrying a download unless it failed with 429, 502, 503 or 504.
+    """
+    return exc.code not in [429, 502, 503, 504]
+
+
+class AdaptiveLimiter:
+    """
+    An additive increase, multiplicative decrease (AIMD) limit of concurrent requests to a host.
+
+    Every throttled response halves the limit, and every successful one raises it by ``1/limit``,
+    i.e. by one per round of ``limit`` successful requests, up to ``maximum``. The limit settles
+    around the highest concurrency the host sustains without throttling.
+    """
+
+    def __init__(self, maximum, minimum=1):
+        """
+        Create a limiter allowing the maximum number of requests.
+
+        Args:
+            maximum (int): The highest number of concurrent requests allowed
+            minimum (int): The lowest number of concurrent requests the limit backs off to
+
+        """
+        self.maximum = maximum
+        self.minimum = minimum
+        self.limit = float(maximum)
+        self.active = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        """
+        Wait until a request is allowed, and count it as active.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """
+        Count the request as done, and wake up the waiting ones.
+        """
+        async with self._condition:
+            self.active -= 1
+            self._condition.notify_all()
+
+    def succeeded(self):
+        """
+        Record a successful request, raising the limit.
+        """
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def throttled(self):
+        """
+        Record a throttled request, halving the limit.
+        """
+        self.limit = max(self.minimum, self.limit / 2)
+
+
+class ChartDownloader(HttpDownloader):
+    """
+    An HttpDownloader which cleans up after a chart that turned out to be invalid.
+
+    Digests are computed while the response is streamed to a temporary file, as with every
+    downloader. Whenever validation fails the temporary file is removed, so a bad mirror never
+    leaves a file behind. The download can't be aborted any earlier: Helm indexes carry the digest
+    of a chart, but not its size.
+
+    If given a ``limiter``, every request (including retries) waits for a slot of it, and
+    reports throttled and successful responses to it.
+    """
+
+    def __init__(self, url, limiter=None, **kwargs):
+        """
+        Create a downloader for a url.
+
+        Args:
+            url (str): The url to download.
+            limiter (AdaptiveLimiter): The concurrency limit of the host of url
+            kwargs (dict): This accepts the parameters of
+                :class:`~pulpcore.plugin.download.HttpDownloader`.
+        """
+        self.limiter = limiter
+        super().__init__(url, **kwargs)
+
+    @backoff.on_exception(backoff.expo, aiohttp.ClientResponseError,
+                          max_tries=10, giveup=http_giveup)
+    async def _run(self, extra_data=None):
+        """
+        Download, validate, and compute digests on the `url`. This is a coroutine.
+
+        Like :meth:`~pulpcore.plugin.download.HttpDownloader._run` this retries HTTP 429 and some
+        5XX errors with exponential backoff, taking a slot of the limiter for each attempt.
+
+        Args:
+            extra_data (dict): Extra data passed by the downloader.
+        """
+        if self.limiter is None:
+            to_return = await self._request()
+        else:
+            async with self.limiter:
+                try:
+                    to_return = await self._request()
+                except aiohttp.ClientResponseError as e:
+                    if e.status in THROTTLED:
+                        self.limiter.throttled()
+                    raise
+                self.limiter.succeeded()
+        if self._close_session_on_finalize:
+            await self.session.close()
+        return to_return
+
+    async def _request(self):
+        async with self.session.get(self.url, proxy=self.proxy) as response:
+            response.raise_for_status()
+            to_return = await self._handle_response(response)
+            await response.release()
+        return to_return
+
+    async def _handle_response(self, response):
+        """
+        Handle the aiohttp response by writing it to disk and calculating digests.
+
+        Args:
+            response (aiohttp.ClientResponse): The response to handle.
+
+        Raises:
+            :class:`~pulpcore.plugin.exceptions.DigestValidationError`: When any of the
+                ``expected_digest`` values don't match the digest of the data.
+            :class:`~pulpcore.plugin.exceptions.SizeValidationError`: When the size of the
+                response doesn't match ``expected_size``.
+
+        Returns:
+             DownloadResult: Contains information about the result. See the DownloadResult docs for
+                 more information.
+        """
+        try:
+            result = await super()._handle_response(response)
+        except (DigestValidationError, SizeValidationError):
+            self._discard()
+            raise
+        DOWNLOADED_BYTES.inc(self._size, host=urlparse(self.url).netloc.lower())
+        return result
+
+    def _discard(self):
+        """
+        Close and remove the temporary file.
+        """
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+
+class ChartDownloaderFactory(DownloaderFactory):
+    """
+    A DownloaderFactory reusing connections and limiting the concurrency per host.
+
+    Unlike the default factory, connections are kept alive between requests, so downloading many
+    small charts from one host doesn't pay for a new connection (and TLS handshake) per chart.
+    HTTP(S) downloads take a slot of an :class:`AdaptiveLimiter` of their host, starting at the
+    ``download_concurrency_per_host`` of the remote (or its ``download_concurrency``).
+
+    The overall ``download_concurrency`` of the remote still applies on top.
+    """
+
+    KEEPALIVE_TIMEOUT = 30
+
+    def __init__(self, remote, downloader_overrides=None):
+        """
+        Create a factory with no per-host limiters yet.
+        """
+        self._limiters = {}
+        super().__init__(remote, downloader_overrides=downloader_overrides)
+
+    def _make_aiohttp_session_from_remote(self):
+        """
+        Build a :class:`aiohttp.ClientSession` from the remote's settings and timing settings.
+
+        Returns:
+            :class:`aiohttp.ClientSession`
+        """
+        tcp_conn_opts = {
+            # The semaphore of the factory caps the number of connections in use
+            'limit': 0,
+            'limit_per_host': self._remote.download_concurrency_per_host or 0,
+            'keepalive_timeout': self.KEEPALIVE_TIMEOUT,
+        }
+
+        sslcontext = None
+        if self._remote.ca_cert:
+            sslcontext = ssl.create_default_context(cadata=self._remote.ca_cert)
+        if self._remote.client_key and self._remote.client_cert:
+            if not sslcontext:
+                sslcontext = ssl.create_default_context()
+            with NamedTemporaryFile() as key_file:
+                key_file.write(bytes(self._remote.client_key, 'utf-8'))
+                key_file.flush()
+                with NamedTemporaryFile() as cert_file:
+                    cert_file.write(bytes(self._remote.client_cert, 'utf-8'))
+                    cert_file.flush()
+                    sslcontext.load_cert_chain(cert_file.name, key_file.name)
+        if not self._remote.tls_validation:
+            if not sslcontext:
+                sslcontext = ssl.create_default_context()
+            sslcontext.check_hostname = False
+            sslcontext.verify_mode = ssl.CERT_NONE
+        if sslcontext:
+            tcp_conn_opts['ssl_context'] = sslcontext
+
+        conn = aiohttp.TCPConnector(**tcp_conn_opts)
+
+        auth_options = {}
+        if self._remote.username and self._remote.password:
+            auth_options['auth'] = aiohttp.BasicAuth(
+                login=self._remote.username,
+                password=self._remote.password
+            )
+
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=600, sock_read=600)
+        return aiohttp.ClientSession(connector=conn, timeout=timeout, **auth_options)
+
+    def limiter(self, url):
+        """
+        Return the AdaptiveLimiter of the host of a URL.
+        """
+        host = urlparse(url).netloc.lower()
+        if host not in self._limiters:
+            maximum = (
+                self._remote.download_concurrency_per_host or self._remote.download_concurrency
+            )
+            self._limiters[host] = AdaptiveLimiter(maximum)
+        return self._limiters[host]
+
+    def _http_or_https(self, download_class, url, **kwargs):
+        """
+        Build a downloader for http:// or https:// URLs, limited by the limiter of their host.
+        """
+        if issubclass(download_class, ChartDownloader):
+            kwargs['limiter'] = self.limiter(url)
+        return super()._http_or_https(download_class, url, **kwargs)
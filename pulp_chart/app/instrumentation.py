@@ -0,0 +1,159 @@
+"""
+Timing and memory instrumentation of the phases of chart tasks.
+
+Every phase wrapped in a :func:`span` is recorded when it ends, as a ``timing.<name>``
+ProgressReport of the running task (with the milliseconds taken as ``done``), and, if the
+``CHART_TASK_TIMING_LOG`` setting is enabled, as a JSON line logged to ``pulp_chart.timing``.
+
+Memory is sampled from the peak resident set size of the process, which only ever grows, so a
+span reports both the peak at its end and how much it grew the peak by.
+
+Spans of pipeline stages measure wall time, which includes the time other stages run while the
+stage awaits them.
+"""
+import json
+import logging
+import os
+import resource
+import time
+from contextlib import contextmanager
+from gettext import gettext as _
+
+from django.conf import settings
+
+from pulpcore.plugin.models import ProgressReport, Task
+
+
+log = logging.getLogger("pulp_chart.timing")
+
+CODE_PREFIX = "timing."
+
+
+def current_rss_kb():
+    """
+    Return the current resident set size of the process in kB, None if it can't be read.
+    """
+    try:
+        with open("/proc/self/statm") as fp:
+            pages = int(fp.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def peak_rss_kb():
+    """
+    Return the peak resident set size of the process in kB.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Span:
+    """
+    The timing and memory use of one phase of a task.
+
+    Set ``items`` to the number of items handled by the phase to get its throughput.
+    """
+
+    def __init__(self, name):
+        """
+        Create a span which has not run yet.
+
+        Args:
+            name (str): The name of the phase, e.g. ``sync.parse_index``
+
+        """
+        self.name = name
+        self.items = None
+        self.failed = False
+        self.wall_time = None
+        self.rss_kb = None
+        self.peak_rss_kb = None
+        self.peak_rss_growth_kb = None
+
+    @property
+    def throughput(self):
+        """
+        The number of items handled per second, None if unknown.
+        """
+        if self.items is None or not self.wall_time:
+            return None
+        return self.items / self.wall_time
+
+    def as_dict(self):
+        """
+        Return the span as a JSON serializable dict.
+        """
+        return {
+            "span": self.name,
+            "failed": self.failed,
+            "wall_time": self.wall_time,
+            "items": self.items,
+            "throughput": self.throughput,
+            "rss_kb": self.rss_kb,
+            "peak_rss_kb": self.peak_rss_kb,
+            "peak_rss_growth_kb": self.peak_rss_growth_kb,
+        }
+
+    def message(self):
+        """
+        Return a human readable summary of the span.
+        """
+        message = _("{name}: {seconds:.3f}s, peak RSS {peak} kB (+{growth} kB)").format(
+            name=self.name,
+            seconds=self.wall_time,
+            peak=self.peak_rss_kb,
+            growth=self.peak_rss_growth_kb,
+        )
+        if self.items is not None:
+            message += _(", {items} items").format(items=self.items)
+        return message
+
+
+@contextmanager
+def span(name):
+    """
+    Measure the code of the context as a phase of the running task.
+
+    Args:
+        name (str): The name of the phase, e.g. ``sync.parse_index``
+
+    Yields:
+        Span: The span, to set the number of items handled on
+    """
+    current = Span(name)
+    peak_before = peak_rss_kb()
+    start = time.perf_counter()
+    current.failed = True
+    try:
+        yield current
+        current.failed = False
+    finally:
+        current.wall_time = time.perf_counter() - start
+        current.rss_kb = current_rss_kb()
+        current.peak_rss_kb = peak_rss_kb()
+        current.peak_rss_growth_kb = current.peak_rss_kb - peak_before
+        record(current)
+
+
+def record(current):
+    """
+    Attach a finished span to the running task, and log it if enabled.
+
+    Spans finished outside of a task are only logged.
+    """
+    task = Task.current()
+    if task is not None:
+        ProgressReport(
+            message=current.message(),
+            code=(CODE_PREFIX + current.name)[:36],
+            state="failed" if current.failed else "completed",
+            done=int(current.wall_time * 1000),
+            suffix="ms",
+            task=task,
+        ).save()
+
+    if getattr(settings, "CHART_TASK_TIMING_LOG", False):
+        data = current.as_dict()
+        data["task"] = str(task.pk) if task is not None else None
+        log.info(json.dumps(data, sort_keys=True))
@@ -0,0 +1,379 @@
+"""
+Prometheus style metrics of the chart plugin.
+
+Metrics are counted in a registry per process. Tasks run in worker processes and the content app
+in processes of its own, so to serve all of them from the metrics endpoint of the content app,
+every process adds what it counted to a snapshot file in the ``CHART_METRICS_DIR`` directory, under
+a file lock, and starts counting from zero again. Tasks do so when they finish, content app
+processes at most every ``CHART_METRICS_FLUSH_INTERVAL`` seconds. The endpoint serves the snapshot
+together with what its own process has not added yet.
+
+Without ``CHART_METRICS_DIR``, the endpoint only serves what the content app process answering
+the request counted itself.
+"""
+import bisect
+import fcntl
+import json
+import math
+import os
+import tempfile
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, 1800, 3600)
+"""The upper bounds of the buckets of histograms of durations, in seconds."""
+
+SNAPSHOT = "metrics.json"
+LOCK = "metrics.lock"
+
+
+def format_value(value):
+    """
+    Format a sample value for the text exposition format.
+    """
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def format_labels(labels):
+    """
+    Format label names and values for the text exposition format.
+    """
+    labels = list(labels)
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        '{}="{}"'.format(
+            name, value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+        )
+        for name, value in labels
+    ) + "}"
+
+
+class Metric:
+    """
+    A metric, with a value per combination of label values.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Create a metric with no values.
+
+        Args:
+            name (str): The name of the metric
+            documentation (str): What the metric measures
+            labelnames (tuple): The names of the labels of the metric
+
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                "{} takes the labels {}, not {}".format(
+                    self.name, sorted(self.labelnames), sorted(labels)
+                )
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def combine(self, old, new):
+        """
+        Combine the value in a snapshot with the value counted since.
+        """
+        raise NotImplementedError()
+
+    def expose(self, key, value):
+        """
+        Return the lines of the text exposition format for the value of some label values.
+        """
+        labels = format_labels(zip(self.labelnames, key))
+        return ["{}{} {}".format(self.name, labels, format_value(value))]
+
+
+class Counter(Metric):
+    """
+    A metric which only ever goes up.
+    """
+
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        Add amount to the counter of the given label values.
+        """
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def combine(self, old, new):
+        """
+        Add the count since the snapshot to the count in it.
+        """
+        return old + new
+
+
+class Gauge(Metric):
+    """
+    A metric which is set to its current value.
+    """
+
+    type = "gauge"
+
+    def set(self, value, **labels):
+        """
+        Set the gauge of the given label values.
+        """
+        self.values[self._key(labels)] = value
+
+    def combine(self, old, new):
+        """
+        Replace the value in the snapshot with the current one.
+        """
+        return new
+
+
+class Histogram(Metric):
+    """
+    A metric counting observations in buckets, along with their sum and count.
+
+    Values are kept as the non-cumulative count of every bucket, followed by the sum and the count
+    of all observations.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Create a histogram with no observations.
+
+        Args:
+            name (str): The name of the metric
+            documentation (str): What the metric measures
+            labelnames (tuple): The names of the labels of the metric
+            buckets (tuple): The sorted upper bounds of the buckets, without ``+Inf``
+
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        """
+        Count an observation with the given label values.
+        """
+        key = self._key(labels)
+        counts = self.values.get(key)
+        if counts is None:
+            counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0, 0]
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def combine(self, old, new):
+        """
+        Add the bucket counts, sum and count since the snapshot to those in it.
+        """
+        if len(old) != len(new):
+            # The buckets changed, the snapshot can't be added to
+            return new
+        return [a + b for a, b in zip(old, new)]
+
+    def expose(self, key, value):
+        """
+        Return the cumulative bucket, sum and count lines for the value of some label values.
+        """
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), value):
+            cumulative += count
+            labels = format_labels(list(zip(self.labelnames, key)) + [("le", format_value(bound))])
+            lines.append("{}_bucket{} {}".format(self.name, labels, cumulative))
+        labels = format_labels(zip(self.labelnames, key))
+        lines.append("{}_sum{} {}".format(self.name, labels, format_value(value[-2])))
+        lines.append("{}_count{} {}".format(self.name, labels, format_value(value[-1])))
+        return lines
+
+
+class Registry:
+    """
+    The metrics of a process, and the snapshot they are flushed to.
+    """
+
+    def __init__(self, path=None):
+        """
+        Create an empty registry.
+
+        Args:
+            path (str): The directory of the snapshot, the ``CHART_METRICS_DIR`` setting if None
+
+        """
+        self._path = path
+        self.metrics = OrderedDict()
+        self._flushed = time.monotonic()
+
+    @property
+    def path(self):
+        """
+        The directory of the snapshot, None if metrics are not shared between processes.
+        """
+        return self._path or getattr(settings, "CHART_METRICS_DIR", None)
+
+    def register(self, metric):
+        """
+        Add a metric to the registry.
+        """
+        if metric.name in self.metrics:
+            raise ValueError("Metric {} is already registered".format(metric.name))
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """
+        Register a :class:`Counter`.
+        """
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        """
+        Register a :class:`Gauge`.
+        """
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Register a :class:`Histogram`.
+        """
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def read(self):
+        """
+        Return the values of the snapshot, as lists of label values and value by metric name.
+        """
+        if not self.path:
+            return {}
+        try:
+            with open(os.path.join(self.path, SNAPSHOT)) as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def samples(self):
+        """
+        Return the values of the snapshot combined with the values counted since.
+
+        Returns:
+            dict: The values by label values, by metric name
+        """
+        samples = {}
+        for name, values in self.read().items():
+            samples[name] = {tuple(key): value for key, value in values}
+        for metric in self.metrics.values():
+            current = samples.setdefault(metric.name, {})
+            for key, value in metric.values.items():
+                current[key] = metric.combine(current[key], value) if key in current else value
+        return samples
+
+    def flush(self):
+        """
+        Add the values counted since the last flush to the snapshot, and reset them.
+        """
+        self._flushed = time.monotonic()
+        path = self.path
+        if not path:
+            return
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, LOCK), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            samples = self.samples()
+            fd, temp = tempfile.mkstemp(dir=path)
+            with os.fdopen(fd, "w") as fp:
+                json.dump(
+                    {
+                        name: [[list(key), value] for key, value in values.items()]
+                        for name, values in samples.items()
+                    },
+                    fp,
+                )
+            os.replace(temp, os.path.join(path, SNAPSHOT))
+        for metric in self.metrics.values():
+            metric.values = {}
+
+    def maybe_flush(self):
+        """
+        Flush if the last flush was longer than ``CHART_METRICS_FLUSH_INTERVAL`` seconds ago.
+        """
+        interval = getattr(settings, "CHART_METRICS_FLUSH_INTERVAL", 10)
+        if self.path and time.monotonic() - self._flushed > interval:
+            self.flush()
+
+    def render(self):
+        """
+        Return all metrics in the Prometheus text exposition format.
+        """
+        samples = self.samples()
+        lines = []
+        for metric in self.metrics.values():
+            documentation = metric.documentation.replace("\\", r"\\").replace("\n", r"\n")
+            lines.append("# HELP {} {}".format(metric.name, documentation))
+            lines.append("# TYPE {} {}".format(metric.name, metric.type))
+            for key, value in sorted(samples.get(metric.name, {}).items()):
+                lines.extend(metric.expose(key, value))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CHARTS_PARSED = registry.counter(
+    "pulp_chart_sync_charts_parsed_total",
+    "Index entries parsed by syncs.",
+)
+PARSE_SECONDS = registry.histogram(
+    "pulp_chart_sync_parse_seconds",
+    "Time taken to parse the index (or changes) of a remote.",
+)
+SYNC_SECONDS = registry.histogram(
+    "pulp_chart_sync_duration_seconds",
+    "Time taken by the sync pipeline to create a repository version.",
+    ["repository"],
+)
+DOWNLOADED_BYTES = registry.counter(
+    "pulp_chart_downloaded_bytes_total",
+    "Bytes downloaded from remotes, by remote host.",
+    ["host"],
+)
+PUBLISH_SECONDS = registry.histogram(
+    "pulp_chart_publish_duration_seconds",
+    "Time taken to create a publication.",
+    ["repository"],
+)
+INDEX_BYTES = registry.gauge(
+    "pulp_chart_index_bytes",
+    "Size of the index of the latest publication of a repository.",
+    ["repository"],
+)
+INDEX_CHARTS = registry.gauge(
+    "pulp_chart_index_charts",
+    "Number of charts in the index of the latest publication of a repository.",
+    ["repository"],
+)
+INDEX_REQUESTS = registry.counter(
+    "pulp_chart_index_requests_total",
+    "Index requests answered by the content app, by response status.",
+    ["status"],
+)
+INDEX_CACHE_LOOKUPS = registry.counter(
+    "pulp_chart_index_cache_lookups_total",
+    "Lookups of published indexes in the index cache of the content app.",
+    ["result"],
+)
@@ -0,0 +1,78 @@
+# Generated by Django 2.2.8 on 2019-12-09 12:00
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0013_repository_pulp_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartContent',
+            fields=[
+                ('content_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, related_name='chart_chartcontent', serialize=False, to='core.Content')),
+                ('name', models.TextField()),
+                ('version', models.TextField()),
+                ('digest', models.CharField(max_length=64)),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('app_version', models.TextField(null=True)),
+                ('description', models.TextField(null=True)),
+                ('icon', models.TextField(null=True)),
+                ('keywords', django.contrib.postgres.fields.ArrayField(base_field=models.TextField(), null=True, size=None)),
+            ],
+            options={
+                'default_related_name': '%(app_label)s_%(model_name)s',
+                'unique_together': {('name', 'version', 'digest')},
+            },
+            bases=('core.content',),
+        ),
+        migrations.CreateModel(
+            name='ChartPublication',
+            fields=[
+                ('publication_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, related_name='chart_chartpublication', serialize=False, to='core.Publication')),
+            ],
+            options={
+                'default_related_name': '%(app_label)s_%(model_name)s',
+            },
+            bases=('core.publication',),
+        ),
+        migrations.CreateModel(
+            name='ChartRemote',
+            fields=[
+                ('remote_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, related_name='chart_chartremote', serialize=False, to='core.Remote')),
+            ],
+            options={
+                'default_related_name': '%(app_label)s_%(model_name)s',
+            },
+            bases=('core.remote',),
+        ),
+        migrations.CreateModel(
+            name='ChartRepository',
+            fields=[
+                ('repository_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, related_name='chart_chartrepository', serialize=False, to='core.Repository')),
+            ],
+            options={
+                'default_related_name': '%(app_label)s_%(model_name)s',
+            },
+            bases=('core.repository',),
+        ),
+        migrations.CreateModel(
+            name='ChartDistribution',
+            fields=[
+                ('basedistribution_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, related_name='chart_chartdistribution', serialize=False, to='core.BaseDistribution')),
+                ('publication', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chart_chartdistribution', to='core.Publication')),
+            ],
+            options={
+                'default_related_name': '%(app_label)s_%(model_name)s',
+            },
+            bases=('core.basedistribution',),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 2.2.8 on 2019-12-16 09:21
+
+import re
+
+from django.db import migrations, models
+
+
+# A copy of pulp_chart.app.semver.sort_key as of this migration, so the keys it stores don't
+# change with the application code
+VERSION_RE = re.compile(
+    r"^v?(?P<major>\d+)(?:\.(?P<minor>\d+))?(?:\.(?P<patch>\d+))?"
+    r"(?:-(?P<prerelease>[0-9A-Za-z.-]+))?(?:\+(?P<build>[0-9A-Za-z.-]+))?$"
+)
+NUMBER_WIDTH = 12
+RELEASE_MARK = "z"
+
+
+def _number_key(number):
+    return str(min(number, 10 ** NUMBER_WIDTH - 1)).zfill(NUMBER_WIDTH)
+
+
+def _identifier_key(identifier):
+    if identifier.isdigit():
+        return "n" + _number_key(int(identifier))
+    return "s" + "".join(
+        chr(ord("b") + (byte >> 4)) + chr(ord("b") + (byte & 0xF))
+        for byte in identifier.encode("ascii", "replace")
+    ) + "a"
+
+
+def sort_key(version):
+    match = VERSION_RE.match(version.strip())
+    if match:
+        numbers = [int(match.group(part) or 0) for part in ("major", "minor", "patch")]
+        prerelease = match.group("prerelease")
+        prerelease = tuple(prerelease.split(".")) if prerelease else ()
+    else:
+        numbers, prerelease = [0, 0, 0], (version,)
+
+    key = "".join(_number_key(number) for number in numbers)
+    if not prerelease:
+        return key + RELEASE_MARK
+    return key + "m" + "".join(_identifier_key(i) for i in prerelease) + "e"
+
+
+def fill_version_sort(apps, schema_editor):
+    ChartContent = apps.get_model('chart', 'ChartContent')
+
+    batch = []
+    for content in ChartContent.objects.only('pk', 'version').iterator(chunk_size=1000):
+        content.version_sort = sort_key(content.version)
+        batch.append(content)
+        if len(batch) >= 1000:
+            ChartContent.objects.bulk_update(batch, ['version_sort'])
+            batch = []
+    if batch:
+        ChartContent.objects.bulk_update(batch, ['version_sort'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartcontent',
+            name='version_sort',
+            field=models.TextField(null=True),
+        ),
+        migrations.RunPython(fill_version_sort, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='chartcontent',
+            name='version_sort',
+            field=models.TextField(),
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['name', 'version_sort'], name='chart_name_version_sort_idx'),
+        ),
+    ]
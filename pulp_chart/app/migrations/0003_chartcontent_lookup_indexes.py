@@ -0,0 +1,36 @@
+# Generated by Django 2.2.8 on 2019-12-18 14:02
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0002_chartcontent_version_sort'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['name', 'version'], name='chart_name_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['keywords'], name='chart_keywords_idx'),
+        ),
+        # Django implements icontains as UPPER(column) LIKE UPPER(pattern), so the trigram
+        # indexes have to be built on the same expression to be usable.
+        migrations.RunSQL(
+            sql='CREATE INDEX chart_name_trgm_idx ON chart_chartcontent '
+                'USING gin (UPPER(name) gin_trgm_ops);',
+            reverse_sql='DROP INDEX chart_name_trgm_idx;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX chart_description_trgm_idx ON chart_chartcontent '
+                'USING gin (UPPER(description) gin_trgm_ops);',
+            reverse_sql='DROP INDEX chart_description_trgm_idx;',
+        ),
+    ]
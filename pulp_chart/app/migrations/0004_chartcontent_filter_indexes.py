@@ -0,0 +1,33 @@
+# Generated by Django 2.2.8 on 2019-12-19 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0003_chartcontent_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['name'], name='chart_name_prefix_idx', opclasses=['text_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['version'], name='chart_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['version_sort'], name='chart_version_sort_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['digest'], name='chart_digest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['app_version'], name='chart_app_version_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.8 on 2019-12-20 08:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0004_chartcontent_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='chartcontent',
+            name='chart_name_version_sort_idx',
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=models.Index(fields=['name', 'version_sort', 'content_ptr'], name='chart_name_version_sort_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 2.2.8 on 2019-12-23 10:41
+
+from django.db import migrations, models
+
+
+def fill_generation(apps, schema_editor):
+    ChartPublication = apps.get_model('chart', 'ChartPublication')
+    generations = {}
+    publications = ChartPublication.objects.select_related('repository_version').order_by(
+        'pulp_created'
+    )
+    for publication in publications.iterator():
+        repository = publication.repository_version.repository_id
+        generations[repository] = generations.get(repository, 0) + 1
+        publication.generation = generations[repository]
+        publication.save(update_fields=['generation'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0005_chartcontent_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartpublication',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_generation, migrations.RunPython.noop),
+    ]
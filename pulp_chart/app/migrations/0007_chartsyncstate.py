@@ -0,0 +1,33 @@
+# Generated by Django 2.2.8 on 2019-12-27 14:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_repository_pulp_type'),
+        ('chart', '0006_chartpublication_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartSyncState',
+            fields=[
+                ('pulp_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('pulp_created', models.DateTimeField(auto_now_add=True)),
+                ('pulp_last_updated', models.DateTimeField(auto_now=True, null=True)),
+                ('url', models.TextField()),
+                ('generation', models.PositiveIntegerField()),
+                ('version_number', models.PositiveIntegerField()),
+                ('remote', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chart_chartsyncstate', to='chart.ChartRemote')),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chart_chartsyncstate', to='core.Repository')),
+            ],
+            options={
+                'unique_together': {('repository', 'remote')},
+                'default_related_name': 'chart_chartsyncstate',
+            },
+        ),
+    ]
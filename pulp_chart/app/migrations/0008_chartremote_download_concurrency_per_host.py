@@ -0,0 +1,18 @@
+# Generated by Django 2.2.8 on 2020-01-03 11:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0007_chartsyncstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartremote',
+            name='download_concurrency_per_host',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
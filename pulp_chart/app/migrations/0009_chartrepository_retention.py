@@ -0,0 +1,23 @@
+# Generated by Django 2.2.8 on 2020-01-06 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0008_chartremote_download_concurrency_per_host'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartrepository',
+            name='retain_days',
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name='chartrepository',
+            name='retain_versions',
+            field=models.PositiveIntegerField(null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.8 on 2020-01-08 13:37
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0009_chartrepository_retention'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartcontent',
+            name='dependencies',
+            field=django.contrib.postgres.fields.jsonb.JSONField(default=list),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.8 on 2020-01-09 10:05
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0010_chartcontent_dependencies'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartremote',
+            name='includes',
+            field=django.contrib.postgres.fields.jsonb.JSONField(null=True),
+        ),
+    ]
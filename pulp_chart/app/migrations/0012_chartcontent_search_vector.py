@@ -0,0 +1,52 @@
+# Generated by Django 2.2.8 on 2020-01-10 09:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+VECTOR = (
+    "setweight(to_tsvector('simple', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(array_to_string({row}keywords, ' '), '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce({row}description, '')), 'C')"
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chart', '0011_chartremote_includes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chartcontent',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        # The sync pipeline creates charts with bulk_create, which bypasses save(), so the search
+        # vector is filled in by a trigger rather than by the model.
+        migrations.RunSQL(
+            sql='CREATE FUNCTION chart_chartcontent_search_vector() RETURNS trigger AS $$ '
+                'BEGIN NEW.search_vector := ' + VECTOR.format(row='NEW.') + '; RETURN NEW; END '
+                '$$ LANGUAGE plpgsql;',
+            reverse_sql='DROP FUNCTION chart_chartcontent_search_vector();',
+        ),
+        migrations.RunSQL(
+            sql='CREATE TRIGGER chart_chartcontent_search_vector_trigger '
+                'BEFORE INSERT OR UPDATE OF name, keywords, description ON chart_chartcontent '
+                'FOR EACH ROW EXECUTE PROCEDURE chart_chartcontent_search_vector();',
+            reverse_sql='DROP TRIGGER chart_chartcontent_search_vector_trigger '
+                        'ON chart_chartcontent;',
+        ),
+        migrations.RunSQL(
+            sql='UPDATE chart_chartcontent SET search_vector = ' + VECTOR.format(row='') + ';',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='chartcontent',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='chart_search_vector_idx'
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 2.2.8 on 2020-01-13 11:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def fill_latest_versions(apps, schema_editor):
+    # Only the latest version of every repository is filled in, older versions have their latest
+    # charts computed when listed
+    ChartContent = apps.get_model('chart', 'ChartContent')
+    ChartLatestVersion = apps.get_model('chart', 'ChartLatestVersion')
+    ChartRepository = apps.get_model('chart', 'ChartRepository')
+    RepositoryContent = apps.get_model('core', 'RepositoryContent')
+    RepositoryVersion = apps.get_model('core', 'RepositoryVersion')
+
+    versions = RepositoryVersion.objects.filter(
+        repository__in=ChartRepository.objects.values('pk'), complete=True
+    ).order_by('repository', '-number').distinct('repository')
+    released = models.Case(
+        models.When(version_sort__endswith='z', then=models.Value(True)),
+        default=models.Value(False),
+        output_field=models.BooleanField(),
+    )
+    for version in versions.iterator():
+        relationships = RepositoryContent.objects.filter(
+            repository=version.repository_id, version_added__number__lte=version.number
+        ).exclude(version_removed__number__lte=version.number)
+        latest = (
+            ChartContent.objects.filter(pk__in=relationships.values('content'))
+            .annotate(released=released)
+            .order_by('name', '-released', '-version_sort', '-created')
+            .distinct('name')
+            .values_list('pk', 'name')
+        )
+
+        batch = []
+        for pk, name in latest.iterator():
+            batch.append(
+                ChartLatestVersion(repository_version=version, name=name, content_id=pk)
+            )
+            if len(batch) >= 1000:
+                ChartLatestVersion.objects.bulk_create(batch)
+                batch = []
+        ChartLatestVersion.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_repository_pulp_type'),
+        ('chart', '0012_chartcontent_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartLatestVersion',
+            fields=[
+                ('pulp_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('pulp_created', models.DateTimeField(auto_now_add=True)),
+                ('pulp_last_updated', models.DateTimeField(auto_now=True, null=True)),
+                ('name', models.TextField()),
+                ('content', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chart_chartlatestversion', to='chart.ChartContent')),
+                ('repository_version', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chart_chartlatestversion', to='core.RepositoryVersion')),
+            ],
+            options={
+                'unique_together': {('repository_version', 'name')},
+                'default_related_name': 'chart_chartlatestversion',
+            },
+        ),
+        migrations.AddField(
+            model_name='chartdistribution',
+            name='latest_only',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(fill_latest_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.8 on 2020-01-14 15:08
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_repository_pulp_type'),
+        ('chart', '0013_chartlatestversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartPendingTask',
+            fields=[
+                ('pulp_id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('pulp_created', models.DateTimeField(auto_now_add=True)),
+                ('pulp_last_updated', models.DateTimeField(auto_now=True, null=True)),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chart_chartpendingtask', to='core.Task')),
+            ],
+            options={
+                'default_related_name': 'chart_chartpendingtask',
+            },
+        ),
+    ]
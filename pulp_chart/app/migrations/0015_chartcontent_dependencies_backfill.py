@@ -0,0 +1,77 @@
+# Generated by Django 2.2.8 on 2020-01-15 10:02
+
+import logging
+import tarfile
+
+import yaml
+from django.db import migrations
+
+log = logging.getLogger(__name__)
+
+
+def read_dependencies(fileobj):
+    # The metadata of a chart is at the top of its directory, not in its subcharts
+    with tarfile.open(fileobj=fileobj, mode='r:gz') as tarball:
+        members = {
+            m.name.split('/', 1)[1]: m for m in tarball.getmembers()
+            if m.isfile() and m.name.count('/') == 1
+        }
+        dependencies = None
+        for name in ('Chart.yaml', 'requirements.yaml'):
+            if not dependencies and name in members:
+                doc = yaml.safe_load(tarball.extractfile(members[name])) or {}
+                dependencies = doc.get('dependencies')
+    return [
+        {
+            'name': dependency['name'],
+            'version': str(dependency.get('version') or '*'),
+            'repository': dependency.get('repository'),
+        }
+        for dependency in dependencies or []
+        if isinstance(dependency, dict) and dependency.get('name')
+    ]
+
+
+def fill_dependencies(apps, schema_editor):
+    ChartContent = apps.get_model('chart', 'ChartContent')
+    ContentArtifact = apps.get_model('core', 'ContentArtifact')
+
+    content_artifacts = ContentArtifact.objects.filter(
+        content__in=ChartContent.objects.filter(dependencies=[]).values('pk'),
+        artifact__isnull=False,
+    ).select_related('artifact')
+
+    batch = []
+    for content_artifact in content_artifacts.iterator(chunk_size=1000):
+        artifact = content_artifact.artifact
+        try:
+            artifact.file.open('rb')
+            try:
+                dependencies = read_dependencies(artifact.file)
+            finally:
+                artifact.file.close()
+        except (OSError, tarfile.TarError, yaml.YAMLError) as e:
+            # Leave the chart as is, a sync of its repository fills its dependencies in
+            log.warning('Unable to read the dependencies of %s: %s', content_artifact.content_id, e)
+            continue
+        if dependencies:
+            batch.append(
+                ChartContent(pk=content_artifact.content_id, dependencies=dependencies)
+            )
+        if len(batch) >= 1000:
+            ChartContent.objects.bulk_update(batch, ['dependencies'])
+            batch = []
+    if batch:
+        ChartContent.objects.bulk_update(batch, ['dependencies'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_repository_pulp_type'),
+        ('chart', '0014_chartpendingtask'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_dependencies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 2.2.8 on 2020-01-16 14:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_repository_pulp_type'),
+        ('chart', '0015_chartcontent_dependencies_backfill'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChartContentRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.BigIntegerField(default=0)),
+            ],
+        ),
+        # The revision is incremented by deferred triggers, at the commit of a writing
+        # transaction, once per transaction. Taking the lock of the counter row any earlier would
+        # deadlock concurrent syncs of the same charts, each waiting for a chart the other one
+        # created. Artifacts of every content type are counted, telling chart content apart would
+        # take a query per row; other plugins only make chart listings revalidate more often.
+        migrations.RunSQL(
+            sql="CREATE FUNCTION chart_chartcontentrevision_increment() RETURNS trigger AS $$ "
+                "BEGIN "
+                "IF current_setting('chart.revision_txid', true) = txid_current()::text THEN "
+                "RETURN NULL; "
+                "END IF; "
+                "PERFORM set_config('chart.revision_txid', txid_current()::text, true); "
+                "INSERT INTO chart_chartcontentrevision (id, revision) VALUES (1, 1) "
+                "ON CONFLICT (id) DO UPDATE "
+                "SET revision = chart_chartcontentrevision.revision + 1; "
+                "RETURN NULL; "
+                "END "
+                "$$ LANGUAGE plpgsql;",
+            reverse_sql='DROP FUNCTION chart_chartcontentrevision_increment();',
+        ),
+        migrations.RunSQL(
+            sql='CREATE CONSTRAINT TRIGGER chart_chartcontent_revision_trigger '
+                'AFTER INSERT OR UPDATE OR DELETE ON chart_chartcontent '
+                'DEFERRABLE INITIALLY DEFERRED '
+                'FOR EACH ROW EXECUTE PROCEDURE chart_chartcontentrevision_increment();',
+            reverse_sql='DROP TRIGGER chart_chartcontent_revision_trigger ON chart_chartcontent;',
+        ),
+        migrations.RunSQL(
+            sql='CREATE CONSTRAINT TRIGGER chart_contentartifact_revision_trigger '
+                'AFTER INSERT OR UPDATE OR DELETE ON core_contentartifact '
+                'DEFERRABLE INITIALLY DEFERRED '
+                'FOR EACH ROW EXECUTE PROCEDURE chart_chartcontentrevision_increment();',
+            reverse_sql='DROP TRIGGER chart_contentartifact_revision_trigger '
+                        'ON core_contentartifact;',
+        ),
+    ]
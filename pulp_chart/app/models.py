@@ -1,18 +1,28 @@
+from datetime import timedelta
 from logging import getLogger
 
-from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.fields import ArrayField, JSONField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.expressions import RawSQL
 from django.utils import timezone
 
 from pulpcore.plugin.models import (
+    BaseModel,
     Content,
     ContentArtifact,
     Remote,
     Repository,
+    RepositoryVersion,
     Publication,
     PublicationDistribution,
+    Task,
 )
 
+from pulp_chart.app import requirements, semver
+from pulp_chart.app.downloaders import ChartDownloader, ChartDownloaderFactory
+
 logger = getLogger(__name__)
 
 
@@ -24,6 +34,8 @@ class ChartContent(Content):
     # Required chart metadata
     name = models.TextField(null=False)
     version = models.TextField(null=False)
+    # Sortable representation of version, see pulp_chart.app.semver.sort_key
+    version_sort = models.TextField(null=False)
     digest = models.CharField(null=False, max_length=64) # SHA256 digest
 
     created = models.DateTimeField(default=timezone.now)
@@ -37,21 +49,90 @@ class ChartContent(Content):
         models.TextField(null=False),
         null=True
     )
+    # The charts this chart depends on, see pulp_chart.app.requirements.read_dependencies
+    dependencies = JSONField(default=list)
+    # Filled in by a database trigger, see pulp_chart.app.search
+    search_vector = SearchVectorField(null=True, editable=False)
 
     TYPE = "chart"
 
     class Meta:
         default_related_name = "%(app_label)s_%(model_name)s"
         unique_together = ('name', 'version', 'digest')
+        # Trigram indexes on UPPER(name) and UPPER(description), used by the icontains filters,
+        # are created with raw SQL in migration 0003 as they can't be expressed here.
+        indexes = [
+            models.Index(fields=['name', 'version'], name='chart_name_version_idx'),
+            models.Index(
+                fields=['name', 'version_sort', 'content_ptr'], name='chart_name_version_sort_idx'
+            ),
+            models.Index(
+                fields=['name'], name='chart_name_prefix_idx', opclasses=['text_pattern_ops']
+            ),
+            models.Index(fields=['version'], name='chart_version_idx'),
+            models.Index(fields=['version_sort'], name='chart_version_sort_idx'),
+            models.Index(fields=['digest'], name='chart_digest_idx'),
+            models.Index(fields=['app_version'], name='chart_app_version_idx'),
+            GinIndex(fields=['keywords'], name='chart_keywords_idx'),
+            GinIndex(fields=['search_vector'], name='chart_search_vector_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Fill in the version sort key before saving.
+        """
+        if not self.version_sort:
+            self.version_sort = semver.sort_key(self.version)
+        super().save(*args, **kwargs)
+
+
+class ChartContentRevision(models.Model):
+    """
+    A counter of the changes to chart content, to validate cached chart listings with.
+
+    There is at most a single row, with the pk 1, upserted by database triggers created in
+    migration 0016 once per transaction writing chart_chartcontent or core_contentartifact. So it
+    also counts the charts created by ``bulk_create`` and the artifacts of on-demand charts saved
+    when first downloaded. The increment is part of the writing transaction, at its commit, so a
+    revision is never visible before the changes it counts.
+
+    Fields:
+        revision (models.BigIntegerField): The number of changes counted
+    """
+
+    revision = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        """
+        Return the current revision of the chart content, 0 if nothing was counted yet.
+        """
+        return cls.objects.filter(pk=1).values_list('revision', flat=True).first() or 0
 
 
 class ChartPublication(Publication):
     """
     A Publication for ChartContent.
+
+    Fields:
+        generation (models.PositiveIntegerField): Increases with every publication of the
+            repository, lets mirrors ask for the changes since the publication they last saw.
     """
 
+    generation = models.PositiveIntegerField(default=0)
+
     TYPE = "chart"
 
+    @classmethod
+    def next_generation(cls, repository):
+        """
+        Return the generation of the next publication of a repository.
+        """
+        latest = cls.objects.filter(repository_version__repository=repository).aggregate(
+            generation=models.Max('generation')
+        )['generation']
+        return (latest or 0) + 1
+
     class Meta:
         default_related_name = "%(app_label)s_%(model_name)s"
 
@@ -59,10 +140,34 @@ class ChartPublication(Publication):
 class ChartRemote(Remote):
     """
     A Remote for ChartContent.
+
+    Fields:
+        download_concurrency_per_host (models.PositiveIntegerField): The number of simultaneous
+            connections to a single host, backed off adaptively when the host throttles.
+        includes (JSONField): The charts to sync, as a list of ``name`` and ``version``
+            requirements. Their dependencies are synced along, transitively. Everything is synced
+            if null.
     """
 
+    download_concurrency_per_host = models.PositiveIntegerField(null=True)
+    includes = JSONField(null=True)
+
     TYPE = "chart"
 
+    @property
+    def download_factory(self):
+        """
+        Return the ChartDownloaderFactory, building HTTP(S) downloaders from ChartDownloader.
+        """
+        try:
+            return self._download_factory
+        except AttributeError:
+            self._download_factory = ChartDownloaderFactory(
+                self,
+                downloader_overrides={"http": ChartDownloader, "https": ChartDownloader},
+            )
+            return self._download_factory
+
     class Meta:
         default_related_name = "%(app_label)s_%(model_name)s"
 
@@ -70,8 +175,20 @@ class ChartRemote(Remote):
 class ChartRepository(Repository):
     """
     A Repository for ChartContent.
+
+    Fields:
+        retain_versions (models.PositiveIntegerField): The number of versions of every chart to
+            keep, the highest releases by semver, then the highest prereleases. All are kept if
+            null.
+        retain_days (models.PositiveIntegerField): The age in days after which chart versions are
+            removed, except the latest version of every chart (see
+            :func:`pulp_chart.app.requirements.latest`). Versions are kept regardless of their
+            age if null.
     """
 
+    retain_versions = models.PositiveIntegerField(null=True)
+    retain_days = models.PositiveIntegerField(null=True)
+
     TYPE = "chart"
 
     CONTENT_TYPES = [ChartContent]
@@ -79,12 +196,173 @@ class ChartRepository(Repository):
     class Meta:
         default_related_name = "%(app_label)s_%(model_name)s"
 
+    def finalize_new_version(self, new_version):
+        """
+        Enforce the retention policy on a new version, and record its latest charts.
+
+        The chart versions falling outside of the retention policy are removed, then the latest
+        version of every chart is recorded.
+
+        Args:
+            new_version (pulpcore.app.models.RepositoryVersion): The incomplete RepositoryVersion
+                to finalize.
+        """
+        expired = self.expired_content(new_version)
+        if expired is not None:
+            new_version.remove_content(expired)
+        ChartLatestVersion.refresh(new_version)
+
+    def expired_content(self, version):
+        """
+        Return the charts of a repository version falling outside of the retention policy.
+
+        The charts are ranked by version within their name in a single query, so the policy is
+        enforced without loading the content of the version. Releases rank ahead of
+        prereleases, as Helm only installs prereleases when asked to, so the first ranked chart
+        is the latest one of :func:`pulp_chart.app.requirements.latest`.
+
+        Args:
+            version (pulpcore.app.models.RepositoryVersion): The repository version
+
+        Returns:
+            django.db.models.QuerySet: The expired ChartContent, None if all charts are retained
+        """
+        conditions = []
+        params = []
+        if self.retain_versions is not None:
+            conditions.append("ranked.position > %s")
+            params.append(self.retain_versions)
+        if self.retain_days is not None:
+            conditions.append("(ranked.position > 1 AND ranked.created < %s)")
+            params.append(timezone.now() - timedelta(days=self.retain_days))
+        if not conditions:
+            return None
+
+        content_sql, content_params = version.content.values('pk').query.sql_with_params()
+        sql = (
+            "SELECT ranked.content_ptr_id FROM ("
+            " SELECT chart.content_ptr_id, chart.created, row_number() OVER ("
+            "  PARTITION BY chart.name ORDER BY right(chart.version_sort, 1) = %s DESC,"
+            "  chart.version_sort DESC, chart.created DESC"
+            " ) AS position"
+            " FROM {table} chart WHERE chart.content_ptr_id IN ({content})"
+            ") ranked WHERE {conditions}"
+        ).format(
+            table=ChartContent._meta.db_table,
+            content=content_sql,
+            conditions=" OR ".join(conditions),
+        )
+        return ChartContent.objects.filter(
+            pk__in=RawSQL(sql, (semver.RELEASE_MARK,) + tuple(content_params) + tuple(params))
+        )
+
+
+class ChartSyncState(BaseModel):
+    """
+    What was last synced from a remote into a repository.
+
+    When the remote is another pulp_chart distribution, the next sync only fetches the changes
+    since the upstream generation recorded here, as long as the remote URL is unchanged and the
+    repository has not been modified since.
+
+    Fields:
+        url (models.TextField): The URL of the remote at the time of the sync
+        generation (models.PositiveIntegerField): The upstream publication generation synced
+        version_number (models.PositiveIntegerField): The repository version created by the sync
+
+    Relations:
+        repository (models.ForeignKey): The repository synced into
+        remote (models.ForeignKey): The remote synced from
+    """
+
+    repository = models.ForeignKey(Repository, on_delete=models.CASCADE)
+    remote = models.ForeignKey(ChartRemote, on_delete=models.CASCADE)
+    url = models.TextField()
+    generation = models.PositiveIntegerField()
+    version_number = models.PositiveIntegerField()
+
+    class Meta:
+        default_related_name = "%(app_label)s_%(model_name)s"
+        unique_together = ('repository', 'remote')
+
+
+class ChartPendingTask(BaseModel):
+    """
+    The last task dispatched with a coalescing key, see :mod:`pulp_chart.app.tasking`.
+
+    Fields:
+        key (models.CharField): The sha256 of the function, reservations and keyword arguments
+            of the task
+
+    Relations:
+        task (models.ForeignKey): The task
+    """
+
+    key = models.CharField(max_length=64, unique=True)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+
+    class Meta:
+        default_related_name = "%(app_label)s_%(model_name)s"
+
+
+class ChartLatestVersion(BaseModel):
+    """
+    The latest version of a chart in a repository version.
+
+    See :func:`pulp_chart.app.requirements.latest` for which version is the latest.
+
+    The latest versions of a repository version are recorded when it is finalized, so they are
+    listed with an index scan instead of ranking every chart of the version.
+
+    Fields:
+        name (models.TextField): The name of the chart
+
+    Relations:
+        repository_version (models.ForeignKey): The repository version
+        content (models.ForeignKey): The latest version of the chart in the repository version
+    """
+
+    repository_version = models.ForeignKey(RepositoryVersion, on_delete=models.CASCADE)
+    name = models.TextField()
+    content = models.ForeignKey(ChartContent, on_delete=models.CASCADE)
+
+    class Meta:
+        default_related_name = "%(app_label)s_%(model_name)s"
+        unique_together = ('repository_version', 'name')
+
+    @classmethod
+    def refresh(cls, repository_version):
+        """
+        Record the latest version of every chart in a repository version.
+
+        Args:
+            repository_version (pulpcore.app.models.RepositoryVersion): The repository version
+        """
+        cls.objects.filter(repository_version=repository_version).delete()
+        latest = requirements.latest(
+            ChartContent.objects.filter(pk__in=repository_version.content)
+        ).values_list('pk', 'name')
+
+        batch = []
+        for pk, name in latest.iterator():
+            batch.append(cls(repository_version=repository_version, name=name, content_id=pk))
+            if len(batch) >= 1000:
+                cls.objects.bulk_create(batch)
+                batch = []
+        cls.objects.bulk_create(batch)
+
 
 class ChartDistribution(PublicationDistribution):
     """
     A Distribution for ChartContent.
+
+    Fields:
+        latest_only (models.BooleanField): Serve an index of only the latest version of every
+            chart, see :func:`pulp_chart.app.requirements.latest`.
     """
 
+    latest_only = models.BooleanField(default=False)
+
     TYPE = "chart"
 
     class Meta:
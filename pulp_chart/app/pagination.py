@@ -0,0 +1,118 @@
+import json
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from gettext import gettext as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class ChartContentCursorPagination(BasePagination):
+    """
+    Keyset pagination for ChartContent, ordered by (name, version_sort, pk).
+
+    Every page is fetched with a row comparison against the last row of the previous page, which
+    is answered by a range scan of the (name, version_sort, pk) index. So unlike offset pagination
+    the cost of a page does not grow with its depth, and rows inserted while a client is iterating
+    never shift rows in or out of pages it has yet to fetch.
+
+    The cursor is opaque to clients, the first page is requested with an empty ``cursor``.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    max_limit = 1000
+    ordering = ("name", "version_sort", "pk")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return the page of results following the position encoded in the request's cursor.
+        """
+        self.request = request
+        self.limit = self.get_limit(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position:
+            opts = queryset.model._meta
+            columns = [opts.get_field(field).column for field in self.ordering[:-1]]
+            columns.append(opts.pk.column)
+            row = ", ".join('"{}"."{}"'.format(opts.db_table, column) for column in columns)
+            queryset = queryset.extra(
+                where=["({}) > ({})".format(row, ", ".join(["%s"] * len(columns)))],
+                params=position,
+            )
+
+        results = list(queryset[: self.limit + 1])
+        self.has_next = len(results) > self.limit
+        self.page = results[: self.limit]
+        return self.page
+
+    def get_paginated_response(self, data):
+        """
+        Wrap a page of serialized results with the link to the next page.
+        """
+        return Response(OrderedDict([("next", self.get_next_link()), ("results", data)]))
+
+    def get_limit(self, request):
+        """
+        Get the page size requested by the client, capped to ``max_limit``.
+        """
+        try:
+            return _positive_int(
+                request.query_params[self.limit_query_param], strict=True, cutoff=self.max_limit
+            )
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+
+    def get_next_link(self):
+        """
+        Build the URL of the page following the current one, None if this is the last page.
+        """
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        last = self.page[-1]
+        if isinstance(last, dict):
+            # A page of values() rows
+            position = [last[field] for field in self.ordering]
+        else:
+            position = [getattr(last, field) for field in self.ordering]
+        position[-1] = str(position[-1])
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position))
+
+    @staticmethod
+    def encode_cursor(position):
+        """
+        Encode a position as an opaque, URL safe cursor.
+        """
+        return urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request):
+        """
+        Decode the position from the request's cursor, None for the first page.
+
+        Raises:
+            rest_framework.exceptions.NotFound: If the cursor is invalid.
+
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+        except (TypeError, ValueError):
+            raise NotFound(_("Invalid cursor"))
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(_("Invalid cursor"))
+        if not all(isinstance(value, str) for value in position):
+            raise NotFound(_("Invalid cursor"))
+        try:
+            position[-1] = str(uuid.UUID(position[-1]))
+        except ValueError:
+            raise NotFound(_("Invalid cursor"))
+        return position
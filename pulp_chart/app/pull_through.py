@@ -0,0 +1,206 @@
+"""
+Pull-through caching of charts for ChartDistributions with a remote and no publication.
+
+Such a distribution serves the index of its remote, refreshed at most every
+``CHART_PULL_THROUGH_INDEX_TTL`` seconds, with the chart URLs rewritten to point at the
+distribution itself. A chart is downloaded from the remote the first time it is requested and
+saved as ChartContent, later requests are served from storage.
+
+The saved content is not added to any repository, so it is an orphan as far as Pulp is concerned
+and removed by orphan cleanup. It is downloaded again the next time it is requested.
+"""
+import asyncio
+import time
+from urllib.parse import urljoin
+
+import yaml
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from pulpcore.plugin.models import Artifact, ContentArtifact, RemoteArtifact
+
+from pulp_chart.app.cache import CachedIndex
+from pulp_chart.app.models import ChartContent
+from pulp_chart.app.tasks.synchronizing import index_url, read_entries
+
+
+class UpstreamIndex:
+    """
+    The index of a remote, as served by a pull-through distribution.
+    """
+
+    def __init__(self, doc, remote_url, url):
+        """
+        Wrap an index fetched from a remote.
+
+        Args:
+            doc (dict): The parsed upstream index
+            remote_url (str): The URL of the remote at the time the index was fetched
+            url (str): The URL the index was fetched from
+
+        """
+        self.fetched = time.monotonic()
+        self.remote_url = remote_url
+        self.charts = {}
+        entries = doc.get('entries') or {}
+        for entry in read_entries(entries):
+            entry['url'] = urljoin(url, entry['url'])
+            self.charts["{}-{}.tgz".format(entry['name'], entry['version'])] = entry
+        # Point clients at the distribution instead of the remote
+        for versions in entries.values():
+            for version in versions:
+                version['urls'] = ["{}-{}.tgz".format(version['name'], version['version'])]
+        self.cached = CachedIndex(yaml.dump(doc).encode("utf-8"))
+
+    def expired(self, ttl):
+        """
+        Check whether the index is older than ttl seconds.
+        """
+        return time.monotonic() - self.fetched > ttl
+
+
+class PullThroughCache:
+    """
+    The upstream indexes and in-flight chart downloads of the pull-through distributions.
+
+    Concurrent requests for the same index or chart share a single upstream download.
+    """
+
+    def __init__(self):
+        """
+        Create an empty cache.
+        """
+        self._indexes = {}
+        self._pending = {}
+
+    async def _coalesce(self, key, coroutine):
+        """
+        Await coroutine, or the result of an identical call already in progress.
+        """
+        future = self._pending.get(key)
+        if future is not None:
+            coroutine.close()
+            return await asyncio.shield(future)
+
+        # The call is shielded and only forgotten once it is done, so it goes on for the other
+        # requests waiting on it when the request which started it is cancelled
+        future = asyncio.ensure_future(coroutine)
+        self._pending[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(future)
+
+    def _forget(self, key, future):
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        if not future.cancelled():
+            # Mark the outcome as retrieved, in case every request waiting on it went away
+            future.exception()
+
+    async def index(self, remote):
+        """
+        Return the index of a remote, fetching it if not cached or expired.
+
+        Args:
+            remote (ChartRemote): The remote of the distribution
+
+        Returns:
+            UpstreamIndex: The index
+
+        """
+        index = self._indexes.get(remote.pk)
+        ttl = getattr(settings, "CHART_PULL_THROUGH_INDEX_TTL", 300)
+        if index is None or index.expired(ttl) or index.remote_url != remote.url:
+            index = await self._coalesce(("index", remote.pk), self._fetch_index(remote))
+        return index
+
+    async def _fetch_index(self, remote):
+        url = index_url(remote)
+        result = await remote.get_downloader(url=url).run()
+        # Parsing and dumping the index of a large remote takes seconds, which would stall every
+        # other request of the content app
+        loop = asyncio.get_event_loop()
+        index = await loop.run_in_executor(
+            None, self._read_index, result.path, remote.url, url
+        )
+        self._indexes[remote.pk] = index
+        return index
+
+    @staticmethod
+    def _read_index(path, remote_url, url):
+        with open(path) as fp:
+            doc = yaml.safe_load(fp)
+        return UpstreamIndex(doc, remote_url, url)
+
+    async def chart(self, remote, filename):
+        """
+        Return the artifact of a chart of a remote, downloading and saving it on first request.
+
+        Args:
+            remote (ChartRemote): The remote of the distribution
+            filename (str): The requested file, ``<name>-<version>.tgz``
+
+        Returns:
+            pulpcore.plugin.models.Artifact: The artifact of the chart, None if the remote has no
+                such chart
+
+        """
+        entry = (await self.index(remote)).charts.get(filename)
+        if entry is None:
+            return None
+
+        content_artifact = ContentArtifact.objects.select_related("artifact").filter(
+            content__in=ChartContent.objects.filter(
+                name=entry['name'], version=entry['version'], digest=entry['digest']
+            ),
+            artifact__isnull=False,
+        ).first()
+        if content_artifact is not None:
+            return content_artifact.artifact
+
+        return await self._coalesce(
+            ("chart", remote.pk, filename), self._download(remote, filename, entry)
+        )
+
+    async def _download(self, remote, filename, entry):
+        downloader = remote.get_downloader(
+            url=entry['url'], expected_digests={"sha256": entry['digest']}
+        )
+        result = await downloader.run()
+        return self._save(remote, filename, entry, result)
+
+    @staticmethod
+    def _save(remote, filename, entry, result):
+        """
+        Save a downloaded chart as Artifact, ChartContent, ContentArtifact and RemoteArtifact.
+        """
+        artifact = Artifact(**result.artifact_attributes, file=result.path)
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    artifact.save()
+            except IntegrityError:
+                artifact = Artifact.objects.get(artifact.q())
+
+            fields = {k: v for k, v in entry.items() if k != 'url'}
+            content, _ = ChartContent.objects.get_or_create(
+                name=fields.pop('name'),
+                version=fields.pop('version'),
+                digest=fields.pop('digest'),
+                defaults={k: v for k, v in fields.items() if v is not None},
+            )
+            content_artifact, created = ContentArtifact.objects.get_or_create(
+                content=content, relative_path=filename, defaults={"artifact": artifact}
+            )
+            if not created and content_artifact.artifact_id is None:
+                content_artifact.artifact = artifact
+                content_artifact.save()
+            RemoteArtifact.objects.get_or_create(
+                remote=remote,
+                content_artifact=content_artifact,
+                defaults={
+                    "url": entry['url'],
+                    "sha256": artifact.sha256,
+                    "size": artifact.size,
+                },
+            )
+        return artifact
@@ -0,0 +1,278 @@
+"""
+Resolution of chart requirements against chart content.
+
+Requirements are ``(name, version constraint)`` pairs as found in Helm's ``requirements.yaml`` or
+the ``dependencies`` of a ``Chart.yaml``.
+"""
+from collections import OrderedDict, namedtuple
+
+from django.db.models import BooleanField, Case, Q, Value, When
+
+from pulp_chart.app import semver
+
+
+Requirement = namedtuple("Requirement", ["name", "version"])
+"""A chart name and a version, which is either an exact version or a semver constraint."""
+
+
+def requirement_q(requirement):
+    """
+    Build a filter for the chart content which may satisfy a requirement.
+
+    Args:
+        requirement (Requirement): The requirement
+
+    Returns:
+        django.db.models.Q: A filter matching the exact version, or any version in the range
+
+    """
+    q = Q(name=requirement.name, version=requirement.version)
+    try:
+        constraint = semver.Constraint(requirement.version)
+    except ValueError:
+        return q
+    return q | (Q(name=requirement.name) & constraint.q("version_sort"))
+
+
+def select(requirement, candidates):
+    """
+    Pick the chart satisfying a requirement from a list of candidates.
+
+    An exact match of the version string wins, otherwise the highest version satisfying the
+    requirement as a semver constraint is picked.
+
+    Args:
+        requirement (Requirement): The requirement
+        candidates (list): Dicts or objects with ``name``, ``version`` and ``version_sort``,
+            ordered by descending ``version_sort``
+
+    Returns:
+        The selected candidate, or None if no candidate satisfies the requirement
+
+    """
+    def get(candidate, field):
+        if isinstance(candidate, dict):
+            return candidate[field]
+        return getattr(candidate, field)
+
+    candidates = [c for c in candidates if get(c, "name") == requirement.name]
+    for candidate in candidates:
+        if get(candidate, "version") == requirement.version:
+            return candidate
+    try:
+        constraint = semver.Constraint(requirement.version)
+    except ValueError:
+        return None
+    for candidate in candidates:
+        if constraint.match_key(get(candidate, "version_sort")):
+            return candidate
+    return None
+
+
+def latest(queryset):
+    """
+    Narrow chart content down to the latest version of every chart.
+
+    The latest version of a chart is its highest release, or its highest prerelease if it has no
+    release at all.
+
+    Args:
+        queryset (django.db.models.QuerySet): The ChartContent to pick from
+
+    Returns:
+        django.db.models.QuerySet: One chart per name, ordered by name
+
+    """
+    released = Case(
+        When(version_sort__endswith=semver.RELEASE_MARK, then=Value(True)),
+        default=Value(False),
+        output_field=BooleanField(),
+    )
+    return (
+        queryset.annotate(released=released)
+        .order_by("name", "-released", "-version_sort", "-created")
+        .distinct("name")
+    )
+
+
+def resolve(queryset, requirements, fields=()):
+    """
+    Resolve many requirements against chart content with a single query.
+
+    Args:
+        queryset (django.db.models.QuerySet): The ChartContent to pick from
+        requirements (list): The :class:`Requirement` to resolve
+        fields (tuple): Additional fields to fetch for the selected charts
+
+    Returns:
+        list: ``(requirement, values)`` pairs in the order of ``requirements``, where ``values``
+            is a dict with ``pk``, ``name``, ``version``, ``version_sort`` and ``fields``, or None
+            when nothing satisfies the requirement
+
+    """
+    if not requirements:
+        return []
+
+    q = Q()
+    for requirement in requirements:
+        q |= requirement_q(requirement)
+
+    candidates = {}
+    for values in (
+        queryset.filter(q)
+        .order_by("name", "-version_sort")
+        .values("pk", "name", "version", "version_sort", *fields)
+    ):
+        candidates.setdefault(values["name"], []).append(values)
+
+    return [
+        (requirement, select(requirement, candidates.get(requirement.name, [])))
+        for requirement in requirements
+    ]
+
+
+def read_dependencies(dependencies):
+    """
+    Normalize the ``dependencies`` of a chart's metadata.
+
+    They are found in Chart.yaml, requirements.yaml or an index entry.
+
+    Args:
+        dependencies (list): The dependencies, dicts with ``name``, ``version`` and ``repository``
+
+    Returns:
+        list: The dependencies with only ``name``, ``version`` and ``repository``, the version
+            defaulting to ``*``
+    """
+    return [
+        {
+            "name": dependency["name"],
+            "version": str(dependency.get("version") or "*"),
+            "repository": dependency.get("repository"),
+        }
+        for dependency in dependencies or []
+        if isinstance(dependency, dict) and dependency.get("name")
+    ]
+
+
+def dependency_requirements(dependencies):
+    """
+    Return the :class:`Requirement` of every dependency of a chart.
+    """
+    return [
+        Requirement(name=dependency["name"], version=dependency.get("version") or "*")
+        for dependency in dependencies or []
+    ]
+
+
+def closure(queryset, pks):
+    """
+    Extend a selection of charts by the charts satisfying their dependencies, transitively.
+
+    Every level of dependencies is resolved with :func:`resolve`, so this takes two queries per
+    level of the dependency tree.
+
+    Args:
+        queryset (django.db.models.QuerySet): The ChartContent to pick dependencies from
+        pks (iterable): The primary keys of the selected charts
+
+    Returns:
+        tuple: The set of the primary keys of the selected charts and their dependencies, and the
+            list of the :class:`Requirement` that nothing in queryset satisfies
+    """
+    selected = set(pks)
+    frontier = set(selected)
+    seen = set()
+    missing = []
+    while frontier:
+        wanted = set()
+        for dependencies in queryset.filter(pk__in=frontier).values_list(
+            "dependencies", flat=True
+        ):
+            wanted.update(dependency_requirements(dependencies))
+        wanted = sorted(wanted - seen)
+        seen.update(wanted)
+
+        frontier = set()
+        for requirement, values in resolve(queryset, wanted):
+            if values is None:
+                missing.append(requirement)
+            elif values["pk"] not in selected:
+                selected.add(values["pk"])
+                frontier.add(values["pk"])
+    return selected, missing
+
+
+def entry_closure(entries, roots):
+    """
+    Pick the index entries satisfying some root requirements and, transitively, their dependencies.
+
+    Like :func:`closure`, but over index entries in memory, for syncing only part of an index.
+
+    Args:
+        entries (list): Index entries as returned by
+            :func:`pulp_chart.app.tasks.synchronizing.read_entries`
+        roots (list): The :class:`Requirement` to start from
+
+    Returns:
+        tuple: The list of the picked entries in the order of ``entries``, and the list of the
+            :class:`Requirement` that no entry satisfies
+    """
+    candidates = {}
+    for entry in entries:
+        candidates.setdefault(entry["name"], []).append(entry)
+    for versions in candidates.values():
+        versions.sort(key=lambda entry: entry["version_sort"], reverse=True)
+
+    picked = {}
+    missing = []
+    seen = set()
+    pending = list(roots)
+    while pending:
+        requirement = pending.pop()
+        if requirement in seen:
+            continue
+        seen.add(requirement)
+        entry = select(requirement, candidates.get(requirement.name, []))
+        if entry is None:
+            missing.append(requirement)
+        elif id(entry) not in picked:
+            picked[id(entry)] = entry
+            pending.extend(dependency_requirements(entry.get("dependencies")))
+    return [entry for entry in entries if id(entry) in picked], missing
+
+
+def resolve_all(queryset, roots, fields=()):
+    """
+    Resolve requirements and, transitively, the dependencies of the charts they resolve to.
+
+    Every level of dependencies is resolved with a single :func:`resolve` query.
+
+    Args:
+        queryset (django.db.models.QuerySet): The ChartContent to pick from
+        roots (list): The :class:`Requirement` to resolve
+        fields (tuple): Additional fields to fetch for the selected charts
+
+    Returns:
+        list: ``(requirement, values)`` pairs as returned by :func:`resolve`, for the roots and
+            then for every level of dependencies, each requirement only once
+    """
+    results = []
+    seen = set()
+    resolved = set()
+    wanted = list(OrderedDict.fromkeys(roots))
+    while wanted:
+        seen.update(wanted)
+        level = resolve(queryset, wanted, fields=tuple(fields) + ("dependencies",))
+        results.extend(level)
+
+        wanted = []
+        for requirement, values in level:
+            if values is None or values["pk"] in resolved:
+                continue
+            resolved.add(values["pk"])
+            for dependency in dependency_requirements(values["dependencies"]):
+                if dependency not in seen:
+                    seen.add(dependency)
+                    wanted.append(dependency)
+    return results
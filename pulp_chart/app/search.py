@@ -0,0 +1,83 @@
+"""
+Full-text search of chart content.
+
+Every chart has a ``search_vector``, a tsvector of its name, keywords and description weighted in
+that order. It is filled in by a trigger on the chart_chartcontent table, created in migration
+0012, so charts created with ``bulk_create`` by the sync pipeline get one too, and it is indexed
+with a GIN index, so matching charts are found without scanning the table.
+
+The ``simple`` text search configuration is used throughout: chart names, keywords and
+descriptions are mostly names of software, which English stemming and stop words would mangle.
+Every term of a search matches as a prefix instead, so ``postgres`` finds ``postgresql``.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+
+CONFIG = "simple"
+"""The text search configuration of search vectors and queries."""
+
+MAX_TERMS = 16
+"""The number of terms of a search beyond which terms are ignored."""
+
+TERM = re.compile(r"[^\W_]+")
+
+
+def terms(text):
+    """
+    Split a search into its terms.
+
+    Anything but letters and digits separates terms, the way the ``simple`` configuration splits
+    the words of hyphenated and underscored chart names.
+
+    Args:
+        text (str): The search, as entered by a user
+
+    Returns:
+        list: The distinct, lowercased terms, in order, at most ``MAX_TERMS`` of them
+
+    """
+    found = []
+    for term in TERM.findall(text.lower()):
+        if term not in found:
+            found.append(term)
+    return found[:MAX_TERMS]
+
+
+def tsquery(text):
+    """
+    Build the tsquery of a search, matching charts with every term as a prefix of a word.
+
+    Terms only consist of letters and digits, so the query can't contain tsquery operators.
+
+    Args:
+        text (str): The search, as entered by a user
+
+    Returns:
+        str: The tsquery, empty if the search has no terms
+
+    """
+    return " & ".join("{}:*".format(term) for term in terms(text))
+
+
+def search(queryset, text):
+    """
+    Find the charts matching a search, best matches first.
+
+    Args:
+        queryset (django.db.models.QuerySet): The ChartContent to search
+        text (str): The search, as entered by a user
+
+    Returns:
+        django.db.models.QuerySet: The matching charts, annotated with their ``rank``, and ordered
+            by rank, then name and version, newest first
+
+    """
+    query = SearchQuery(tsquery(text), config=CONFIG, search_type="raw")
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "name", "-version_sort", "pk")
+    )
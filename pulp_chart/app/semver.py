@@ -0,0 +1,314 @@
+"""
+Semantic version helpers for chart metadata.
+
+Helm requires chart versions to follow `SemVer 2`_, but indexes found in the wild also contain
+versions with a leading ``v`` or missing minor/patch components. These are accepted and treated
+as if the missing components were zero, the same way Helm itself does.
+
+.. _SemVer 2:
+    https://semver.org/spec/v2.0.0.html
+"""
+import re
+from collections import namedtuple
+
+from django.db.models import Q
+
+
+VERSION_RE = re.compile(
+    r"^v?(?P<major>\d+)(?:\.(?P<minor>\d+))?(?:\.(?P<patch>\d+))?"
+    r"(?:-(?P<prerelease>[0-9A-Za-z.-]+))?(?:\+(?P<build>[0-9A-Za-z.-]+))?$"
+)
+
+NUMBER_WIDTH = 12
+"""The number of digits every numeric version component is padded to in a sort key."""
+
+RELEASE_MARK = "z"
+"""The character that ends the sort key of every non-prerelease version."""
+
+Version = namedtuple("Version", ["major", "minor", "patch", "prerelease", "build"])
+
+
+def parse(version):
+    """
+    Parse a chart version string.
+
+    Args:
+        version (str): The version to parse, e.g. ``1.2.3-rc.1+build.5``
+
+    Returns:
+        Version: The parsed version, prerelease identifiers are returned as a tuple
+
+    Raises:
+        ValueError: If the version is not a valid (or almost valid) semantic version
+
+    """
+    match = VERSION_RE.match(version.strip())
+    if not match:
+        raise ValueError("'{}' is not a valid semantic version".format(version))
+
+    prerelease = match.group("prerelease")
+    return Version(
+        major=int(match.group("major")),
+        minor=int(match.group("minor") or 0),
+        patch=int(match.group("patch") or 0),
+        prerelease=tuple(prerelease.split(".")) if prerelease else (),
+        build=match.group("build"),
+    )
+
+
+def _number_key(number):
+    return str(min(number, 10 ** NUMBER_WIDTH - 1)).zfill(NUMBER_WIDTH)
+
+
+def _identifier_key(identifier):
+    # Numeric identifiers always have lower precedence than alphanumeric ones, alphanumeric
+    # identifiers are compared in ASCII order. Each byte is spelled as two letters in 'b'-'q' and
+    # terminated by 'a', so a shorter identifier sorts before any longer one it is a prefix of.
+    if identifier.isdigit():
+        return "n" + _number_key(int(identifier))
+    return "s" + "".join(
+        chr(ord("b") + (byte >> 4)) + chr(ord("b") + (byte & 0xF))
+        for byte in identifier.encode("ascii", "replace")
+    ) + "a"
+
+
+def sort_key(version):
+    """
+    Build a key which sorts chart versions by semantic version precedence.
+
+    The key only consists of digits and lowercase letters, so it compares the same way regardless
+    of the database collation and can be used for index scans, ``ORDER BY`` and range lookups.
+
+    Versions which can not be parsed sort as prereleases of ``0.0.0``.
+
+    Args:
+        version (str): The chart version
+
+    Returns:
+        str: The sort key for the version
+
+    """
+    try:
+        parsed = parse(version)
+    except ValueError:
+        parsed = Version(0, 0, 0, (version,), None)
+
+    key = _number_key(parsed.major) + _number_key(parsed.minor) + _number_key(parsed.patch)
+    if not parsed.prerelease:
+        return key + RELEASE_MARK
+    return key + "m" + "".join(_identifier_key(i) for i in parsed.prerelease) + "e"
+
+
+def _bounds(version, wildcard):
+    """
+    Return the inclusive lower and exclusive upper sort keys of a possibly partial version.
+
+    ``1.2`` covers every version from ``1.2.0`` up to, but not including, ``1.3.0`` and ``*``
+    covers every version. A complete version only covers itself, so its upper bound is None.
+    """
+    specified = []
+    for part in version.lstrip("v").split("-")[0].split("+")[0].split(".")[:3]:
+        if part in wildcard:
+            break
+        specified.append(int(part))
+
+    if len(specified) == 3:
+        return sort_key(version), None
+
+    lower = specified + [0] * (3 - len(specified))
+    if not specified:
+        return sort_key("0.0.0-0"), sort_key("{}.0.0".format(10 ** NUMBER_WIDTH - 1))
+    upper = specified[:-1] + [specified[-1] + 1] + [0] * (3 - len(specified))
+    return sort_key("{}.{}.{}-0".format(*lower)), sort_key("{}.{}.{}-0".format(*upper))
+
+
+class Constraint:
+    """
+    A Helm (Masterminds/semver) style version constraint, e.g. ``>=1.2.0 <2.0.0 || ^3.1``.
+
+    Supported are the comparison operators ``=``, ``!=``, ``>``, ``>=``, ``<``, ``<=``, the tilde
+    (``~``, ``~>``) and caret (``^``) ranges, hyphen ranges (``1.2 - 1.4.5``) and ``x``/``*``
+    wildcards. Comparisons are separated by spaces or commas, alternatives by ``||``.
+
+    Like Helm, prerelease versions are only matched by a group of comparisons when one of them
+    mentions a prerelease itself.
+
+    Each group of comparisons is kept as a list of ``(operator, sort key)`` pairs, so the
+    constraint can either be evaluated in Python with :meth:`match` or translated into range
+    lookups on an indexed sort key column with :meth:`q`.
+    """
+
+    WILDCARD = ("x", "X", "*")
+    COMPARISON_RE = re.compile(
+        r"^\s*(?P<op>!=|>=|=>|<=|=<|~>|>|<|=|~|\^)?\s*(?P<version>v?[0-9xX*][0-9A-Za-z.+*-]*)\s*$"
+    )
+
+    def __init__(self, constraint):
+        """
+        Parse a constraint.
+
+        Args:
+            constraint (str): The constraint to parse
+
+        Raises:
+            ValueError: If the constraint can not be parsed
+
+        """
+        self.constraint = constraint
+        self.groups = [self._parse_group(group) for group in constraint.split("||")]
+
+    def __str__(self):
+        """
+        Return the constraint as given.
+        """
+        return self.constraint
+
+    def __repr__(self):
+        """
+        Return the constraint as a Python expression.
+        """
+        return "Constraint({!r})".format(self.constraint)
+
+    def _parse_group(self, group):
+        # Hyphen ranges are rewritten into a pair of comparisons before splitting
+        group = re.sub(
+            r"(\S+)\s+-\s+(\S+)", lambda m: ">={} <={}".format(m.group(1), m.group(2)), group
+        )
+        # Allow whitespace between an operator and its version
+        group = re.sub(r"(!=|>=|=>|<=|=<|~>|>|<|=|~|\^)\s+", r"\1", group)
+
+        comparisons = []
+        prerelease = False
+        for item in re.split(r"[\s,]+", group.strip()):
+            if not item:
+                continue
+            match = self.COMPARISON_RE.match(item)
+            if not match:
+                raise ValueError("'{}' is not a valid version constraint".format(self.constraint))
+            op, version = match.group("op") or "=", match.group("version")
+            if "-" in version.split("+")[0]:
+                prerelease = True
+            try:
+                comparisons.extend(self._comparisons(op, version))
+            except ValueError:
+                raise ValueError("'{}' is not a valid version constraint".format(self.constraint))
+
+        if not comparisons:
+            raise ValueError("'{}' is not a valid version constraint".format(self.constraint))
+        return comparisons, prerelease
+
+    def _comparisons(self, op, version):
+        lower, upper = _bounds(version, self.WILDCARD)
+        op = {"=>": ">=", "=<": "<=", "~>": "~"}.get(op, op)
+
+        if op in ("~", "^"):
+            version = re.sub(r"\.[xX*].*$", "", version)
+            parsed = parse(version)
+            given = len(version.lstrip("v").split("-")[0].split("+")[0].split("."))
+            if op == "~" and given >= 2:
+                top = "{}.{}.0-0".format(parsed.major, parsed.minor + 1)
+            elif op == "~" or parsed.major > 0 or given == 1:
+                top = "{}.0.0-0".format(parsed.major + 1)
+            elif parsed.minor > 0 or given == 2:
+                top = "0.{}.0-0".format(parsed.minor + 1)
+            else:
+                top = "0.0.{}-0".format(parsed.patch + 1)
+            return [(">=", lower), ("<", sort_key(top))]
+
+        if upper is None:
+            # A complete version, compare against it directly
+            return [({"=": "=="}.get(op, op), lower)]
+
+        if op == "=":
+            return [(">=", lower), ("<", upper)]
+        if op == "!=":
+            return [("not in", (lower, upper))]
+        if op == ">":
+            return [(">=", upper)]
+        if op == ">=":
+            return [(">=", lower)]
+        if op == "<":
+            return [("<", lower)]
+        return [("<", upper)]
+
+    @staticmethod
+    def _compare(key, op, bound):
+        if op == "==":
+            return key == bound
+        if op == "!=":
+            return key != bound
+        if op == ">":
+            return key > bound
+        if op == ">=":
+            return key >= bound
+        if op == "<":
+            return key < bound
+        if op == "<=":
+            return key <= bound
+        lower, upper = bound
+        return not lower <= key < upper
+
+    def match(self, version):
+        """
+        Check whether a version satisfies the constraint.
+
+        Args:
+            version (str): The version to check
+
+        Returns:
+            bool: True if the version satisfies the constraint
+
+        """
+        return self.match_key(sort_key(version))
+
+    def match_key(self, key):
+        """
+        Check whether a version, given by its sort key, satisfies the constraint.
+
+        Args:
+            key (str): The sort key of the version to check, see :func:`sort_key`
+
+        Returns:
+            bool: True if the version satisfies the constraint
+
+        """
+        for comparisons, prerelease in self.groups:
+            if not prerelease and not key.endswith(RELEASE_MARK):
+                continue
+            if all(self._compare(key, op, bound) for op, bound in comparisons):
+                return True
+        return False
+
+    def q(self, field="version_sort"):
+        """
+        Build a filter matching this constraint against a sort key column.
+
+        Args:
+            field (str): The name of the field holding the sort key
+
+        Returns:
+            django.db.models.Q: The filter
+
+        """
+        lookups = {
+            "==": "exact",
+            ">": "gt",
+            ">=": "gte",
+            "<": "lt",
+            "<=": "lte",
+        }
+        result = None
+        for comparisons, prerelease in self.groups:
+            group = Q()
+            if not prerelease:
+                group &= Q(**{"{}__endswith".format(field): RELEASE_MARK})
+            for op, bound in comparisons:
+                if op == "!=":
+                    group &= ~Q(**{field: bound})
+                elif op == "not in":
+                    lower, upper = bound
+                    group &= ~Q(**{"{}__gte".format(field): lower, "{}__lt".format(field): upper})
+                else:
+                    group &= Q(**{"{}__{}".format(field, lookups[op]): bound})
+            result = group if result is None else result | group
+        return result
@@ -6,9 +6,52 @@ Check `Plugin Writer's Guide`_ for more details.
 """
 from rest_framework import serializers
 
+from pulpcore.app.serializers import RepositoryVersionRelatedField
 from pulpcore.plugin import serializers as platform
 
-from . import models
+from . import models, search, semver
+from .utils import get_href
+
+
+def requested_fields(request):
+    """
+    Get the fields a client asked for with the ``fields`` and ``exclude_fields`` parameters.
+
+    Both parameters take a comma separated list of field names.
+
+    Args:
+        request (rest_framework.request.Request): The request
+
+    Returns:
+        tuple: The sets of included and excluded field names, the included set is None when
+            all fields were asked for
+
+    """
+    def split(param):
+        value = request.query_params.get(param, "")
+        return set(field.strip() for field in value.split(",") if field.strip())
+
+    return split("fields") or None, split("exclude_fields")
+
+
+class SparseFieldsMixin:
+    """
+    A mixin letting clients of GET requests limit the fields in a representation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Drop the fields which are excluded by the ``fields`` and ``exclude_fields`` parameters.
+        """
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is None or request.method != "GET":
+            return
+
+        include, exclude = requested_fields(request)
+        for field in list(self.fields):
+            if (include is not None and field not in include) or field in exclude:
+                self.fields.pop(field)
 
 
 # FIXME: SingleArtifactContentSerializer might not be the right choice for you.
@@ -17,7 +60,7 @@ from . import models
 # If you want create content through upload, use "SingleArtifactContentUploadSerializer"
 # If you change this, make sure to do so on "fields" below, also.
 # Make sure your choice here matches up with the create() method of your viewset.
-class ChartContentSerializer(platform.SingleArtifactContentUploadSerializer):
+class ChartContentSerializer(SparseFieldsMixin, platform.SingleArtifactContentUploadSerializer):
     """
     A Serializer for ChartContent.
 
@@ -38,10 +81,166 @@ class ChartContentSerializer(platform.SingleArtifactContentUploadSerializer):
     """
 
     class Meta:
-        fields = platform.SingleArtifactContentSerializer.Meta.fields
+        fields = platform.SingleArtifactContentSerializer.Meta.fields + (
+            'name', 'version', 'digest', 'created', 'app_version', 'description', 'icon',
+            'keywords', 'dependencies'
+        )
+        read_only_fields = (
+            'name', 'version', 'digest', 'created', 'app_version', 'description', 'icon',
+            'keywords', 'dependencies'
+        )
         model = models.ChartContent
 
 
+class ChartContentSlimSerializer(SparseFieldsMixin, serializers.Serializer):
+    """
+    A lightweight, read-only Serializer for listing ChartContent.
+
+    It serializes the dicts of a ``values()`` query instead of model instances, so neither the
+    content nor its artifacts have to be loaded to list charts.
+    """
+
+    FIELDS = ("pulp_href", "name", "version", "digest")
+    VALUES = ("pk", "name", "version", "version_sort", "digest")
+
+    pulp_href = serializers.SerializerMethodField()
+    name = serializers.CharField(read_only=True)
+    version = serializers.CharField(read_only=True)
+    digest = serializers.CharField(read_only=True)
+
+    def get_pulp_href(self, values):
+        """
+        Build the href of the chart from its primary key.
+        """
+        return get_href(models.ChartContent, values["pk"])
+
+
+class ChartSearchSerializer(serializers.Serializer):
+    """
+    A Serializer for the query parameters of a chart search.
+    """
+
+    q = serializers.CharField(
+        help_text="The words to search the name, keywords and description of charts for. Every "
+        "word has to match the start of a word of the chart."
+    )
+
+    def validate_q(self, value):
+        """
+        Check that the search has at least one term.
+        """
+        if not search.tsquery(value):
+            raise serializers.ValidationError("The search must contain at least one word.")
+        return value
+
+
+class ChartSummarySerializer(ChartContentSlimSerializer):
+    """
+    A read-only Serializer for listing charts with their description, from a ``values()`` query.
+    """
+
+    FIELDS = ChartContentSlimSerializer.FIELDS + ("app_version", "description", "icon", "keywords")
+    VALUES = ChartContentSlimSerializer.VALUES + ("app_version", "description", "icon", "keywords")
+
+    app_version = serializers.CharField(read_only=True)
+    description = serializers.CharField(read_only=True)
+    icon = serializers.CharField(read_only=True)
+    keywords = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+
+class ChartSearchResultSerializer(ChartSummarySerializer):
+    """
+    A read-only Serializer for the charts matching a search.
+    """
+
+    FIELDS = ChartSummarySerializer.FIELDS + ("rank",)
+    VALUES = ChartSummarySerializer.VALUES + ("rank",)
+
+    rank = serializers.FloatField(
+        read_only=True, help_text="How well the chart matches, higher is better."
+    )
+
+
+class ChartRequirementSerializer(serializers.Serializer):
+    """
+    A Serializer for a chart requirement, as listed in a Helm requirements.yaml.
+    """
+
+    name = serializers.CharField(help_text="The name of the chart.")
+    version = serializers.CharField(
+        default="*",
+        help_text="An exact version, or a semver constraint to resolve to the highest matching "
+        "version. Defaults to the latest release.",
+    )
+    repository = serializers.CharField(
+        required=False,
+        help_text="The repository URL of the requirement. Accepted for compatibility with "
+        "requirements.yaml and otherwise ignored.",
+    )
+
+
+class ChartLookupSerializer(serializers.Serializer):
+    """
+    A Serializer for looking up many charts at once.
+    """
+
+    charts = ChartRequirementSerializer(
+        many=True, required=False, help_text="A list of chart names and versions to look up."
+    )
+    dependencies = ChartRequirementSerializer(
+        many=True,
+        required=False,
+        help_text="A Helm style list of requirements, e.g. the 'dependencies' of a "
+        "requirements.yaml.",
+    )
+
+    def validate(self, data):
+        """
+        Check that at least one chart is looked up.
+        """
+        if not data.get("charts") and not data.get("dependencies"):
+            raise serializers.ValidationError(
+                "Either 'charts' or 'dependencies' must list at least one chart."
+            )
+        return data
+
+
+class ChartLookupResultSerializer(serializers.Serializer):
+    """
+    A Serializer for the result of looking up a chart.
+    """
+
+    name = serializers.CharField(help_text="The name of the requested chart.")
+    version = serializers.CharField(help_text="The requested version or constraint.")
+    resolved_version = serializers.CharField(
+        allow_null=True, help_text="The version of the matching chart, null if none matched."
+    )
+    content = serializers.CharField(allow_null=True, help_text="The href of the matching chart.")
+    artifact = serializers.CharField(
+        allow_null=True, help_text="The href of the artifact of the matching chart."
+    )
+    relative_path = serializers.CharField(
+        allow_null=True, help_text="The relative path of the matching chart's tarball."
+    )
+
+
+class ChartResolveResultSerializer(ChartLookupResultSerializer):
+    """
+    A Serializer for the result of resolving a requirement, or a dependency of a resolved chart.
+    """
+
+    digest = serializers.CharField(
+        allow_null=True, help_text="The sha256 digest of the matching chart's tarball."
+    )
+    url = serializers.CharField(
+        allow_null=True,
+        help_text="The URL to download the matching chart from, null if it is not distributed.",
+    )
+    dependency = serializers.BooleanField(
+        help_text="Whether this is a dependency of a resolved chart rather than a requested one."
+    )
+
+
 class ChartRemoteSerializer(platform.RemoteSerializer):
     """
     A Serializer for ChartRemote.
@@ -54,24 +253,124 @@ class ChartRemoteSerializer(platform.RemoteSerializer):
 
     class Meta:
         validators = platform.RemoteSerializer.Meta.validators + [myValidator1, myValidator2]
-
-    By default the 'policy' field in platform.RemoteSerializer only validates the choice
-    'immediate'. To add on-demand support for more 'policy' options, e.g. 'streamed' or 'on_demand',
-    re-define the 'policy' option as follows::
+    """
 
     policy = serializers.ChoiceField(
         help_text="The policy to use when downloading content. The possible values include: "
-                  "'immediate', 'on_demand', and 'streamed'. 'immediate' is the default.",
-        choices=models.Remote.POLICY_CHOICES,
-        default=models.Remote.IMMEDIATE
+        "'immediate', 'on_demand', and 'streamed'. 'immediate' is the default.",
+        choices=models.ChartRemote.POLICY_CHOICES,
+        default=models.ChartRemote.IMMEDIATE,
+    )
+    download_concurrency_per_host = serializers.IntegerField(
+        help_text="Number of simultaneous connections to a single host. Lowered adaptively while "
+        "the host answers with 429 or 503. Defaults to download_concurrency.",
+        required=False,
+        allow_null=True,
+        min_value=1,
     )
-    """
+
+    includes = serializers.ListField(
+        child=ChartRequirementSerializer(),
+        required=False,
+        allow_null=True,
+        help_text="The charts to sync, as name and version (or semver constraint) pairs. The "
+        "highest matching version of each chart is synced, along with the charts satisfying its "
+        "dependencies, transitively. Everything is synced if null.",
+    )
+
+    def validate_includes(self, includes):
+        """
+        Check that includes is not empty, as syncing nothing would empty a mirrored repository.
+        """
+        if includes is not None and not includes:
+            raise serializers.ValidationError(
+                "At least one chart must be included, or null to sync everything."
+            )
+        return includes
 
     class Meta:
-        fields = platform.RemoteSerializer.Meta.fields
+        fields = platform.RemoteSerializer.Meta.fields + (
+            "download_concurrency_per_host", "includes"
+        )
         model = models.ChartRemote
 
 
+class ChartFederatedSyncSerializer(serializers.Serializer):
+    """
+    A Serializer for syncing several remotes into a repository at once.
+    """
+
+    remotes = platform.DetailRelatedField(
+        many=True,
+        queryset=models.ChartRemote.objects.all(),
+        help_text="The remotes to sync, in order of priority. A chart version found in several "
+        "remotes is synced from the first of them.",
+    )
+    mirror = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="If ``True``, synchronization will remove all content that is not present in "
+        "any of the remotes. If ``False``, sync will be additive only.",
+    )
+
+    def validate_remotes(self, remotes):
+        """
+        Check that at least one remote is given, and none twice.
+        """
+        if not remotes:
+            raise serializers.ValidationError("At least one remote must be given.")
+        if len({remote.pk for remote in remotes}) != len(remotes):
+            raise serializers.ValidationError("Remotes must not be given more than once.")
+        return remotes
+
+
+class ChartCopySerializer(serializers.Serializer):
+    """
+    A Serializer for copying the charts of a repository version matching some criteria.
+    """
+
+    source_repository_version = RepositoryVersionRelatedField(
+        help_text="The repository version to copy charts from."
+    )
+    names = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        help_text="Only copy charts with any of these names.",
+    )
+    version_range = serializers.CharField(
+        required=False,
+        help_text="Only copy charts with a version matching this semver constraint, e.g. "
+        "'>=1.2 <2'.",
+    )
+    keywords = serializers.ListField(
+        child=serializers.CharField(),
+        required=False,
+        help_text="Only copy charts tagged with any of these keywords.",
+    )
+    content = platform.DetailRelatedField(
+        many=True,
+        required=False,
+        queryset=models.ChartContent.objects.all(),
+        help_text="Only copy these charts.",
+    )
+    dependencies = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Also copy the charts satisfying the dependencies of the copied charts, "
+        "transitively, so the copied charts can be installed from the destination.",
+    )
+
+    def validate_version_range(self, value):
+        """
+        Check that the version range is a valid semver constraint.
+        """
+        try:
+            semver.Constraint(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+
 class ChartRepositorySerializer(platform.RepositorySerializer):
     """
     A Serializer for ChartRepository.
@@ -86,8 +385,24 @@ class ChartRepositorySerializer(platform.RepositorySerializer):
         validators = platform.RepositorySerializer.Meta.validators + [myValidator1, myValidator2]
     """
 
+    retain_versions = serializers.IntegerField(
+        help_text="The number of versions of every chart to keep in new repository versions, the "
+        "highest releases by semver, then the highest prereleases. All versions are kept if null.",
+        required=False,
+        allow_null=True,
+        min_value=1,
+    )
+    retain_days = serializers.IntegerField(
+        help_text="The age in days after which chart versions are removed from new repository "
+        "versions, except the latest version of every chart. Versions are kept regardless of "
+        "their age if null.",
+        required=False,
+        allow_null=True,
+        min_value=1,
+    )
+
     class Meta:
-        fields = platform.RepositorySerializer.Meta.fields
+        fields = platform.RepositorySerializer.Meta.fields + ("retain_versions", "retain_days")
         model = models.ChartRepository
 
 
@@ -105,8 +420,14 @@ class ChartPublicationSerializer(platform.PublicationSerializer):
         validators = platform.PublicationSerializer.Meta.validators + [myValidator1, myValidator2]
     """
 
+    generation = serializers.IntegerField(
+        help_text="Increases with every publication of the repository, the changes since a "
+        "generation are served at <distribution base_url>/changes?since=<generation>.",
+        read_only=True,
+    )
+
     class Meta:
-        fields = platform.PublicationSerializer.Meta.fields
+        fields = platform.PublicationSerializer.Meta.fields + ("generation",)
         model = models.ChartPublication
 
 
@@ -124,6 +445,20 @@ class ChartDistributionSerializer(platform.PublicationDistributionSerializer):
         validators = platform.PublicationDistributionSerializer.Meta.validators + [myValidator1, myValidator2]
     """
 
+    remote = platform.DetailRelatedField(
+        required=False,
+        help_text="Remote to serve charts from when the distribution has no publication. Its "
+        "index is served with the chart URLs rewritten, and charts are downloaded and saved on "
+        "first request.",
+        queryset=models.ChartRemote.objects.all(),
+        allow_null=True,
+    )
+    latest_only = serializers.BooleanField(
+        required=False,
+        help_text="Serve an index of only the latest version of every chart, the highest release "
+        "or, for charts without releases, the highest prerelease.",
+    )
+
     class Meta:
-        fields = platform.PublicationDistributionSerializer.Meta.fields
+        fields = platform.PublicationDistributionSerializer.Meta.fields + ("remote", "latest_only")
         model = models.ChartDistribution
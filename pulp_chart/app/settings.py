@@ -4,3 +4,41 @@ Check `Plugin Writer's Guide`_ for more details.
 .. _Plugin Writer's Guide:
     http://docs.pulpproject.org/en/3.0/nightly/plugins/plugin-writer/index.html
 """
+
+CHART_INDEX_CACHE_SIZE = 64 * 1024 * 1024
+"""
+The number of bytes of published indexes (and their compressed variants) each content app process
+keeps in memory. Set to 0 to disable the index cache.
+"""
+
+CHART_INDEX_CACHE_DIR = None
+"""
+A directory shared by the content app processes of a host to cache published indexes in, so an
+index read from storage by one process is not read again by the others. Disabled if None.
+"""
+
+CHART_INDEX_CACHE_DIR_SIZE = 512 * 1024 * 1024
+"""
+The number of bytes of published indexes kept in ``CHART_INDEX_CACHE_DIR`` at most, the least
+recently used are removed beyond it, so the directory must not hold anything else. Unbounded if
+None.
+"""
+
+CHART_CONTENT_STATUS_PREFIX = "/pulp/chart/"
+"""The path prefix of the chart plugin's status routes in the content app."""
+
+CHART_PULL_THROUGH_INDEX_TTL = 300
+"""The number of seconds pull-through distributions serve an upstream index before refetching it."""
+
+CHART_TASK_TIMING_LOG = False
+"""Whether to log the timing spans of chart tasks as JSON lines to the ``pulp_chart.timing`` log."""
+
+CHART_METRICS_DIR = None
+"""
+A directory shared by the workers and content app processes of a host, which they add their metrics
+to, so the metrics endpoint of the content app serves those of all processes. If None, the endpoint
+only serves the metrics of the content app process answering the request.
+"""
+
+CHART_METRICS_FLUSH_INTERVAL = 10
+"""The number of seconds content app processes count metrics before adding them to the others."""
@@ -0,0 +1,91 @@
+"""
+Coalescing of identical tasks.
+
+Webhooks of upstream CI tend to request the same sync many times in a row. Every request would be
+a task reserving the repository, so they would all run one after the other, each doing the work of
+the first one again. Instead, a request for a task which is identical to one that is still
+waiting, i.e. has not started, is answered with the waiting task: its outcome is the same as that
+of the task which would have been dispatched.
+
+Tasks are identical when they run the same function with the same keyword arguments and
+reservations. The last task dispatched for every combination is recorded as a
+:class:`~pulp_chart.app.models.ChartPendingTask`.
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+from django.db import connection
+
+from pulpcore.constants import TASK_STATES
+from pulpcore.plugin.tasking import enqueue_with_reservation
+
+from pulp_chart.app.models import ChartPendingTask
+
+
+CoalescedTask = namedtuple("CoalescedTask", ["id"])
+"""A waiting task a request was coalesced into, in place of the job of a new task."""
+
+
+def coalescing_key(func, resources, kwargs):
+    """
+    Identify a task by its function, reservations and keyword arguments.
+
+    Args:
+        func (callable): The task function
+        resources (list): The resources the task reserves, as URLs or model instances
+        kwargs (dict): The keyword arguments of the task, serializable as JSON
+
+    Returns:
+        str: The hex sha256 digest identifying the task
+
+    """
+    resources = sorted(
+        resource if isinstance(resource, str) else str(resource.pk) for resource in resources
+    )
+    document = [func.__module__ + "." + func.__name__, resources, kwargs]
+    return hashlib.sha256(
+        json.dumps(document, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def enqueue_coalesced(func, resources, kwargs=None):
+    """
+    Enqueue a task with a reservation, unless an identical task is still waiting.
+
+    Requests for the same task are serialized with a Postgres advisory lock on its key, so only
+    one of many simultaneous requests dispatches it. The lock is held at session level rather than
+    within a transaction, as the task has to be committed before a worker can pick it up.
+
+    Args:
+        func (callable): The task function
+        resources (list): The resources to reserve, see
+            :func:`pulpcore.plugin.tasking.enqueue_with_reservation`
+        kwargs (dict): The keyword arguments of the task, serializable as JSON
+
+    Returns:
+        rq.job.Job or CoalescedTask: The job of the dispatched task, or the waiting task, either
+            to be passed to :class:`~pulpcore.plugin.viewsets.OperationPostponedResponse`
+
+    """
+    kwargs = kwargs or {}
+    key = coalescing_key(func, resources, kwargs)
+    lock = int.from_bytes(bytes.fromhex(key[:16]), "big", signed=True)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [lock])
+    try:
+        waiting = (
+            ChartPendingTask.objects.filter(key=key, task__state=TASK_STATES.WAITING)
+            .values_list("task", flat=True)
+            .first()
+        )
+        if waiting is not None:
+            return CoalescedTask(id=str(waiting))
+
+        result = enqueue_with_reservation(func, resources, kwargs=kwargs)
+        ChartPendingTask.objects.update_or_create(key=key, defaults={"task_id": result.id})
+        return result
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [lock])
@@ -1,3 +1,4 @@
+from .copy import copy_content  # noqa
 from .publishing import publish  # noqa
-from .synchronizing import synchronize  # noqa
+from .synchronizing import synchronize, synchronize_federated  # noqa
 from .upload import one_shot_upload  # noqa
@@ -0,0 +1,66 @@
+import logging
+from gettext import gettext as _
+
+from pulpcore.plugin.models import RepositoryVersion
+
+from pulp_chart.app import requirements, semver
+from pulp_chart.app.models import ChartContent, ChartRepository
+
+
+log = logging.getLogger(__name__)
+
+
+def copy_content(source_repository_version_pk, dest_repository_pk, criteria=None,
+                 dependencies=False):
+    """
+    Copy the charts of a repository version matching some criteria into a new repository version.
+
+    Args:
+        source_repository_version_pk (str): The repository version to copy charts from
+        dest_repository_pk (str): The repository to create a new version of
+        criteria (dict): The criteria charts have to match, see :func:`select_charts`
+        dependencies (bool): Whether to also copy the charts satisfying the dependencies of the
+            selected charts, transitively
+    """
+    source = RepositoryVersion.objects.get(pk=source_repository_version_pk)
+    destination = ChartRepository.objects.get(pk=dest_repository_pk)
+
+    available = ChartContent.objects.filter(pk__in=source.content)
+    selected = select_charts(available, **(criteria or {}))
+    if dependencies:
+        pks, missing = requirements.closure(available, selected.values_list("pk", flat=True))
+        for requirement in missing:
+            log.warning(
+                _("No chart in {source} satisfies the dependency {name} {version}").format(
+                    source=source, name=requirement.name, version=requirement.version
+                )
+            )
+        selected = ChartContent.objects.filter(pk__in=pks)
+
+    with destination.new_version() as new_version:
+        new_version.add_content(selected)
+
+
+def select_charts(queryset, names=None, version_range=None, keywords=None, content=None):
+    """
+    Filter charts by the criteria of a copy. Only given criteria apply, all of them must match.
+
+    Args:
+        queryset (django.db.models.QuerySet): The ChartContent to select from
+        names (list): Chart names, any of which the chart has
+        version_range (str): A semver constraint the version of the chart satisfies
+        keywords (list): Keywords, any of which the chart is tagged with
+        content (list): Primary keys, any of which the chart has
+
+    Returns:
+        django.db.models.QuerySet: The selected charts
+    """
+    if names:
+        queryset = queryset.filter(name__in=names)
+    if version_range:
+        queryset = queryset.filter(semver.Constraint(version_range).q("version_sort"))
+    if keywords:
+        queryset = queryset.filter(keywords__overlap=keywords)
+    if content:
+        queryset = queryset.filter(pk__in=content)
+    return queryset
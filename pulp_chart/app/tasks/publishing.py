@@ -14,6 +14,8 @@ from pulpcore.plugin.models import (
 )
 from pulpcore.plugin.tasking import WorkingDirectory
 
+from pulp_chart.app import metrics, semver
+from pulp_chart.app.instrumentation import span
 from pulp_chart.app.models import (
     ChartContent,
     ChartPublication
@@ -22,6 +24,9 @@ from pulp_chart.app.models import (
 
 log = logging.getLogger(__name__)
 
+INDEX_PATH = 'index.yaml'
+LATEST_INDEX_PATH = 'index-latest.yaml'
+
 
 def publish(repository_version_pk):
     """
@@ -37,64 +42,132 @@ def publish(repository_version_pk):
             repo=repository_version.repository.name, ver=repository_version.number,
         )
     )
-    with WorkingDirectory():
+    with WorkingDirectory(), span("publish") as published:
         with ChartPublication.create(repository_version) as publication:
+            publication.generation = ChartPublication.next_generation(
+                repository_version.repository
+            )
             publish_chart_content(publication)
+    metrics.PUBLISH_SECONDS.observe(
+        published.wall_time, repository=repository_version.repository.name
+    )
+    metrics.registry.flush()
 
     log.info(_("Publication: {publication} created").format(publication=publication.pk))
 
 
+def index_entry(content, urls):
+    """
+    Build the index entry of a chart.
+
+    Args:
+        content (ChartContent): The chart
+        urls (list): The relative paths the chart is published at
+
+    Returns:
+        dict: The entry, without any empty keys
+    """
+    entry = {
+        'apiVersion': 'v1',
+        'created': content.created.isoformat(),
+        'dependencies': content.dependencies,
+        'description': content.description,
+        'digest': content.digest,
+        'icon': content.icon,
+        'keywords': content.keywords,
+        'name': content.name,
+        'urls': urls,
+        'version': content.version
+    }
+
+    # Strip away empty keys when building metadata
+    return {k: v for k, v in entry.items() if (v is not None and v != []) }
+
+
 def publish_chart_content(publication):
     """
     Create published artifacts and metadata for a publication
 
+    Besides the index of all charts, ``index-latest.yaml`` indexes the latest version of every
+    chart, and is served as the index of distributions with ``latest_only`` set.
+
     Args:
         publication (ChartPublication): The publication to store
     """
+    with span("publish.collect") as collected:
+        entries, latest, collected.items = collect_chart_content(publication)
+
+    generated = timezone.now().isoformat()
+    with span("publish.render_index"):
+        for path, index_entries in ((INDEX_PATH, entries), (LATEST_INDEX_PATH, latest)):
+            doc = {
+                'apiVersion': 'v1',
+                'entries': index_entries,
+                'generated': generated,
+                'generation': publication.generation,
+            }
+            with open(path, 'w') as index:
+                index.write(yaml.dump(doc))
+
+    repository = publication.repository_version.repository.name
+    metrics.INDEX_BYTES.set(os.path.getsize(INDEX_PATH), repository=repository)
+    metrics.INDEX_CHARTS.set(collected.items, repository=repository)
+
+    with span("publish.save_index"):
+        for path in (INDEX_PATH, LATEST_INDEX_PATH):
+            index = PublishedMetadata.create_from_file(
+                publication=publication,
+                file=File(open(path, 'rb'))
+            )
+            index.save()
+
+
+def collect_chart_content(publication):
+    """
+    Create the published artifacts of a publication, and collect the entries of its indexes.
+
+    Args:
+        publication (ChartPublication): The publication to store
+
+    Returns:
+        tuple: The index entries by chart name, the entry of the latest version by chart name
+            (see :func:`pulp_chart.app.requirements.latest`), and the number of charts
+    """
     entries = {}
-    for content in ChartContent.objects.filter(
+    latest = {}
+    released = set()
+    published = []
+    count = 0
+    # Only the ContentArtifacts are needed, not their Artifacts, so charts synced with the
+    # on_demand or streamed policy are published without being downloaded
+    contents = ChartContent.objects.filter(
         pk__in=publication.repository_version.content
-    ).order_by('name','-created'):
+    ).order_by('name', '-version_sort', '-created').prefetch_related('contentartifact_set')
+    for content in contents:
+        count += 1
         artifacts = content.contentartifact_set.all()
         for artifact in artifacts:
-            published = PublishedArtifact(
+            published.append(PublishedArtifact(
                 relative_path=artifact.relative_path,
                 publication=publication,
                 content_artifact=artifact
-            )
-            published.save()
-
-        entry = {
-            'apiVersion': 'v1',
-            'created': content.created.isoformat(),
-            'description': content.description,
-            'digest': content.digest,
-            'icon': content.icon,
-            'keywords': content.keywords,
-            'name': content.name,
-            'urls': [artifact.relative_path for artifact in artifacts],
-            'version': content.version
-        }
+            ))
+        if len(published) >= 1000:
+            PublishedArtifact.objects.bulk_create(published)
+            published = []
 
         if content.name not in entries:
             entries[content.name] = []
-
-        # Strip away empty keys when building metadata
-        entries[content.name].append(
-            {k: v for k, v in entry.items() if (v is not None and v != []) }
-        )
-
-    doc = {
-        'apiVersion': 'v1',
-        'entries': entries,
-        'generated': timezone.now().isoformat()
-    }
-
-    with open('index.yaml', 'w') as index:
-        index.write(yaml.dump(doc))
-
-    index = PublishedMetadata.create_from_file(
-        publication=publication,
-        file=File(open('index.yaml', 'rb'))
-    )
-    index.save()
+        entry = index_entry(content, [artifact.relative_path for artifact in artifacts])
+        entries[content.name].append(entry)
+
+        # The highest release wins, the highest prerelease only if there is no release
+        if content.name not in released:
+            if content.version_sort.endswith(semver.RELEASE_MARK):
+                released.add(content.name)
+                latest[content.name] = [entry]
+            elif content.name not in latest:
+                latest[content.name] = [entry]
+
+    PublishedArtifact.objects.bulk_create(published)
+    return entries, latest, count
@@ -1,8 +1,12 @@
 from gettext import gettext as _
+import asyncio
+import json
 import logging
 from urllib.parse import urljoin
 import yaml
 
+from aiohttp.client_exceptions import ClientResponseError
+
 from pulpcore.plugin.models import Artifact, ProgressReport, Remote, Repository
 from pulpcore.plugin.stages import (
     DeclarativeArtifact,
@@ -11,7 +15,9 @@ from pulpcore.plugin.stages import (
     Stage,
 )
 
-from pulp_chart.app.models import ChartContent, ChartRemote
+from pulp_chart.app import metrics, requirements, semver
+from pulp_chart.app.instrumentation import span
+from pulp_chart.app.models import ChartContent, ChartRemote, ChartSyncState
 
 
 log = logging.getLogger(__name__)
@@ -23,6 +29,11 @@ def synchronize(remote_pk, repository_pk, mirror):
 
     Create a new version of the repository that is synchronized with the remote.
 
+    If the remote is another pulp_chart distribution and the repository is unchanged since the
+    last sync from it, only the changes since the upstream generation synced last are fetched.
+
+    If the remote has ``includes``, only the included charts and their dependencies are synced.
+
     Args:
         remote_pk (str): The remote PK.
         repository_pk (str): The repository PK.
@@ -38,10 +49,261 @@ def synchronize(remote_pk, repository_pk, mirror):
     if not remote.url:
         raise ValueError(_("A remote must have a url specified to synchronize."))
 
+    changes = None
+    state = ChartSyncState.objects.filter(repository=repository, remote=remote).first()
+    latest = repository.latest_version()
+    # The changes can't be limited to the included charts, as what is included depends on the
+    # whole index
+    if (
+        state and state.url == remote.url and latest and latest.number == state.version_number
+        and remote.includes is None
+    ):
+        loop = asyncio.get_event_loop()
+        changes = loop.run_until_complete(fetch_changes(remote, state.generation))
+
     # Interpret policy to download Artifacts or not
     deferred_download = remote.policy != Remote.IMMEDIATE
-    first_stage = ChartFirstStage(remote, deferred_download)
-    DeclarativeVersion(first_stage, repository, mirror=mirror).create()
+    first_stage = ChartFirstStage(remote, deferred_download, changes=changes)
+    with span("sync.pipeline") as pipeline:
+        if changes is None:
+            DeclarativeVersion(first_stage, repository, mirror=mirror).create()
+        else:
+            # The changes say what to remove, so the repository must not be mirrored to only the
+            # added content
+            removed = changes['removed'] if mirror else []
+            ChartDeltaVersion(first_stage, repository, removed).create()
+    metrics.SYNC_SECONDS.observe(pipeline.wall_time, repository=repository.name)
+
+    if first_stage.generation is None or remote.includes is not None:
+        ChartSyncState.objects.filter(repository=repository, remote=remote).delete()
+    else:
+        ChartSyncState.objects.update_or_create(
+            repository=repository,
+            remote=remote,
+            defaults={
+                'url': remote.url,
+                'generation': first_stage.generation,
+                'version_number': repository.latest_version().number,
+            },
+        )
+    metrics.registry.flush()
+
+
+def synchronize_federated(remote_pks, repository_pk, mirror):
+    """
+    Sync content from several remotes into one new repository version.
+
+    The indexes of all remotes are fetched concurrently. When more than one remote has a chart of
+    the same name and version, the one from the remote listed first is synced.
+
+    Args:
+        remote_pks (list): The remote PKs, in order of priority.
+        repository_pk (str): The repository PK.
+        mirror (bool): True for mirror mode, False for additive.
+
+    Raises:
+        ValueError: If a remote does not specify a URL to sync
+
+    """
+    remotes = ChartRemote.objects.in_bulk(remote_pks)
+    remotes = [remotes[pk] for pk in remote_pks]
+    repository = Repository.objects.get(pk=repository_pk)
+
+    for remote in remotes:
+        if not remote.url:
+            raise ValueError(
+                _("Remote '{name}' must have a url specified to synchronize.").format(
+                    name=remote.name
+                )
+            )
+
+    first_stage = ChartFederatedFirstStage(remotes)
+    with span("sync.pipeline") as pipeline:
+        DeclarativeVersion(first_stage, repository, mirror=mirror).create()
+    metrics.SYNC_SECONDS.observe(pipeline.wall_time, repository=repository.name)
+    metrics.registry.flush()
+
+
+def index_url(remote):
+    """
+    Return the URL of the index of a remote.
+    """
+    url = remote.url
+    if not url.endswith('/index.yaml'):
+        url += '/index.yaml'
+    return url
+
+
+async def fetch_changes(remote, since):
+    """
+    Fetch the changes of a remote pulp_chart distribution since a generation.
+
+    Args:
+        remote (ChartRemote): The remote to fetch the changes from
+        since (int): The upstream generation synced last
+
+    Returns:
+        dict: The changes, or None if the remote doesn't provide them (anymore) and the full
+            index has to be synced instead
+
+    """
+    url = urljoin(index_url(remote), 'changes?since={}'.format(since))
+    with ProgressReport(message="Downloading Changes", code="downloading.changes") as pb:
+        downloader = remote.get_downloader(url=url)
+        try:
+            with span("sync.download_changes"):
+                result = await downloader.run()
+                with open(result.path) as fp:
+                    changes = json.load(fp)
+        except ClientResponseError as e:
+            log.info(_("No changes available at {url}: {status}").format(url=url, status=e.status))
+            return None
+        except ValueError:
+            log.info(_("Invalid changes at {url}").format(url=url))
+            return None
+        pb.increment()
+
+    if not isinstance(changes, dict) or not isinstance(changes.get('generation'), int):
+        return None
+    return changes
+
+
+class ChartDeltaVersion(DeclarativeVersion):
+    """
+    A DeclarativeVersion adding the changes of an upstream pulp_chart instance.
+
+    Content that is not in the stream is kept, except the charts removed upstream.
+    """
+
+    def __init__(self, first_stage, repository, removed):
+        """
+        Create a version of a repository with the changes of an upstream instance.
+
+        Args:
+            first_stage (ChartFirstStage): The first stage, emitting the added charts
+            repository (Repository): The repository receiving the new version
+            removed (list): The name, version and digest of every chart to remove
+
+        """
+        super().__init__(first_stage, repository, mirror=False)
+        self.removed = removed
+
+    def pipeline_stages(self, new_version):
+        """
+        Add the removal of the charts removed upstream to the pipeline.
+        """
+        pipeline = super().pipeline_stages(new_version)
+        if self.removed:
+            pipeline.append(ChartRemovalStage(new_version, self.removed))
+        return pipeline
+
+
+class ChartRemovalStage(Stage):
+    """
+    A stage removing charts, given by name, version and digest, from a new repository version.
+    """
+
+    def __init__(self, new_version, removed):
+        """
+        Create a stage removing charts from a new repository version.
+
+        Args:
+            new_version (RepositoryVersion): The new repository version
+            removed (list): The name, version and digest of every chart to remove
+
+        """
+        super().__init__()
+        self.new_version = new_version
+        self.removed = removed
+
+    async def run(self):
+        """
+        Pass all content on, then remove the charts from the new version.
+        """
+        async for batch in self.batches():
+            for d_content in batch:
+                await self.put(d_content)
+
+        with ProgressReport(message="Removing Charts", code="removing.content") as pb, \
+                span("sync.remove_content") as removed:
+            removed.items = len(self.removed)
+            for i in range(0, len(self.removed), 500):
+                charts = self.removed[i:i + 500]
+                keys = {(chart['name'], chart['version'], chart['digest']) for chart in charts}
+                contents = ChartContent.objects.filter(
+                    pk__in=self.new_version.content,
+                    name__in={chart['name'] for chart in charts},
+                    version__in={chart['version'] for chart in charts},
+                ).only('name', 'version', 'digest')
+                to_remove = [
+                    content.pk for content in contents
+                    if (content.name, content.version, content.digest) in keys
+                ]
+                if to_remove:
+                    self.new_version.remove_content(ChartContent.objects.filter(pk__in=to_remove))
+                    pb.increase_by(len(to_remove))
+
+
+class ChartFederatedFirstStage(Stage):
+    """
+    The first stage of a pipeline syncing several remotes at once.
+    """
+
+    def __init__(self, remotes):
+        """
+        Create a first stage syncing remotes.
+
+        Args:
+            remotes (list): The ChartRemotes to sync, in order of priority
+
+        """
+        super().__init__()
+        self.remotes = remotes
+
+    async def fetch(self, remote, pb):
+        """
+        Download and parse the index of a remote.
+
+        Returns:
+            list: The entries of the index, see :func:`read_entries`
+        """
+        downloader = remote.get_downloader(url=index_url(remote))
+        result = await downloader.run()
+        with open(result.path) as fp:
+            doc = yaml.safe_load(fp)
+        pb.increment()
+        return included_entries(remote, list(read_entries(doc['entries'])))
+
+    async def run(self):
+        """
+        Build and emit `DeclarativeContent` from the merged indexes of all remotes.
+        """
+        with ProgressReport(message="Downloading Indexes", code="downloading.metadata") as pb:
+            pb.total = len(self.remotes)
+            pb.save()
+            with span("sync.download_indexes") as downloaded:
+                indexes = await asyncio.gather(
+                    *[self.fetch(remote, pb) for remote in self.remotes]
+                )
+                downloaded.items = sum(len(entries) for entries in indexes)
+            metrics.CHARTS_PARSED.inc(downloaded.items)
+
+        merged = {}
+        for remote, entries in zip(self.remotes, indexes):
+            for entry in entries:
+                merged.setdefault((entry['name'], entry['version']), (remote, entry))
+
+        with ProgressReport(message="Parsing Entries", code="parsing.metadata") as pb:
+            pb.total = len(merged)
+            pb.save()
+
+            with span("sync.emit_content") as emitted:
+                for remote, entry in merged.values():
+                    pb.increment()
+                    await self.put(declarative_content(
+                        entry, remote, index_url(remote), remote.policy != Remote.IMMEDIATE
+                    ))
+                emitted.items = len(merged)
 
 
 class ChartFirstStage(Stage):
@@ -49,7 +311,7 @@ class ChartFirstStage(Stage):
     The first stage of a pulp_chart sync pipeline.
     """
 
-    def __init__(self, remote, deferred_download):
+    def __init__(self, remote, deferred_download, changes=None):
         """
         The first stage of a pulp_chart sync pipeline.
 
@@ -57,11 +319,15 @@ class ChartFirstStage(Stage):
             remote (FileRemote): The remote data to be used when syncing
             deferred_download (bool): if True the downloading will not happen now. If False, it will
                 happen immediately.
+            changes (dict): The changes fetched from the remote, if only those are synced
 
         """
         super().__init__()
         self.remote = remote
         self.deferred_download = deferred_download
+        self.changes = changes
+        # The upstream generation synced, None if the remote doesn't provide one
+        self.generation = None
 
     async def run(self):
         """
@@ -72,63 +338,145 @@ class ChartFirstStage(Stage):
             out_q (asyncio.Queue): The out_q to send `DeclarativeContent` objects to
 
         """
-        remote_url = self.remote.url
-        if not remote_url.endswith('/index.yaml'):
-            remote_url += '/index.yaml'
+        remote_url = index_url(self.remote)
 
-        # TODO Skip reading generator to list?
-        index_yaml = []
-        with ProgressReport(message="Downloading Index", code="downloading.metadata") as pb:
-            downloader = self.remote.get_downloader(url=remote_url)
-            result = await downloader.run()
-            index_yaml = list(self.read_index_yaml(result.path))
-            pb.increment()
+        if self.changes is not None:
+            self.generation = self.changes['generation']
+            with span("sync.parse_changes") as parsed:
+                index_yaml = list(self.read_entries(self.changes.get('added') or {}))
+                parsed.items = len(index_yaml)
+        else:
+            with ProgressReport(message="Downloading Index", code="downloading.metadata") as pb:
+                downloader = self.remote.get_downloader(url=remote_url)
+                with span("sync.download_index"):
+                    result = await downloader.run()
+                with span("sync.parse_index") as parsed:
+                    with open(result.path) as fp:
+                        doc = yaml.safe_load(fp)
+                    generation = doc.get('generation')
+                    self.generation = generation if isinstance(generation, int) else None
+                    index_yaml = list(self.read_entries(doc['entries']))
+                    parsed.items = len(index_yaml)
+                if self.remote.includes is not None:
+                    with span("sync.resolve_includes") as resolved:
+                        index_yaml = included_entries(self.remote, index_yaml)
+                        resolved.items = len(index_yaml)
+                pb.increment()
+        metrics.CHARTS_PARSED.inc(parsed.items)
+        metrics.PARSE_SECONDS.observe(parsed.wall_time)
 
         with ProgressReport(message="Parsing Entries", code="parsing.metadata") as pb:
             pb.total = len(index_yaml)
             pb.save()
 
-            for entry in index_yaml:
-                content_entry = dict(filter(lambda e:e[0] not in ('url'), entry.items()))
+            # Emitting waits for the later stages, which download the artifacts and save the
+            # content, whenever they fall behind
+            with span("sync.emit_content") as emitted:
+                for entry in index_yaml:
+                    pb.increment()
+                    await self.put(self.declarative_content(entry, remote_url))
+                emitted.items = len(index_yaml)
 
-                unit = ChartContent(**content_entry)
-                artifact = Artifact(sha256=entry['digest'])
+    def declarative_content(self, entry, remote_url):
+        """
+        Build the `DeclarativeContent` of an entry.
 
-                da = DeclarativeArtifact(
-                    artifact,
-                    urljoin(remote_url, entry['url']),
-                    "{}-{}.tgz".format(entry['name'], entry['version']),
-                    self.remote,
-                    deferred_download=self.deferred_download,
-                )
-                dc = DeclarativeContent(content=unit, d_artifacts=[da])
-                pb.increment()
-                await self.put(dc)
+        Args:
+            entry (dict): The entry, as returned by :meth:`read_entries`
+            remote_url (str): The URL the entry's url is relative to
+
+        """
+        return declarative_content(entry, self.remote, remote_url, self.deferred_download)
 
-    def read_index_yaml(self, path):
+    def read_entries(self, entries):
         """
-        Parse the metadata for chart Content type.
+        Parse the entries of an index.
 
         Args:
-            path: Path to the metadata file
+            entries (dict): The entries of an index, lists of versions by chart name
         """
-        doc = yaml.load(open(path), loader=yaml.SafeLoader)
+        return read_entries(entries)
+
+
+def declarative_content(entry, remote, remote_url, deferred_download):
+    """
+    Build the `DeclarativeContent` of an index entry.
+
+    Args:
+        entry (dict): The entry, as returned by :func:`read_entries`
+        remote (ChartRemote): The remote to download the chart from
+        remote_url (str): The URL the entry's url is relative to
+        deferred_download (bool): Whether to defer downloading the chart
+
+    """
+    content_entry = dict(filter(lambda e: e[0] not in ('url'), entry.items()))
 
-        for name, versions in doc['entries'].items():
-            for version in versions:
-                data = {
-                    'name': version['name'],
-                    'version': version['version'],
-                    'digest': version['digest'],
+    unit = ChartContent(**content_entry)
+    artifact = Artifact(sha256=entry['digest'])
 
-                    # TODO: Handle multiple URLs better, maybe failover?
-                    'url': version['urls'][0],
+    da = DeclarativeArtifact(
+        artifact,
+        urljoin(remote_url, entry['url']),
+        "{}-{}.tgz".format(entry['name'], entry['version']),
+        remote,
+        deferred_download=deferred_download,
+    )
+    return DeclarativeContent(content=unit, d_artifacts=[da])
+
+
+def included_entries(remote, entries):
+    """
+    Reduce the entries of an index to the charts included by a remote and their dependencies.
+
+    The highest version satisfying each requirement is picked, see
+    :func:`pulp_chart.app.requirements.entry_closure`.
+
+    Args:
+        remote (ChartRemote): The remote
+        entries (list): The entries, as returned by :func:`read_entries`
+
+    Returns:
+        list: The included entries, all of them if the remote doesn't limit what is synced
+    """
+    if remote.includes is None:
+        return entries
+    roots = [
+        requirements.Requirement(name=include['name'], version=include.get('version') or '*')
+        for include in remote.includes
+    ]
+    entries, missing = requirements.entry_closure(entries, roots)
+    for requirement in missing:
+        log.warning(
+            _("No chart of {url} satisfies {name} {version}").format(
+                url=remote.url, name=requirement.name, version=requirement.version
+            )
+        )
+    return entries
+
+
+def read_entries(entries):
+    """
+    Parse the entries of an index into ChartContent fields, plus the ``url`` of the chart.
+
+    Args:
+        entries (dict): The entries of an index, lists of versions by chart name
+    """
+    for name, versions in entries.items():
+        for version in versions:
+            data = {
+                'name': version['name'],
+                'version': version['version'],
+                'version_sort': semver.sort_key(version['version']),
+                'digest': version['digest'],
 
-                    'created': version.get('created'),
-                    'app_version': version.get('appVersion'),
-                    'description': version.get('description'),
-                    'icon': version.get('icon'),
-                    'keywords': version.get('keywords', [])
-                }
-                yield data
+                # TODO: Handle multiple URLs better, maybe failover?
+                'url': version['urls'][0],
 
+                'created': version.get('created'),
+                'app_version': version.get('appVersion'),
+                'description': version.get('description'),
+                'icon': version.get('icon'),
+                'keywords': version.get('keywords', []),
+                'dependencies': requirements.read_dependencies(version.get('dependencies')),
+            }
+            yield data
@@ -1,60 +1,94 @@
-import os
 import tarfile
-import tempfile
 import yaml
 
-from pulpcore.plugin.models import Artifact, CreatedResource
+from pulpcore.plugin.models import Artifact, ContentArtifact, CreatedResource
 from rest_framework import serializers
 
+from pulp_chart.app import requirements, semver
+from pulp_chart.app.instrumentation import span
 from pulp_chart.app.models import ChartContent, ChartRepository
 
 
+def read_chart(fileobj):
+    """
+    Read the metadata of a chart tarball.
+
+    Args:
+        fileobj: The gzipped tarball, opened for reading
+
+    Returns:
+        tuple: The parsed Chart.yaml, and the dependencies of the chart from its Chart.yaml or, for
+            charts of apiVersion v1, its requirements.yaml
+
+    Raises:
+        rest_framework.serializers.ValidationError: If the tarball has no Chart.yaml, or it
+            lacks the name or version of the chart
+    """
+    with tarfile.open(fileobj=fileobj, mode='r:gz') as tarball:
+        # The metadata of a chart is at the top of its directory, not in its subcharts
+        members = {
+            m.name.split('/', 1)[1]: m for m in tarball.getmembers()
+            if m.isfile() and m.name.count('/') == 1
+        }
+        if 'Chart.yaml' not in members:
+            raise serializers.ValidationError('Unable to find Chart.yaml')
+
+        doc = yaml.safe_load(tarball.extractfile(members['Chart.yaml'])) or {}
+        if not doc.get('name') or not doc.get('version'):
+            raise serializers.ValidationError('Chart.yaml has no name or version')
+        dependencies = doc.get('dependencies')
+        if not dependencies and 'requirements.yaml' in members:
+            reqs = yaml.safe_load(tarball.extractfile(members['requirements.yaml'])) or {}
+            dependencies = reqs.get('dependencies')
+    return doc, requirements.read_dependencies(dependencies)
+
+
 def one_shot_upload(artifact_pk, filename, repository_pk=None):
     """
-    One shot upload for pulp_python
+    One shot upload for pulp_chart
     Args:
         artifact_pk: validated artifact
         filename: file name
         repository_pk: optional repository to add Content to
     """
 
-    chart={}
-    with tempfile.TemporaryDirectory() as td:
-        temp_path = os.path.join(td, filename)
+    with span("upload.read_chart"):
         artifact = Artifact.objects.get(pk=artifact_pk)
-        shutil.copy2(artifact.file.path, temp_path)
-
-        with tarfile.open(temp_path) as tarball:
-            chart_member = [m for m in tf.getmembers() if m.name.endswith('Chart.yaml') and m.name.count('/') == 1]
-            if len(chart_member) != 1:
-                 raise serializers.ValidationError('Unable to find Chart.yaml')
-
-            chart_file = tarball.extractfile(chart_member)
-            doc = yaml.load(chart_file, loader=yaml.SafeLoader)
-            chart = {
-                'name': doc['name'],
-                'version': doc['version'],
-                'digest': doc['digest'],
-
-                # TODO: Handle multiple URLs better, maybe failover?
-                'url': doc['urls'][0],
-
-                'created': doc.get('created'),
-                'app_version': doc.get('appVersion'),
-                'description': doc.get('description'),
-                'icon': doc.get('icon'),
-                'keywords': doc.get('keywords', [])
-            }
+        artifact.file.open('rb')
+        try:
+            doc, dependencies = read_chart(artifact.file)
+        finally:
+            artifact.file.close()
 
+        chart = {
+            'name': doc['name'],
+            'version': str(doc['version']),
+            'version_sort': semver.sort_key(str(doc['version'])),
+            'digest': artifact.sha256,
+            'app_version': doc.get('appVersion'),
+            'description': doc.get('description'),
+            'icon': doc.get('icon'),
+            'keywords': doc.get('keywords', []),
+            'dependencies': dependencies,
+        }
 
-    new_content = ChartContent(**chart)
-    new_content.save()
+    with span("upload.save_content"):
+        new_content = ChartContent.objects.filter(
+            name=chart['name'], version=chart['version'], digest=chart['digest']
+        ).first()
+        if new_content is None:
+            new_content = ChartContent(**chart)
+            new_content.save()
+            ContentArtifact.objects.create(
+                artifact=artifact, content=new_content, relative_path=filename
+            )
 
     if repository_pk:
-        queryset = ChartContent.objects.filter(pk=new_content.pk)
-        repository = ChartRepository.objects.get(pk=repository_pk)
-        with repository.new_version() as new_version:
-            new_version.add_content(queryset)
+        with span("upload.new_version"):
+            queryset = ChartContent.objects.filter(pk=new_content.pk)
+            repository = ChartRepository.objects.get(pk=repository_pk)
+            with repository.new_version() as new_version:
+                new_version.add_content(queryset)
 
     resource = CreatedResource(content_object=new_content)
     resource.save()
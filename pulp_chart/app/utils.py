@@ -0,0 +1,20 @@
+from rest_framework.reverse import reverse
+
+from pulpcore.app.util import get_view_name_for_model
+
+
+def get_href(model, pk):
+    """
+    Build the API href of an object from its model and primary key only.
+
+    This avoids loading (and casting) objects just to serialize a link to them.
+
+    Args:
+        model (django.db.models.Model): The model class of the object
+        pk: The primary key of the object
+
+    Returns:
+        str: The href of the object
+
+    """
+    return reverse(get_view_name_for_model(model, "detail"), kwargs={"pk": pk})
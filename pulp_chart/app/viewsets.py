@@ -5,10 +5,17 @@ Check `Plugin Writer's Guide`_ for more details.
     http://docs.pulpproject.org/en/3.0/nightly/plugins/plugin-writer/index.html
 """
 
+import hashlib
+
+from django.conf import settings
 from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django_filters import rest_framework as filters
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
 from pulpcore.app.viewsets import RemoteFilter
@@ -19,21 +26,81 @@ from pulpcore.plugin.serializers import (
     RepositorySyncURLSerializer,
 )
 from pulpcore.plugin.tasking import enqueue_with_reservation
-from pulpcore.plugin.models import ContentArtifact
+from pulpcore.plugin.models import Artifact, ContentArtifact, RepositoryVersion
 
-from . import models, serializers, tasks
+from . import models, pagination, requirements, search, semver, serializers, tasking, tasks
+from .utils import get_href
 
 
 class ChartContentFilter(core.ContentFilter):
     """
     FilterSet for ChartContent.
+
+    Every filter here is backed by an index on the chart_chartcontent table.
     """
 
+    keyword = filters.CharFilter(
+        field_name="keywords",
+        method="filter_keyword",
+        help_text="Filter charts that are tagged with this keyword",
+    )
+    keywords = core.CharInFilter(
+        field_name="keywords",
+        method="filter_keywords_all",
+        help_text="Filter charts that are tagged with all of these comma separated keywords",
+    )
+    keywords_any = core.CharInFilter(
+        field_name="keywords",
+        method="filter_keywords_any",
+        help_text="Filter charts that are tagged with any of these comma separated keywords",
+    )
+    version_range = filters.CharFilter(
+        field_name="version_sort",
+        method="filter_version_range",
+        help_text="Filter charts with a version matching a semver constraint, e.g. '>=1.2 <2'",
+    )
+
     class Meta:
         model = models.ChartContent
-        fields = [
-            # ...
-        ]
+        fields = {
+            "name": ["exact", "startswith", "in", "icontains"],
+            "version": ["exact", "in"],
+            "digest": ["exact", "in"],
+            "app_version": ["exact", "in"],
+            "description": ["icontains"],
+        }
+
+    def filter_keyword(self, queryset, name, value):
+        """
+        Filter charts containing the given keyword, using the GIN index on keywords.
+        """
+        return queryset.filter(**{"{}__contains".format(name): [value]})
+
+    def filter_keywords_all(self, queryset, name, value):
+        """
+        Filter charts containing all of the given keywords, using the GIN index on keywords.
+        """
+        return queryset.filter(**{"{}__contains".format(name): value})
+
+    def filter_keywords_any(self, queryset, name, value):
+        """
+        Filter charts containing any of the given keywords, using the GIN index on keywords.
+        """
+        return queryset.filter(**{"{}__overlap".format(name): value})
+
+    def filter_version_range(self, queryset, name, value):
+        """
+        Filter charts by a semver constraint, as range lookups on the indexed version sort key.
+        """
+        try:
+            constraint = semver.Constraint(value)
+        except ValueError as e:
+            raise ValidationError({"version_range": [str(e)]})
+        return queryset.filter(constraint.q(name))
+
+
+VERSION_FILTERS = ("repository_version", "repository_version_added", "repository_version_removed")
+"""The filters scoping a chart listing to the changes or content of a repository version."""
 
 
 class ChartContentViewSet(core.SingleArtifactContentUploadViewSet):
@@ -46,6 +113,177 @@ class ChartContentViewSet(core.SingleArtifactContentUploadViewSet):
     serializer_class = serializers.ChartContentSerializer
     filterset_class = ChartContentFilter
 
+    @property
+    def paginator(self):
+        """
+        Use keyset pagination instead of limit/offset when the client passes a ``cursor``.
+        """
+        cursor_param = pagination.ChartContentCursorPagination.cursor_query_param
+        if (
+            not hasattr(self, "_paginator")
+            and self.request is not None
+            and cursor_param in self.request.query_params
+        ):
+            self._paginator = pagination.ChartContentCursorPagination()
+        return super().paginator
+
+    def get_queryset(self):
+        """
+        Prefetch the artifacts of listed charts, unless the client excluded them.
+        """
+        queryset = super().get_queryset()
+        if self.action == "list" and self.request is not None:
+            include, exclude = serializers.requested_fields(self.request)
+            if "artifact" not in exclude and (include is None or "artifact" in include):
+                queryset = queryset.prefetch_related("_artifacts")
+        return queryset
+
+    def get_etag(self, request, *state):
+        """
+        Build a strong ETag from the state a representation is rendered from.
+
+        The ETag covers the given state, the query parameters and the response format, so it
+        changes whenever the rendered body would, without having to render it.
+        """
+        digest = hashlib.sha256()
+        params = sorted(request.query_params.lists())
+        for part in state + (params, request.accepted_renderer.format):
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return quote_etag(digest.hexdigest())
+
+    def conditional_response(self, request, etag, render):
+        """
+        Return 304 Not Modified if the client already has the representation, else render it.
+        """
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = render()
+            response["ETag"] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """
+        List charts, answering conditional requests without rendering the listing.
+
+        The ETag of a listing is keyed on the :class:`~pulp_chart.app.models.ChartContentRevision`,
+        which changes whenever a chart or the artifact of one is written, and on the repository
+        versions the listing is scoped to. The charts of a complete version never change, so a
+        listing scoped to complete versions which doesn't render the ``artifact`` field (which
+        on-demand charts get when first downloaded) is keyed on the versions alone. Listings
+        scoped to an incomplete version are rendered every time, as its content changes without
+        any chart being written.
+        """
+        versions = self.listed_versions(request)
+        if versions is None:
+            return self._list(request, *args, **kwargs)
+        state = [str(version.pk) for version in versions]
+        include, exclude = serializers.requested_fields(request)
+        renders_artifact = "artifact" not in exclude and (include is None or "artifact" in include)
+        if not versions or renders_artifact:
+            # Read before rendering, so the listing is at least as recent as the revision
+            state.append(models.ChartContentRevision.current())
+        etag = self.get_etag(request, "list", *state)
+        return self.conditional_response(
+            request, etag, lambda: self._list(request, *args, **kwargs)
+        )
+
+    def listed_versions(self, request):
+        """
+        Return the repository versions a listing is scoped to by the repository version filters.
+
+        Returns:
+            list: The complete repository versions, empty if the listing is not scoped to any
+                version, None if it is scoped to an incomplete one
+        """
+        params = request.query_params
+        hrefs = [params[param] for param in VERSION_FILTERS if params.get(param)]
+        versions = [self.get_resource(href, RepositoryVersion) for href in hrefs]
+        if not all(version.complete for version in versions):
+            return None
+        return versions
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Show a chart, answering conditional requests without rendering it.
+        """
+        instance = self.get_object()
+        artifacts = list(instance.contentartifact_set.values_list("artifact", flat=True))
+        etag = self.get_etag(request, "detail", instance.pk, artifacts)
+        return self.conditional_response(
+            request, etag, lambda: Response(self.get_serializer(instance).data)
+        )
+
+    def _list(self, request, *args, **kwargs):
+        """
+        Render the chart listing.
+
+        When only fields of the slim representation (pulp_href, name, version and digest) are
+        requested with ``fields``, charts are listed straight from a ``values()`` query.
+        """
+        include, exclude = serializers.requested_fields(request)
+        if include is None or not include <= set(serializers.ChartContentSlimSerializer.FIELDS):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *serializers.ChartContentSlimSerializer.VALUES
+        )
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializers.ChartContentSlimSerializer(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+        serializer = serializers.ChartContentSlimSerializer(queryset, many=True, context=context)
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="Look up many charts by name and version or semver constraint, "
+        "the content is limited by the same query parameters as the list endpoint.",
+        operation_summary="Look up charts",
+        request_body=serializers.ChartLookupSerializer,
+        responses={200: serializers.ChartLookupResultSerializer(many=True)},
+    )
+    @action(detail=False, methods=["post"], serializer_class=serializers.ChartLookupSerializer)
+    def lookup(self, request):
+        """
+        Resolves a list of chart requirements with a single query.
+        """
+        serializer = serializers.ChartLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        wanted = [
+            requirements.Requirement(name=chart["name"], version=chart["version"])
+            for chart in serializer.validated_data.get("charts", [])
+            + serializer.validated_data.get("dependencies", [])
+        ]
+
+        resolved = requirements.resolve(
+            self.filter_queryset(self.get_queryset()),
+            wanted,
+            fields=("contentartifact__artifact", "contentartifact__relative_path"),
+        )
+
+        results = []
+        for requirement, chart in resolved:
+            result = {
+                "name": requirement.name,
+                "version": requirement.version,
+                "resolved_version": None,
+                "content": None,
+                "artifact": None,
+                "relative_path": None,
+            }
+            if chart:
+                artifact = chart["contentartifact__artifact"]
+                result.update(
+                    resolved_version=chart["version"],
+                    content=get_href(models.ChartContent, chart["pk"]),
+                    artifact=get_href(Artifact, artifact) if artifact else None,
+                    relative_path=chart["contentartifact__relative_path"],
+                )
+            results.append(result)
+
+        return Response(serializers.ChartLookupResultSerializer(results, many=True).data)
+
     @transaction.atomic
     def create(self, request):
         """
@@ -73,6 +311,143 @@ class ChartContentViewSet(core.SingleArtifactContentUploadViewSet):
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
+class ChartResolveMixin:
+    """
+    A mixin adding a ``resolve`` action, resolving requirements and their dependencies.
+    """
+
+    def resolve_requirements(self, request, repository_version, distribution):
+        """
+        Resolve the requirements of a request against the charts of a repository version.
+
+        Args:
+            request (rest_framework.request.Request): The request, with a ChartLookupSerializer
+            repository_version (pulpcore.app.models.RepositoryVersion): The version to resolve
+                against
+            distribution (ChartDistribution): The distribution to build download URLs from, None
+                if the charts are not distributed
+
+        Returns:
+            rest_framework.response.Response: The ChartResolveResultSerializer of every requested
+                chart and, transitively, of every dependency of the resolved charts
+        """
+        serializer = serializers.ChartLookupSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        roots = [
+            requirements.Requirement(name=chart["name"], version=chart["version"])
+            for chart in serializer.validated_data.get("charts", [])
+            + serializer.validated_data.get("dependencies", [])
+        ]
+
+        base_url = None
+        if distribution is not None:
+            base_url = "/".join(
+                (
+                    settings.CONTENT_ORIGIN.strip("/"),
+                    settings.CONTENT_PATH_PREFIX.strip("/"),
+                    distribution.base_path.strip("/"),
+                    "",
+                )
+            )
+
+        resolved = requirements.resolve_all(
+            models.ChartContent.objects.filter(pk__in=repository_version.content),
+            roots,
+            fields=("digest", "contentartifact__artifact", "contentartifact__relative_path"),
+        )
+
+        results = []
+        for requirement, chart in resolved:
+            result = {
+                "name": requirement.name,
+                "version": requirement.version,
+                "resolved_version": None,
+                "content": None,
+                "artifact": None,
+                "relative_path": None,
+                "digest": None,
+                "url": None,
+                "dependency": requirement not in roots,
+            }
+            if chart:
+                artifact = chart["contentartifact__artifact"]
+                relative_path = chart["contentartifact__relative_path"]
+                result.update(
+                    resolved_version=chart["version"],
+                    content=get_href(models.ChartContent, chart["pk"]),
+                    artifact=get_href(Artifact, artifact) if artifact else None,
+                    relative_path=relative_path,
+                    digest=chart["digest"],
+                    url=base_url + relative_path if base_url and relative_path else None,
+                )
+            results.append(result)
+
+        return Response(serializers.ChartResolveResultSerializer(results, many=True).data)
+
+
+class ChartSearchMixin:
+    """
+    A mixin adding the ``search`` and ``latest`` actions, listing charts of a repository version.
+    """
+
+    def search_charts(self, request, repository_version):
+        """
+        Search the charts of a repository version, best matches first.
+
+        Args:
+            request (rest_framework.request.Request): The request, with a ChartSearchSerializer
+                as query parameters
+            repository_version (pulpcore.app.models.RepositoryVersion): The version to search
+
+        Returns:
+            rest_framework.response.Response: A page of ChartSearchResultSerializer
+        """
+        serializer = serializers.ChartSearchSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        queryset = search.search(
+            models.ChartContent.objects.filter(pk__in=repository_version.content),
+            serializer.validated_data["q"],
+        )
+        return self.list_charts(queryset, serializers.ChartSearchResultSerializer)
+
+    def latest_charts(self, request, repository_version):
+        """
+        List the latest version of every chart of a repository version, by name.
+
+        Args:
+            request (rest_framework.request.Request): The request
+            repository_version (pulpcore.app.models.RepositoryVersion): The version to list
+
+        Returns:
+            rest_framework.response.Response: A page of ChartSummarySerializer
+        """
+        recorded = models.ChartLatestVersion.objects.filter(repository_version=repository_version)
+        if recorded.exists():
+            queryset = models.ChartContent.objects.filter(
+                chart_chartlatestversion__repository_version=repository_version
+            ).order_by("chart_chartlatestversion__name")
+        else:
+            # Versions older than the latest one of their repository at the upgrade to
+            # ChartLatestVersion have nothing recorded
+            queryset = requirements.latest(
+                models.ChartContent.objects.filter(pk__in=repository_version.content)
+            )
+        return self.list_charts(queryset, serializers.ChartSummarySerializer)
+
+    def list_charts(self, queryset, serializer_class):
+        """
+        Serialize a page of charts straight from a ``values()`` query.
+        """
+        queryset = queryset.values(*serializer_class.VALUES)
+        context = self.get_serializer_context()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = serializer_class(page, many=True, context=context)
+            return self.get_paginated_response(serializer.data)
+        serializer = serializer_class(queryset, many=True, context=context)
+        return Response(serializer.data)
+
+
 class ChartRemoteFilter(RemoteFilter):
     """
     A FilterSet for ChartRemote.
@@ -107,14 +482,15 @@ class ChartRepositoryViewSet(core.RepositoryViewSet, ModifyRepositoryActionMixin
     # This decorator is necessary since a sync operation is asyncrounous and returns
     # the id and href of the sync task.
     @swagger_auto_schema(
-        operation_description="Trigger an asynchronous task to sync content.",
+        operation_description="Trigger an asynchronous task to sync content. While an identical "
+        "sync has yet to start, it is returned instead.",
         operation_summary="Sync from remote",
         responses={202: AsyncOperationResponseSerializer},
     )
     @action(detail=True, methods=["post"], serializer_class=RepositorySyncURLSerializer)
     def sync(self, request, pk):
         """
-        Dispatches a sync task.
+        Dispatches a sync task, unless an identical one is waiting, see :mod:`.tasking`.
         """
         repository = self.get_object()
         serializer = RepositorySyncURLSerializer(data=request.data, context={"request": request})
@@ -122,7 +498,7 @@ class ChartRepositoryViewSet(core.RepositoryViewSet, ModifyRepositoryActionMixin
         remote = serializer.validated_data.get("remote")
         mirror = serializer.validated_data.get('mirror')
 
-        result = enqueue_with_reservation(
+        result = tasking.enqueue_coalesced(
             tasks.synchronize,
             [repository, remote],
             kwargs={
@@ -133,8 +509,81 @@ class ChartRepositoryViewSet(core.RepositoryViewSet, ModifyRepositoryActionMixin
         )
         return core.OperationPostponedResponse(result, request)
 
+    @swagger_auto_schema(
+        operation_description="Trigger an asynchronous task to sync content from several "
+        "remotes into a single repository version. While an identical sync has yet to start, it "
+        "is returned instead.",
+        operation_summary="Sync from several remotes",
+        responses={202: AsyncOperationResponseSerializer},
+    )
+    @action(
+        detail=True, methods=["post"], serializer_class=serializers.ChartFederatedSyncSerializer
+    )
+    def federated_sync(self, request, pk):
+        """
+        Dispatches a federated sync task, unless an identical one is waiting, see :mod:`.tasking`.
+        """
+        repository = self.get_object()
+        serializer = serializers.ChartFederatedSyncSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        remotes = serializer.validated_data["remotes"]
+        mirror = serializer.validated_data["mirror"]
+
+        result = tasking.enqueue_coalesced(
+            tasks.synchronize_federated,
+            [repository] + remotes,
+            kwargs={
+                "remote_pks": [remote.pk for remote in remotes],
+                "repository_pk": repository.pk,
+                "mirror": mirror,
+            },
+        )
+        return core.OperationPostponedResponse(result, request)
+
+    @swagger_auto_schema(
+        operation_description="Trigger an asynchronous task to copy the charts of a repository "
+        "version matching some criteria into a new version of this repository.",
+        operation_summary="Copy charts",
+        responses={202: AsyncOperationResponseSerializer},
+    )
+    @action(detail=True, methods=["post"], serializer_class=serializers.ChartCopySerializer)
+    def copy(self, request, pk):
+        """
+        Dispatches a copy task.
+        """
+        repository = self.get_object()
+        serializer = serializers.ChartCopySerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        source = serializer.validated_data["source_repository_version"]
+        criteria = {
+            "names": serializer.validated_data.get("names"),
+            "version_range": serializer.validated_data.get("version_range"),
+            "keywords": serializer.validated_data.get("keywords"),
+            "content": [
+                str(content.pk) for content in serializer.validated_data.get("content", [])
+            ],
+        }
 
-class ChartRepositoryVersionViewSet(core.RepositoryVersionViewSet):
+        result = enqueue_with_reservation(
+            tasks.copy_content,
+            [source.repository, repository],
+            kwargs={
+                "source_repository_version_pk": str(source.pk),
+                "dest_repository_pk": repository.pk,
+                "criteria": criteria,
+                "dependencies": serializer.validated_data["dependencies"],
+            },
+        )
+        return core.OperationPostponedResponse(result, request)
+
+
+class ChartRepositoryVersionViewSet(
+    ChartResolveMixin, ChartSearchMixin, core.RepositoryVersionViewSet
+):
     """
     A ViewSet for a ChartRepositoryVersion represents a single
     Chart repository version.
@@ -142,6 +591,52 @@ class ChartRepositoryVersionViewSet(core.RepositoryVersionViewSet):
 
     parent_viewset = ChartRepositoryViewSet
 
+    @swagger_auto_schema(
+        operation_description="Resolve chart requirements against the charts of this "
+        "repository version, along with the dependencies of the resolved charts, transitively. "
+        "Download URLs are those of a distribution serving a publication of this version.",
+        operation_summary="Resolve chart requirements",
+        request_body=serializers.ChartLookupSerializer,
+        responses={200: serializers.ChartResolveResultSerializer(many=True)},
+    )
+    @action(detail=True, methods=["post"], serializer_class=serializers.ChartLookupSerializer)
+    def resolve(self, request, repository_pk, number):
+        """
+        Resolves chart requirements and their dependencies.
+        """
+        version = self.get_object()
+        distribution = models.ChartDistribution.objects.filter(
+            publication__repository_version=version
+        ).order_by("base_path").first()
+        return self.resolve_requirements(request, version, distribution)
+
+    @swagger_auto_schema(
+        operation_description="Search the name, keywords and description of the charts of this "
+        "repository version, best matches first.",
+        operation_summary="Search charts",
+        query_serializer=serializers.ChartSearchSerializer,
+        responses={200: serializers.ChartSearchResultSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def search(self, request, repository_pk, number):
+        """
+        Searches the charts of a repository version.
+        """
+        return self.search_charts(request, self.get_object())
+
+    @swagger_auto_schema(
+        operation_description="List the latest version of every chart of this repository "
+        "version: the highest release or, for charts without releases, the highest prerelease.",
+        operation_summary="List latest chart versions",
+        responses={200: serializers.ChartSummarySerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def latest(self, request, repository_pk, number):
+        """
+        Lists the latest version of every chart of a repository version.
+        """
+        return self.latest_charts(request, self.get_object())
+
 
 class ChartPublicationViewSet(core.PublicationViewSet):
     """
@@ -155,7 +650,8 @@ class ChartPublicationViewSet(core.PublicationViewSet):
     # This decorator is necessary since a publish operation is asyncrounous and returns
     # the id and href of the publish task.
     @swagger_auto_schema(
-        operation_description="Trigger an asynchronous task to publish content",
+        operation_description="Trigger an asynchronous task to publish content. While a publish "
+        "of the same repository version has yet to start, it is returned instead.",
         responses={202: AsyncOperationResponseSerializer},
     )
     def create(self, request):
@@ -163,13 +659,14 @@ class ChartPublicationViewSet(core.PublicationViewSet):
         Publishes a repository.
 
         Either the ``repository`` or the ``repository_version`` fields can
-        be provided but not both at the same time.
+        be provided but not both at the same time. Publishing a repository version which is
+        already waiting to be published returns the waiting task, see :mod:`.tasking`.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         repository_version = serializer.validated_data.get("repository_version")
 
-        result = enqueue_with_reservation(
+        result = tasking.enqueue_coalesced(
             tasks.publish,
             [repository_version.repository],
             kwargs={"repository_version_pk": str(repository_version.pk),},
@@ -177,7 +674,9 @@ class ChartPublicationViewSet(core.PublicationViewSet):
         return core.OperationPostponedResponse(result, request)
 
 
-class ChartDistributionViewSet(core.BaseDistributionViewSet):
+class ChartDistributionViewSet(
+    ChartResolveMixin, ChartSearchMixin, core.BaseDistributionViewSet
+):
     """
     A ViewSet for ChartDistribution.
     """
@@ -185,3 +684,54 @@ class ChartDistributionViewSet(core.BaseDistributionViewSet):
     endpoint_name = "chart"
     queryset = models.ChartDistribution.objects.all()
     serializer_class = serializers.ChartDistributionSerializer
+
+    @swagger_auto_schema(
+        operation_description="Resolve chart requirements against the charts this distribution "
+        "serves, along with the dependencies of the resolved charts, transitively.",
+        operation_summary="Resolve chart requirements",
+        request_body=serializers.ChartLookupSerializer,
+        responses={200: serializers.ChartResolveResultSerializer(many=True)},
+    )
+    @action(detail=True, methods=["post"], serializer_class=serializers.ChartLookupSerializer)
+    def resolve(self, request, pk):
+        """
+        Resolves chart requirements and their dependencies.
+        """
+        distribution = self.get_object()
+        if not distribution.publication_id:
+            raise ValidationError("The distribution does not serve a publication.")
+        version = distribution.publication.repository_version
+        return self.resolve_requirements(request, version, distribution)
+
+    @swagger_auto_schema(
+        operation_description="Search the name, keywords and description of the charts this "
+        "distribution serves, best matches first.",
+        operation_summary="Search charts",
+        query_serializer=serializers.ChartSearchSerializer,
+        responses={200: serializers.ChartSearchResultSerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def search(self, request, pk):
+        """
+        Searches the charts a distribution serves.
+        """
+        distribution = self.get_object()
+        if not distribution.publication_id:
+            raise ValidationError("The distribution does not serve a publication.")
+        return self.search_charts(request, distribution.publication.repository_version)
+
+    @swagger_auto_schema(
+        operation_description="List the latest version of every chart this distribution serves: "
+        "the highest release or, for charts without releases, the highest prerelease.",
+        operation_summary="List latest chart versions",
+        responses={200: serializers.ChartSummarySerializer(many=True)},
+    )
+    @action(detail=True, methods=["get"])
+    def latest(self, request, pk):
+        """
+        Lists the latest version of every chart a distribution serves.
+        """
+        distribution = self.get_object()
+        if not distribution.publication_id:
+            raise ValidationError("The distribution does not serve a publication.")
+        return self.latest_charts(request, distribution.publication.repository_version)
@@ -11,11 +11,7 @@ from pulp_smash.pulp3.constants import (
     BASE_CONTENT_PATH,
 )
 
-# FIXME: list any download policies supported by your plugin type here.
-# If your plugin supports all download policies, you can import this
-# from pulp_smash.pulp3.constants instead.
-# DOWNLOAD_POLICIES = ["immediate", "streamed", "on_demand"]
-DOWNLOAD_POLICIES = ["immediate"]
+DOWNLOAD_POLICIES = ["immediate", "streamed", "on_demand"]
 
 # FIXME: replace 'unit' with your own content type names, and duplicate as necessary for each type
 CHART_CONTENT_NAME = "chart.unit"
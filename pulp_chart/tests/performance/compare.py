@@ -0,0 +1,77 @@
+# coding=utf-8
+"""Compare the results of two benchmark runs.
+
+Usage::
+
+    python -m pulp_chart.tests.performance.compare before.json after.json [--threshold 0.1]
+
+Exits with 1 if any benchmark regressed by more than the threshold (10% by default).
+"""
+import argparse
+import json
+import sys
+
+METRICS = (
+    # (name, whether a higher value is better)
+    ("wall_time", False),
+    ("peak_rss_kb", False),
+    ("queries", False),
+    ("throughput", True),
+)
+
+
+def load(path):
+    """Load benchmark results, keyed by (benchmark, size)."""
+    with open(path) as fp:
+        doc = json.load(fp)
+    return {(result["benchmark"], result["size"]): result for result in doc["results"]}
+
+
+def compare(before, after, threshold):
+    """Compare two sets of loaded results.
+
+    :returns: A list of ``(benchmark, size, metric, before, after, change, regressed)`` tuples,
+        change being relative to before and None where it can't be computed.
+    """
+    rows = []
+    for key in sorted(set(before) & set(after)):
+        for metric, higher_is_better in METRICS:
+            old, new = before[key].get(metric), after[key].get(metric)
+            if not old or new is None:
+                rows.append(key + (metric, old, new, None, False))
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            rows.append(key + (metric, old, new, change, worse > threshold))
+    return rows
+
+
+def main(argv=None):
+    """Print the comparison of two benchmark runs, and exit with 1 on regressions."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    regressed = False
+    for benchmark, size, metric, old, new, change, worse in compare(
+        load(args.before), load(args.after), args.threshold
+    ):
+        regressed = regressed or worse
+        print(
+            "{:<28} {:>8} {:<12} {:>14} {:>14} {:>8}{}".format(
+                benchmark,
+                size,
+                metric,
+                "-" if old is None else "{:.6g}".format(old),
+                "-" if new is None else "{:.6g}".format(new),
+                "-" if change is None else "{:+.1%}".format(change),
+                "  REGRESSION" if worse else "",
+            )
+        )
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# coding=utf-8
+r"""Benchmarks of syncing, publishing and uploading charts.
+
+The benchmarks only run when the ``PULP_CHART_BENCHMARK`` environment variable is set, e.g.::
+
+    PULP_CHART_BENCHMARK=1 PULP_CHART_BENCHMARK_SIZES=1000,50000 \
+        django-admin test pulp_chart.tests.performance
+
+Results are written as JSON to ``PULP_CHART_BENCHMARK_OUTPUT``, and results of two runs can be
+compared with ``python -m pulp_chart.tests.performance.compare``.
+"""
+import os
+import tempfile
+from unittest import SkipTest
+
+from django.test import TestCase
+
+from pulpcore.plugin.models import Artifact
+
+from pulp_chart.app.models import ChartContent, ChartRemote, ChartRepository
+from pulp_chart.app.tasks import one_shot_upload, publish, synchronize
+from pulp_chart.tests.performance.utils import (
+    BENCHMARK_ENV,
+    Measurement,
+    as_task,
+    benchmark_sizes,
+    chart_tarball,
+    generate_repository,
+    serve_directory,
+    write_results,
+)
+
+UPLOAD_COUNT = 100
+"""The number of charts uploaded into the synced repository by the upload benchmark."""
+
+
+class ChartBenchmarkTestCase(TestCase):
+    """Benchmark sync, publish and upload against generated repositories of several sizes."""
+
+    results = []
+
+    @classmethod
+    def setUpClass(cls):
+        """Skip the benchmarks unless asked for."""
+        if not os.environ.get(BENCHMARK_ENV):
+            raise SkipTest("Set {} to run the benchmarks.".format(BENCHMARK_ENV))
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Write the results of all benchmarks."""
+        super().tearDownClass()
+        if cls.results:
+            write_results(cls.results)
+
+    def measure(self, benchmark, size, units, func, *args, **kwargs):
+        """Run func as a task, and record its measurement."""
+        with as_task(benchmark):
+            with Measurement(benchmark, size, units) as measurement:
+                func(*args, **kwargs)
+        self.results.append(measurement.as_dict())
+
+    def test_benchmarks(self):
+        """Benchmark every configured repository size."""
+        for size in benchmark_sizes():
+            with self.subTest(size=size):
+                self.benchmark_size(size)
+
+    def benchmark_size(self, size):
+        """Sync, publish and upload into a repository of size charts."""
+        path = generate_repository(size)
+        with serve_directory(path) as url:
+            for policy in (ChartRemote.IMMEDIATE, ChartRemote.ON_DEMAND):
+                remote = ChartRemote.objects.create(
+                    name="benchmark-{}-{}".format(size, policy), url=url, policy=policy
+                )
+                repository = ChartRepository.objects.create(
+                    name="benchmark-{}-{}".format(size, policy)
+                )
+                benchmark = "synchronize_{}".format(policy)
+                self.measure(benchmark, size, size, synchronize, remote.pk, repository.pk, False)
+                self.assertEqual(repository.latest_version().content.count(), size)
+
+        version = repository.latest_version()
+        self.measure("publish", size, size, publish, version.pk)
+
+        self.measure("one_shot_upload", size, UPLOAD_COUNT, self.upload, repository)
+        self.assertEqual(
+            ChartContent.objects.filter(name="benchmark-upload").count(), UPLOAD_COUNT
+        )
+        ChartContent.objects.filter(name="benchmark-upload").delete()
+
+    def upload(self, repository):
+        """Upload UPLOAD_COUNT charts into repository, one new version each."""
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(UPLOAD_COUNT):
+                filename = "benchmark-upload-0.{}.0.tgz".format(i)
+                path = os.path.join(directory, filename)
+                with open(path, "wb") as fp:
+                    fp.write(chart_tarball("benchmark-upload", "0.{}.0".format(i)))
+                artifact = Artifact.init_and_validate(path)
+                # The tarballs are the same for every size, so later sizes reuse the artifacts
+                existing = Artifact.objects.filter(sha256=artifact.sha256).first()
+                if existing is None:
+                    artifact.save()
+                else:
+                    artifact = existing
+                one_shot_upload(artifact.pk, filename, repository.pk)
@@ -0,0 +1,245 @@
+# coding=utf-8
+"""Utilities for the benchmarks of the chart plugin."""
+import hashlib
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import tarfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from types import SimpleNamespace
+from unittest import mock
+from urllib.parse import unquote, urlsplit
+
+import yaml
+from django.db import connection
+
+from pulpcore.plugin.models import Task
+
+BENCHMARK_ENV = "PULP_CHART_BENCHMARK"
+"""Benchmarks only run when this environment variable is set."""
+
+SIZES_ENV = "PULP_CHART_BENCHMARK_SIZES"
+"""A comma separated list of the numbers of charts to benchmark with."""
+
+DEFAULT_SIZES = (1000, 50000, 250000)
+
+FIXTURE_DIR_ENV = "PULP_CHART_BENCHMARK_DIR"
+"""The directory generated repositories are kept in, they are reused across runs."""
+
+OUTPUT_ENV = "PULP_CHART_BENCHMARK_OUTPUT"
+"""The file results are written to."""
+
+DEFAULT_OUTPUT = "pulp_chart-benchmark.json"
+
+VERSIONS_PER_CHART = 50
+"""The number of versions of every chart in a generated repository."""
+
+
+def benchmark_sizes():
+    """Return the numbers of charts to benchmark with."""
+    sizes = os.environ.get(SIZES_ENV)
+    if not sizes:
+        return DEFAULT_SIZES
+    return tuple(int(size) for size in sizes.split(","))
+
+
+def chart_tarball(name, version):
+    """Return a minimal chart tarball, as bytes."""
+    chart_yaml = yaml.safe_dump(
+        {
+            "apiVersion": "v1",
+            "name": name,
+            "version": version,
+            "appVersion": version,
+            "description": "Benchmark chart {} {}".format(name, version),
+        }
+    ).encode("utf-8")
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w:gz") as tarball:
+        info = tarfile.TarInfo("{}/Chart.yaml".format(name))
+        info.size = len(chart_yaml)
+        info.mtime = 0
+        tarball.addfile(info, io.BytesIO(chart_yaml))
+    return data.getvalue()
+
+
+def generate_repository(count):
+    """Generate a Helm repository of count charts, or reuse one generated before.
+
+    Charts are named ``chart-<n>`` with :data:`VERSIONS_PER_CHART` versions each.
+
+    :param count: The number of chart versions in the repository.
+    :returns: The path of the repository directory.
+    """
+    base = os.environ.get(FIXTURE_DIR_ENV) or os.path.join("/tmp", "pulp_chart_benchmark")
+    path = os.path.join(base, str(count))
+    index_path = os.path.join(path, "index.yaml")
+    if os.path.exists(index_path):
+        return path
+
+    os.makedirs(path, exist_ok=True)
+    entries = {}
+    for i in range(count):
+        name = "chart-{}".format(i // VERSIONS_PER_CHART)
+        version = "1.{}.0".format(i % VERSIONS_PER_CHART)
+        filename = "{}-{}.tgz".format(name, version)
+        data = chart_tarball(name, version)
+        with open(os.path.join(path, filename), "wb") as fp:
+            fp.write(data)
+        entries.setdefault(name, []).append(
+            {
+                "apiVersion": "v1",
+                "name": name,
+                "version": version,
+                "appVersion": version,
+                "description": "Benchmark chart {} {}".format(name, version),
+                "created": "2019-12-01T00:00:00Z",
+                "digest": hashlib.sha256(data).hexdigest(),
+                "urls": [filename],
+            }
+        )
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    with open(index_path + ".tmp", "w") as fp:
+        yaml.dump({"apiVersion": "v1", "entries": entries}, fp, Dumper=dumper)
+    os.replace(index_path + ".tmp", index_path)
+    return path
+
+
+@contextmanager
+def serve_directory(path):
+    """Serve a directory over HTTP on localhost, for as long as the context lasts.
+
+    :param path: The directory to serve.
+    :returns: The base URL of the served directory.
+    """
+    server = _Server(("127.0.0.1", 0), _Handler)
+    server.directory = path
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield "http://127.0.0.1:{}/".format(server.server_address[1])
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    def translate_path(self, path):
+        # Not relative to the CWD, which Pulp tasks change
+        path = unquote(urlsplit(path).path)
+        parts = [part for part in path.split("/") if part not in ("", ".", "..")]
+        return os.path.join(self.server.directory, *parts)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def as_task(name):
+    """Run the code of the context as if it were running in a Pulp task.
+
+    Pulp tasks find their Task, and their working directory, through the current RQ job. The
+    benchmarks call task functions directly, so a Task is created and made the current job.
+    """
+    task = Task.objects.create(name=name, state="running")
+    job = SimpleNamespace(id=str(task.pk), origin="pulp-chart-benchmark")
+    with mock.patch("pulpcore.app.models.task.get_current_job", return_value=job), mock.patch(
+        "pulpcore.tasking.services.storage.get_current_job", return_value=job
+    ):
+        yield task
+
+
+class Measurement:
+    """Measure wall time, peak RSS and database queries of the code of a context.
+
+    Peak RSS is the high-water mark of the whole process, so it only grows. It is reported
+    together with how much the code of the context grew it.
+    """
+
+    def __init__(self, benchmark, size, units):
+        """Prepare the measurement of a benchmark.
+
+        :param benchmark: The name of the benchmark.
+        :param size: The number of charts of the repository benchmarked with.
+        :param units: The number of units processed, to compute the throughput with.
+        """
+        self.benchmark = benchmark
+        self.size = size
+        self.units = units
+        self.queries = 0
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        """Start counting queries and the clock."""
+        self._wrapper = connection.execute_wrapper(self._count_query)
+        self._wrapper.__enter__()
+        self._rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Record the wall time and the peak RSS, and stop counting queries."""
+        self.wall_time = time.perf_counter() - self._start
+        self.peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.rss_growth_kb = self.peak_rss_kb - self._rss_before
+        self._wrapper.__exit__(exc_type, exc, tb)
+
+    def as_dict(self):
+        """Return the measurement as a JSON serializable dict."""
+        return {
+            "benchmark": self.benchmark,
+            "size": self.size,
+            "wall_time": self.wall_time,
+            "peak_rss_kb": self.peak_rss_kb,
+            "rss_growth_kb": self.rss_growth_kb,
+            "queries": self.queries,
+            "throughput": self.units / self.wall_time if self.wall_time else None,
+        }
+
+
+def git_commit():
+    """Return the commit of the checkout the benchmarks run from, if known."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(__file__),
+            stderr=subprocess.DEVNULL,
+        ).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(results, path=None):
+    """Write benchmark results as JSON, see :mod:`pulp_chart.tests.performance.compare`.
+
+    :param results: A list of :meth:`Measurement.as_dict` results.
+    :param path: The file to write, :data:`OUTPUT_ENV` or :data:`DEFAULT_OUTPUT` by default.
+    """
+    path = path or os.environ.get(OUTPUT_ENV) or DEFAULT_OUTPUT
+    with open(path, "w") as fp:
+        json.dump(
+            {
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "created": datetime.now(timezone.utc).isoformat(),
+                "results": results,
+            },
+            fp,
+            indent=2,
+        )
@@ -0,0 +1,112 @@
+import gzip
+import os
+import tempfile
+
+from django.test import TestCase
+
+from pulp_chart.app.cache import GZIP, IDENTITY, FilesystemCacheBackend, IndexCache
+
+
+class TestIndexCache(TestCase):
+    """Test the published index cache."""
+
+    def test_hit_and_miss(self):
+        """Test that a cached index is returned and counted."""
+        cache = IndexCache(1024)
+        self.assertIsNone(cache.get(1))
+        cache.put(1, b"entries: {}\n")
+        entry = cache.get(1)
+        self.assertEqual(entry.data, b"entries: {}\n")
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+        self.assertEqual(stats["bytes_saved"], len(b"entries: {}\n"))
+
+    def test_etags(self):
+        """Test that every variant of an index has its own ETag."""
+        entry = IndexCache(1024).put(1, b"index")
+        self.assertTrue(entry.etag.startswith('"') and entry.etag.endswith('"'))
+        self.assertEqual(entry.variant_etag(IDENTITY), entry.etag)
+        self.assertNotEqual(entry.variant_etag(GZIP), entry.etag)
+
+    def test_size_bound(self):
+        """Test that the least recently used indexes are evicted first."""
+        cache = IndexCache(10)
+        cache.put(1, b"aaaa")
+        cache.put(2, b"bbbb")
+        cache.get(1)
+        cache.put(3, b"cccc")
+        self.assertIsNotNone(cache.get(1))
+        self.assertIsNone(cache.get(2))
+        self.assertIsNotNone(cache.get(3))
+        self.assertLessEqual(cache.size, 10)
+
+    def test_too_large(self):
+        """Test that an index larger than the cache is not kept."""
+        cache = IndexCache(4)
+        cache.put(1, b"too large")
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.size, 0)
+
+    def test_compressed(self):
+        """Test that the gzip variant is built once and accounted for."""
+        cache = IndexCache(1024)
+        entry = cache.put(1, b"index" * 10)
+        compressed = cache.compressed(1, entry)
+        self.assertEqual(gzip.decompress(compressed), b"index" * 10)
+        self.assertIs(cache.compressed(1, entry), compressed)
+        self.assertEqual(cache.size, len(b"index" * 10) + len(compressed))
+
+    def test_track(self):
+        """Test that switching the publication of a distribution drops the previous one."""
+        cache = IndexCache(1024)
+        cache.put("p1", b"one")
+        cache.track("d1", "p1")
+        cache.track("d2", "p1")
+        cache.track("d1", "p2")
+        self.assertIsNotNone(cache.get("p1"))
+        cache.track("d2", "p2")
+        self.assertIsNone(cache.get("p1"))
+        self.assertEqual(cache.size, 0)
+
+    def test_filesystem_backend(self):
+        """Test that indexes are shared through the filesystem backend."""
+        with tempfile.TemporaryDirectory() as path:
+            writer = IndexCache(1024, backend=FilesystemCacheBackend(path))
+            entry = writer.put("p1", b"index")
+            writer.compressed("p1", entry)
+
+            reader = IndexCache(1024, backend=FilesystemCacheBackend(path))
+            shared = reader.get("p1")
+            self.assertEqual(shared.data, b"index")
+            self.assertEqual(shared.etag, entry.etag)
+            self.assertEqual(gzip.decompress(shared.compressed), b"index")
+
+            reader.invalidate("p1")
+            self.assertIsNone(writer.backend.get("p1", IDENTITY))
+
+    def test_filesystem_backend_too_large_for_memory(self):
+        """Test that an index only fitting in the backend is served from it."""
+        with tempfile.TemporaryDirectory() as path:
+            cache = IndexCache(100, backend=FilesystemCacheBackend(path, max_size=1000))
+            cache.put("p1", b"x" * 200)
+            self.assertEqual(cache.get("p1").data, b"x" * 200)
+            self.assertEqual(cache.size, 0)
+            self.assertEqual(cache.hits, 1)
+
+    def test_filesystem_backend_size_bound(self):
+        """Test that the least recently used files are removed beyond the size of the backend."""
+        with tempfile.TemporaryDirectory() as path:
+            backend = FilesystemCacheBackend(path, max_size=10)
+            backend.set("p1", IDENTITY, b"1234")
+            backend.set("p2", IDENTITY, b"1234")
+            os.utime(backend._path("p1", IDENTITY), (0, 0))
+            os.utime(backend._path("p2", IDENTITY), (1, 1))
+            backend.get("p1", IDENTITY)
+            backend.set("p3", IDENTITY, b"1234")
+            self.assertIsNone(backend.get("p2", IDENTITY))
+            self.assertEqual(backend.get("p1", IDENTITY), b"1234")
+            self.assertEqual(backend.get("p3", IDENTITY), b"1234")
+
+            backend.set("p4", IDENTITY, b"12345678901")
+            self.assertIsNone(backend.get("p4", IDENTITY))
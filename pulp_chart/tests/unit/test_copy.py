@@ -0,0 +1,60 @@
+from django.test import TestCase
+
+from pulp_chart.app.models import ChartContent, ChartRepository
+from pulp_chart.app.tasks.copy import copy_content
+from pulp_chart.tests.unit.utils import create_chart as chart
+
+
+class TestCopyContent(TestCase):
+    """Test the copy of charts between repositories."""
+
+    def setUp(self):
+        """Set up a source repository version and an empty destination."""
+        self.app = chart("app", "1.0.0", ("redis", "^9"), keywords=["web"])
+        self.app2 = chart("app", "2.0.0", ("redis", "^10"), keywords=["web"])
+        self.redis = chart("redis", "9.2.0", ("common", "*"), keywords=["db"])
+        self.common = chart("common", "1.0.0")
+
+        source = ChartRepository.objects.create(name="staging")
+        with source.new_version() as new_version:
+            new_version.add_content(ChartContent.objects.all())
+        self.source = source.latest_version()
+        self.destination = ChartRepository.objects.create(name="production")
+
+    def copied(self):
+        """Return the charts of the latest version of the destination."""
+        return set(
+            ChartContent.objects.filter(
+                pk__in=self.destination.latest_version().content
+            ).values_list("name", "version")
+        )
+
+    def test_criteria(self):
+        """Test that only the charts matching all criteria are copied."""
+        copy_content(
+            self.source.pk,
+            self.destination.pk,
+            criteria={"names": ["app", "redis"], "version_range": "<2", "keywords": ["web"]},
+        )
+        self.assertEqual(self.copied(), {("app", "1.0.0")})
+
+    def test_content(self):
+        """Test that charts can be picked explicitly."""
+        copy_content(
+            self.source.pk, self.destination.pk, criteria={"content": [self.redis.pk]}
+        )
+        self.assertEqual(self.copied(), {("redis", "9.2.0")})
+
+    def test_dependencies(self):
+        """Test that the dependencies of the charts are copied along, transitively."""
+        copy_content(
+            self.source.pk,
+            self.destination.pk,
+            criteria={"names": ["app"]},
+            dependencies=True,
+        )
+        # Nothing satisfies the redis ^10 dependency of app 2.0.0, which is copied nonetheless
+        self.assertEqual(
+            self.copied(),
+            {("app", "1.0.0"), ("app", "2.0.0"), ("redis", "9.2.0"), ("common", "1.0.0")},
+        )
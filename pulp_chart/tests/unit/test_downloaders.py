@@ -0,0 +1,46 @@
+import asyncio
+
+from django.test import TestCase
+
+from pulp_chart.app.downloaders import AdaptiveLimiter
+
+
+class TestAdaptiveLimiter(TestCase):
+    """Test the per host concurrency limit."""
+
+    def test_throttled(self):
+        """Test that throttling halves the limit, down to the minimum."""
+        limiter = AdaptiveLimiter(8)
+        limiter.throttled()
+        self.assertEqual(limiter.limit, 4)
+        for _ in range(5):
+            limiter.throttled()
+        self.assertEqual(limiter.limit, 1)
+
+    def test_succeeded(self):
+        """Test that a round of successful requests raises the limit by one, up to the maximum."""
+        limiter = AdaptiveLimiter(8)
+        limiter.throttled()
+        for _ in range(4):
+            limiter.succeeded()
+        self.assertEqual(int(limiter.limit), 4)
+        for _ in range(100):
+            limiter.succeeded()
+        self.assertEqual(limiter.limit, 8)
+
+    def test_concurrency(self):
+        """Test that no more requests than the limit run at once."""
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        limiter = AdaptiveLimiter(2)
+        peak = []
+
+        async def request():
+            async with limiter:
+                peak.append(limiter.active)
+                await asyncio.sleep(0)
+
+        loop.run_until_complete(asyncio.gather(*[request() for _ in range(6)]))
+        loop.close()
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(limiter.active, 0)
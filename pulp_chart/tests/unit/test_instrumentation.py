@@ -0,0 +1,37 @@
+import json
+
+from django.test import TestCase, override_settings
+
+from pulp_chart.app.instrumentation import span
+
+
+class TestSpan(TestCase):
+    """Test the timing spans of chart tasks."""
+
+    def test_measure(self):
+        """Test that a span measures its time, memory and throughput."""
+        with span("test.measure") as measured:
+            measured.items = 10
+        self.assertFalse(measured.failed)
+        self.assertGreaterEqual(measured.wall_time, 0)
+        self.assertGreaterEqual(measured.peak_rss_growth_kb, 0)
+        self.assertIn("10 items", measured.message())
+
+    def test_failed(self):
+        """Test that a span is recorded as failed when its code raises."""
+        with self.assertRaises(ValueError):
+            with span("test.failed") as failed:
+                raise ValueError()
+        self.assertTrue(failed.failed)
+        self.assertIsNotNone(failed.wall_time)
+
+    @override_settings(CHART_TASK_TIMING_LOG=True)
+    def test_log(self):
+        """Test that spans are logged as JSON when enabled."""
+        with self.assertLogs("pulp_chart.timing", level="INFO") as logs:
+            with span("test.log") as logged:
+                logged.items = 4
+        data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(data["span"], "test.log")
+        self.assertEqual(data["items"], 4)
+        self.assertIsNone(data["task"])
@@ -0,0 +1,58 @@
+import tempfile
+
+from django.test import TestCase
+
+from pulp_chart.app.metrics import Registry
+
+
+class TestRegistry(TestCase):
+    """Test the metrics registry and its exposition format."""
+
+    def test_render(self):
+        """Test that counters, gauges and histograms are exposed in the text format."""
+        registry = Registry()
+        requests = registry.counter("requests_total", "Requests.", ["status"])
+        size = registry.gauge("index_bytes", "Index size.", ["repository"])
+        duration = registry.histogram("duration_seconds", "Duration.", buckets=(1, 10))
+        requests.inc(status=200)
+        requests.inc(2, status=304)
+        size.set(1024, repository='a "quoted" name')
+        duration.observe(0.5)
+        duration.observe(5)
+
+        text = registry.render()
+        self.assertIn("# TYPE requests_total counter\n", text)
+        self.assertIn('requests_total{status="200"} 1\n', text)
+        self.assertIn('requests_total{status="304"} 2\n', text)
+        self.assertIn('index_bytes{repository="a \\"quoted\\" name"} 1024\n', text)
+        self.assertIn('duration_seconds_bucket{le="1"} 1\n', text)
+        self.assertIn('duration_seconds_bucket{le="10"} 2\n', text)
+        self.assertIn('duration_seconds_bucket{le="+Inf"} 2\n', text)
+        self.assertIn("duration_seconds_sum 5.5\n", text)
+        self.assertIn("duration_seconds_count 2\n", text)
+
+    def test_labels(self):
+        """Test that values must be given exactly the labels of their metric."""
+        counter = Registry().counter("requests_total", "Requests.", ["status"])
+        with self.assertRaises(ValueError):
+            counter.inc()
+        with self.assertRaises(ValueError):
+            counter.inc(status=200, path="/")
+
+    def test_flush(self):
+        """Test that the metrics of several processes add up in the snapshot."""
+        with tempfile.TemporaryDirectory() as path:
+            registries = [Registry(path), Registry(path)]
+            for registry in registries:
+                registry.counter("charts_total", "Charts.").inc(10)
+                registry.gauge("index_bytes", "Index size.").set(len(registries))
+                registry.histogram("duration_seconds", "Duration.", buckets=(1,)).observe(2)
+                registry.flush()
+
+            registry = registries[0]
+            self.assertEqual(registry.metrics["charts_total"].values, {})
+            registry.metrics["charts_total"].inc(1)
+            samples = registry.samples()
+            self.assertEqual(samples["charts_total"][()], 21)
+            self.assertEqual(samples["index_bytes"][()], 2)
+            self.assertEqual(samples["duration_seconds"][()], [0, 2, 4, 2])
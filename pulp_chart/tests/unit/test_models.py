@@ -1,4 +1,13 @@
-from django.test import TestCase
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from pulpcore.plugin.models import ContentArtifact
+
+from pulp_chart.app.models import ChartContent, ChartContentRevision, ChartRepository
+from pulp_chart.tests.unit.utils import create_chart
 
 
 class TestNothing(TestCase):
@@ -7,3 +16,113 @@ class TestNothing(TestCase):
     def test_nothing_at_all(self):
         """Test that the tests are running and that's it."""
         self.assertTrue(True)
+
+
+class TestRetention(TestCase):
+    """Test the retention policy of chart repositories."""
+
+    def setUp(self):
+        """Set up a repository version with releases and prereleases of several charts."""
+        now = timezone.now()
+        for name, version, age in (
+            ("nginx", "1.0.0", 90),
+            ("nginx", "1.0.1", 60),
+            ("nginx", "1.1.0", 30),
+            ("nginx", "2.0.0-rc.1", 1),
+            ("redis", "9.0.0", 90),
+            ("beta", "0.1.0-alpha.1", 90),
+            ("beta", "0.1.0-alpha.2", 60),
+        ):
+            create_chart(name, version, created=now - timedelta(days=age))
+        self.repository = ChartRepository.objects.create(name="stable")
+        with self.repository.new_version() as new_version:
+            new_version.add_content(ChartContent.objects.all())
+        self.version = self.repository.latest_version()
+
+    def expired(self):
+        """Return the charts expired from the repository version."""
+        return set(
+            self.repository.expired_content(self.version).values_list("name", "version")
+        )
+
+    def test_no_policy(self):
+        """Test that all charts are retained without a policy."""
+        self.assertIsNone(self.repository.expired_content(self.version))
+
+    def test_retain_versions(self):
+        """Test that the highest releases are retained ahead of prereleases."""
+        self.repository.retain_versions = 3
+        self.assertEqual(self.expired(), {("nginx", "2.0.0-rc.1")})
+        self.repository.retain_versions = 1
+        self.assertEqual(
+            self.expired(),
+            {
+                ("nginx", "1.0.0"),
+                ("nginx", "1.0.1"),
+                ("nginx", "2.0.0-rc.1"),
+                ("beta", "0.1.0-alpha.1"),
+            },
+        )
+
+    def test_retain_days(self):
+        """Test that old charts expire, except the latest version of every chart."""
+        self.repository.retain_days = 45
+        self.assertEqual(
+            self.expired(),
+            {("nginx", "1.0.0"), ("nginx", "1.0.1"), ("beta", "0.1.0-alpha.1")},
+        )
+        self.repository.retain_days = 75
+        self.assertEqual(self.expired(), {("nginx", "1.0.0"), ("beta", "0.1.0-alpha.1")})
+        self.repository.retain_days = 10
+        self.assertNotIn(("nginx", "1.1.0"), self.expired())
+
+    def test_both_policies(self):
+        """Test that a chart expires when it falls outside of either policy."""
+        self.repository.retain_versions = 3
+        self.repository.retain_days = 75
+        self.assertEqual(
+            self.expired(),
+            {("nginx", "1.0.0"), ("nginx", "2.0.0-rc.1"), ("beta", "0.1.0-alpha.1")},
+        )
+
+    def test_new_version(self):
+        """Test that the expired charts are removed from new repository versions."""
+        self.repository.retain_versions = 1
+        self.repository.save()
+        with self.repository.new_version() as new_version:
+            new_version.add_content(
+                ChartContent.objects.filter(pk=create_chart("redis", "9.1.0").pk)
+            )
+        self.assertEqual(
+            set(
+                ChartContent.objects.filter(
+                    pk__in=self.repository.latest_version().content
+                ).values_list("name", "version")
+            ),
+            {("nginx", "1.1.0"), ("redis", "9.1.0"), ("beta", "0.1.0-alpha.2")},
+        )
+
+
+class TestChartContentRevision(TransactionTestCase):
+    """Test the revision of chart content, counted by triggers when transactions commit."""
+
+    def test_written_charts(self):
+        """Test that every transaction writing charts or their artifacts counts once."""
+        revision = ChartContentRevision.current()
+        with transaction.atomic():
+            chart = create_chart("nginx", "1.0.0")
+            create_chart("nginx", "1.1.0")
+        self.assertEqual(ChartContentRevision.current(), revision + 1)
+
+        ContentArtifact.objects.create(content=chart, relative_path="nginx-1.0.0.tgz")
+        self.assertEqual(ChartContentRevision.current(), revision + 2)
+
+        ChartContent.objects.filter(pk=chart.pk).delete()
+        self.assertEqual(ChartContentRevision.current(), revision + 3)
+
+    def test_read_only(self):
+        """Test that reading charts doesn't count."""
+        create_chart("nginx", "1.0.0")
+        revision = ChartContentRevision.current()
+        list(ChartContent.objects.all())
+        self.assertEqual(ChartContentRevision.current(), revision)
@@ -0,0 +1,47 @@
+import uuid
+from types import SimpleNamespace
+
+from django.test import TestCase
+from rest_framework.exceptions import NotFound
+
+from pulp_chart.app.pagination import ChartContentCursorPagination
+
+
+def request(cursor):
+    """Build a stand-in request with a cursor."""
+    return SimpleNamespace(query_params={"cursor": cursor})
+
+
+class TestDecodeCursor(TestCase):
+    """Test ChartContentCursorPagination.decode_cursor."""
+
+    def setUp(self):
+        """Set up a paginator."""
+        self.paginator = ChartContentCursorPagination()
+
+    def test_round_trip(self):
+        """A cursor decodes to the position it was encoded from."""
+        position = ["nginx", "000000000001z", str(uuid.uuid4())]
+        cursor = self.paginator.encode_cursor(position)
+        self.assertEqual(self.paginator.decode_cursor(request(cursor)), position)
+
+    def test_first_page(self):
+        """An empty cursor requests the first page."""
+        self.assertIsNone(self.paginator.decode_cursor(request("")))
+
+    def test_garbage(self):
+        """A cursor which isn't encoded JSON is rejected."""
+        with self.assertRaises(NotFound):
+            self.paginator.decode_cursor(request("not a cursor"))
+
+    def test_invalid_pk(self):
+        """A cursor whose pk isn't a UUID is rejected before reaching the database."""
+        cursor = self.paginator.encode_cursor(["nginx", "000000000001z", "1; DROP TABLE"])
+        with self.assertRaises(NotFound):
+            self.paginator.decode_cursor(request(cursor))
+
+    def test_invalid_types(self):
+        """A cursor with values other than strings is rejected."""
+        cursor = self.paginator.encode_cursor(["nginx", 1, str(uuid.uuid4())])
+        with self.assertRaises(NotFound):
+            self.paginator.decode_cursor(request(cursor))
@@ -0,0 +1,54 @@
+import asyncio
+
+from django.test import TestCase
+
+from pulp_chart.app.pull_through import PullThroughCache
+
+
+class TestCoalesce(TestCase):
+    """Test PullThroughCache._coalesce."""
+
+    def setUp(self):
+        """Set up a cache and a download counting its calls."""
+        self.cache = PullThroughCache()
+        self.calls = 0
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        """Close the event loop."""
+        self.loop.close()
+
+    async def download(self, result):
+        """A stand-in download, taking a moment."""
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return result
+
+    def test_shared(self):
+        """Concurrent identical calls share a single download."""
+        async def run():
+            return await asyncio.gather(
+                self.cache._coalesce("key", self.download("chart")),
+                self.cache._coalesce("key", self.download("chart")),
+            )
+
+        self.assertEqual(self.loop.run_until_complete(run()), ["chart", "chart"])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache._pending, {})
+
+    def test_first_requester_cancelled(self):
+        """The download goes on for the other requests when the one that started it is cancelled."""
+        async def run():
+            first = asyncio.ensure_future(self.cache._coalesce("key", self.download("chart")))
+            await asyncio.sleep(0)
+            second = asyncio.ensure_future(self.cache._coalesce("key", self.download("chart")))
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)
+            self.assertIn("key", self.cache._pending)
+            third = asyncio.ensure_future(self.cache._coalesce("key", self.download("chart")))
+            return await asyncio.gather(second, third)
+
+        self.assertEqual(self.loop.run_until_complete(run()), ["chart", "chart"])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.cache._pending, {})
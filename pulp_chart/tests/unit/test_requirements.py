@@ -0,0 +1,138 @@
+from django.test import TestCase
+
+from pulp_chart.app import semver
+from pulp_chart.app.models import ChartContent
+from pulp_chart.app.requirements import (
+    Requirement,
+    closure,
+    dependency_requirements,
+    entry_closure,
+    read_dependencies,
+    select,
+)
+from pulp_chart.tests.unit.utils import create_chart as chart
+
+
+def candidate(name, version):
+    """Build a candidate chart as returned by a values() query."""
+    return {"name": name, "version": version, "version_sort": semver.sort_key(version)}
+
+
+class TestSelect(TestCase):
+    """Test requirements.select."""
+
+    def setUp(self):
+        """Set up candidates ordered by descending version."""
+        self.candidates = [
+            candidate("nginx", "2.0.0"),
+            candidate("nginx", "1.5.0-rc.1"),
+            candidate("nginx", "1.4.2"),
+            candidate("nginx", "1.4"),
+            candidate("redis", "9.0.0"),
+        ]
+
+    def test_exact_version(self):
+        """Test that an exact version string match wins over semver resolution."""
+        chart = select(Requirement("nginx", "1.4"), self.candidates)
+        self.assertEqual(chart["version"], "1.4")
+
+    def test_constraint(self):
+        """Test that the highest release satisfying a constraint is selected."""
+        chart = select(Requirement("nginx", "~1.4"), self.candidates)
+        self.assertEqual(chart["version"], "1.4.2")
+        chart = select(Requirement("nginx", "*"), self.candidates)
+        self.assertEqual(chart["version"], "2.0.0")
+
+    def test_unsatisfied(self):
+        """Test that None is returned when nothing satisfies the requirement."""
+        self.assertIsNone(select(Requirement("nginx", ">=3"), self.candidates))
+        self.assertIsNone(select(Requirement("nginx", "latest"), self.candidates))
+        self.assertIsNone(select(Requirement("mysql", "*"), self.candidates))
+
+
+class TestDependencies(TestCase):
+    """Test the normalization of chart dependencies."""
+
+    def test_read_dependencies(self):
+        """Test that dependencies are reduced to name, version and repository."""
+        dependencies = read_dependencies(
+            [
+                {"name": "redis", "version": "~9.1", "repository": "@stable", "alias": "cache"},
+                {"name": "common"},
+                {"version": "1.0.0"},
+                "not a dependency",
+            ]
+        )
+        self.assertEqual(
+            dependencies,
+            [
+                {"name": "redis", "version": "~9.1", "repository": "@stable"},
+                {"name": "common", "version": "*", "repository": None},
+            ],
+        )
+        self.assertEqual(read_dependencies(None), [])
+
+    def test_dependency_requirements(self):
+        """Test that dependencies are turned into requirements."""
+        self.assertEqual(
+            dependency_requirements([{"name": "redis", "version": "~9.1", "repository": None}]),
+            [Requirement("redis", "~9.1")],
+        )
+
+
+class TestEntryClosure(TestCase):
+    """Test the resolution of included charts and their dependencies in an index."""
+
+    def entry(self, name, version, *dependencies):
+        """Build an index entry depending on (name, version) pairs."""
+        entry = candidate(name, version)
+        entry["dependencies"] = [{"name": n, "version": v} for n, v in dependencies]
+        return entry
+
+    def test_closure(self):
+        """Test that the highest matching versions and their dependencies are picked."""
+        entries = [
+            self.entry("app", "1.0.0", ("redis", "^9"), ("common", "*")),
+            self.entry("app", "2.0.0", ("redis", "^10")),
+            self.entry("redis", "9.0.0", ("common", "~1.1")),
+            self.entry("redis", "9.2.0", ("common", "~1.1")),
+            self.entry("redis", "10.0.0"),
+            self.entry("common", "1.1.3"),
+            self.entry("common", "1.2.0"),
+            self.entry("unrelated", "1.0.0"),
+        ]
+        picked, missing = entry_closure(
+            entries, [Requirement("app", "<2"), Requirement("missing", "*")]
+        )
+        self.assertEqual(
+            [(entry["name"], entry["version"]) for entry in picked],
+            [("app", "1.0.0"), ("redis", "9.2.0"), ("common", "1.1.3"), ("common", "1.2.0")],
+        )
+        self.assertEqual(missing, [Requirement("missing", "*")])
+
+
+class TestClosure(TestCase):
+    """Test the resolution of the dependencies of stored charts."""
+
+    def test_closure(self):
+        """Test that the dependencies are added transitively and the missing ones reported."""
+        app = chart("app", "1.0.0", ("redis", "^9"), ("missing", "*"))
+        redis = chart("redis", "9.2.0", ("common", "~1.1"))
+        chart("redis", "9.0.0", ("common", "~1.1"))
+        common = chart("common", "1.1.3")
+        chart("common", "1.2.0")
+        chart("unrelated", "1.0.0")
+
+        pks, missing = closure(ChartContent.objects.all(), [app.pk])
+        self.assertEqual(pks, {app.pk, redis.pk, common.pk})
+        self.assertEqual(missing, [Requirement("missing", "*")])
+
+    def test_closure_within_queryset(self):
+        """Test that dependencies are only picked from the given charts."""
+        app = chart("app", "1.0.0", ("redis", "^9"))
+        redis = chart("redis", "9.0.0")
+        newer = chart("redis", "9.2.0")
+
+        pks, missing = closure(ChartContent.objects.exclude(pk=newer.pk), [app.pk])
+        self.assertEqual(pks, {app.pk, redis.pk})
+        self.assertEqual(missing, [])
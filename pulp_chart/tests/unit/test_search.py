@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from pulp_chart.app.search import MAX_TERMS, terms, tsquery
+
+
+class TestTerms(TestCase):
+    """Test search.terms."""
+
+    def test_split(self):
+        """Words are split on anything but letters and digits, and lowercased."""
+        self.assertEqual(terms("NGINX-ingress, controller"), ["nginx", "ingress", "controller"])
+
+    def test_underscores(self):
+        """Underscores separate words, as they do in search vectors."""
+        self.assertEqual(terms("my_chart"), ["my", "chart"])
+
+    def test_distinct(self):
+        """Repeated words are only kept once, in the order they first appear."""
+        self.assertEqual(terms("redis cache redis"), ["redis", "cache"])
+
+    def test_limit(self):
+        """Words beyond MAX_TERMS are ignored."""
+        words = ["word{}".format(i) for i in range(MAX_TERMS + 5)]
+        self.assertEqual(terms(" ".join(words)), words[:MAX_TERMS])
+
+    def test_empty(self):
+        """A search without words has no terms."""
+        self.assertEqual(terms(" -!& "), [])
+
+
+class TestTsquery(TestCase):
+    """Test search.tsquery."""
+
+    def test_prefixes(self):
+        """Every term has to match as a prefix."""
+        self.assertEqual(tsquery("postgres operator"), "postgres:* & operator:*")
+
+    def test_operators(self):
+        """Operators of tsquery in the search are separators, not operators."""
+        self.assertEqual(tsquery("a|b & !c:*'d'"), "a:* & b:* & c:* & d:*")
+
+    def test_empty(self):
+        """A search without words makes an empty query."""
+        self.assertEqual(tsquery("()"), "")
@@ -0,0 +1,92 @@
+from django.test import TestCase
+
+from pulp_chart.app import semver
+
+
+class TestSortKey(TestCase):
+    """Test semver.sort_key."""
+
+    def assertOrdered(self, versions):
+        """Assert that the sort keys of versions are in ascending order."""
+        keys = [semver.sort_key(v) for v in versions]
+        self.assertEqual(keys, sorted(keys), versions)
+
+    def test_numeric_components(self):
+        """Test that numeric components are compared as numbers."""
+        self.assertOrdered(["1.2.3", "1.2.10", "1.10.0", "2.0.0", "10.0.0"])
+
+    def test_prerelease_precedence(self):
+        """Test the prerelease precedence example from the SemVer 2 specification."""
+        self.assertOrdered([
+            "1.0.0-alpha",
+            "1.0.0-alpha.1",
+            "1.0.0-alpha.beta",
+            "1.0.0-beta",
+            "1.0.0-beta.2",
+            "1.0.0-beta.11",
+            "1.0.0-rc.1",
+            "1.0.0",
+        ])
+
+    def test_prefix_identifier(self):
+        """Test that an identifier sorts before identifiers it is a prefix of."""
+        self.assertOrdered(["1.0.0-alpha.1", "1.0.0-alphab"])
+
+    def test_build_metadata_ignored(self):
+        """Test that build metadata does not take part in precedence."""
+        self.assertEqual(semver.sort_key("1.0.0+build.1"), semver.sort_key("1.0.0+build.2"))
+
+    def test_lenient_versions(self):
+        """Test that a 'v' prefix and missing components are accepted."""
+        self.assertEqual(semver.sort_key("v1.2"), semver.sort_key("1.2.0"))
+
+    def test_invalid_version(self):
+        """Test that an unparsable version sorts before any release."""
+        self.assertOrdered(["not-a-version", "0.0.1"])
+
+
+class TestConstraint(TestCase):
+    """Test semver.Constraint."""
+
+    def assertMatches(self, constraint, matching, not_matching):
+        """Assert which versions do and do not satisfy a constraint."""
+        parsed = semver.Constraint(constraint)
+        for version in matching:
+            self.assertTrue(parsed.match(version), "{} {}".format(constraint, version))
+        for version in not_matching:
+            self.assertFalse(parsed.match(version), "{} {}".format(constraint, version))
+
+    def test_comparisons(self):
+        """Test a range built from comparison operators."""
+        self.assertMatches(">=1.2.0 <2.0.0", ["1.2.0", "1.9.9"], ["1.1.9", "2.0.0"])
+        self.assertMatches(">= 1.2, < 1.5", ["1.2.0", "1.4.9"], ["1.5.0"])
+        self.assertMatches("!=1.2.3", ["1.2.4"], ["1.2.3"])
+
+    def test_caret_and_tilde(self):
+        """Test the caret and tilde range operators."""
+        self.assertMatches("^1.2", ["1.2.0", "1.9.0"], ["1.1.0", "2.0.0"])
+        self.assertMatches("^0.2.3", ["0.2.3", "0.2.9"], ["0.3.0"])
+        self.assertMatches("~1.2.3", ["1.2.3", "1.2.9"], ["1.3.0"])
+
+    def test_wildcards(self):
+        """Test wildcard and partial versions."""
+        self.assertMatches("1.2.x", ["1.2.0", "1.2.99"], ["1.1.0", "1.3.0"])
+        self.assertMatches(">1.2", ["1.3.0"], ["1.2.9"])
+        self.assertMatches("<=1.2", ["1.2.9"], ["1.3.0"])
+        self.assertMatches("*", ["0.0.1", "99.0.0"], [])
+
+    def test_hyphen_range_and_alternatives(self):
+        """Test hyphen ranges and alternatives separated by '||'."""
+        self.assertMatches("1.2 - 1.4.5", ["1.2.0", "1.4.5"], ["1.4.6"])
+        self.assertMatches("1.0.0 || 2.x", ["1.0.0", "2.5.0"], ["3.0.0"])
+
+    def test_prereleases(self):
+        """Test that prereleases only match constraints that mention a prerelease."""
+        self.assertMatches("<2.0.0", [], ["2.0.0-alpha", "1.0.0-rc.1"])
+        self.assertMatches(">=1.0.0-0", ["1.0.0-rc.1"], ["0.9.0"])
+
+    def test_invalid_constraint(self):
+        """Test that invalid constraints are rejected."""
+        for constraint in ("", "foo", ">=", "1.2a"):
+            with self.assertRaises(ValueError):
+                semver.Constraint(constraint)
@@ -1,7 +1,7 @@
 import unittest
 from django.test import TestCase
 
-from pulp_chart.app.serializers import ChartContentSerializer
+from pulp_chart.app.serializers import ChartContentSerializer, ChartRemoteSerializer
 from pulp_chart.app.models import ChartContent
 
 from pulpcore.plugin.models import Artifact
@@ -38,3 +38,23 @@ class TestChartContentSerializer(TestCase):
         data = {"_artifact": "/pulp/api/v3/artifacts/{}/".format(self.artifact.pk)}
         serializer = ChartContentSerializer(data=data)
         self.assertFalse(serializer.is_valid())
+
+
+class TestChartRemoteSerializer(TestCase):
+    """Test ChartRemoteSerializer."""
+
+    def data(self, includes):
+        """Build the data of a remote with includes."""
+        return {"name": "stable", "url": "https://charts.example.com/", "includes": includes}
+
+    def test_includes(self):
+        """Test that null and non-empty includes are accepted."""
+        for includes in (None, [{"name": "nginx", "version": "~1.4"}]):
+            serializer = ChartRemoteSerializer(data=self.data(includes))
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_empty_includes(self):
+        """Test that empty includes, which would sync nothing, are rejected."""
+        serializer = ChartRemoteSerializer(data=self.data([]))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("includes", serializer.errors)
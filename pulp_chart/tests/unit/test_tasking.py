@@ -0,0 +1,130 @@
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase
+
+from pulpcore.constants import TASK_STATES
+from pulpcore.plugin.models import Task
+
+from pulp_chart.app.models import ChartPendingTask
+from pulp_chart.app.tasking import CoalescedTask, coalescing_key, enqueue_coalesced
+
+
+def sync(remote_pk, repository_pk, mirror):
+    """A stand-in task function."""
+
+
+def publish(repository_version_pk):
+    """Another stand-in task function."""
+
+
+class TestCoalescingKey(TestCase):
+    """Test tasking.coalescing_key."""
+
+    def setUp(self):
+        """Set up a repository and a remote."""
+        self.repository = SimpleNamespace(pk=uuid.uuid4())
+        self.remote = SimpleNamespace(pk=uuid.uuid4())
+        self.kwargs = {
+            "remote_pk": self.remote.pk,
+            "repository_pk": self.repository.pk,
+            "mirror": False,
+        }
+
+    def test_identical(self):
+        """Identical tasks have the same key, regardless of the order of arguments."""
+        reordered = dict(reversed(list(self.kwargs.items())))
+        self.assertEqual(
+            coalescing_key(sync, [self.repository, self.remote], self.kwargs),
+            coalescing_key(sync, [self.remote, self.repository], reordered),
+        )
+
+    def test_resource_urls(self):
+        """Resources given as URLs are part of the key."""
+        self.assertNotEqual(
+            coalescing_key(sync, ["/a/"], self.kwargs), coalescing_key(sync, ["/b/"], self.kwargs)
+        )
+
+    def test_arguments(self):
+        """Tasks with different arguments have different keys."""
+        mirrored = dict(self.kwargs, mirror=True)
+        self.assertNotEqual(
+            coalescing_key(sync, [self.repository, self.remote], self.kwargs),
+            coalescing_key(sync, [self.repository, self.remote], mirrored),
+        )
+
+    def test_function(self):
+        """Tasks of different functions have different keys."""
+        kwargs = {"repository_version_pk": str(uuid.uuid4())}
+        self.assertNotEqual(
+            coalescing_key(sync, [self.repository], kwargs),
+            coalescing_key(publish, [self.repository], kwargs),
+        )
+
+
+@mock.patch("pulp_chart.app.tasking.enqueue_with_reservation")
+class TestEnqueueCoalesced(TestCase):
+    """Test tasking.enqueue_coalesced."""
+
+    def setUp(self):
+        """Set up the arguments of a sync task."""
+        self.resources = ["/pulp/api/v3/repositories/chart/chart/{}/".format(uuid.uuid4())]
+        self.kwargs = {"remote_pk": str(uuid.uuid4()), "mirror": False}
+
+    def dispatch(self, enqueue_with_reservation):
+        """Dispatch a sync task, the enqueued task being created as waiting."""
+        task = Task.objects.create(name="sync", state=TASK_STATES.WAITING)
+        enqueue_with_reservation.return_value = SimpleNamespace(id=str(task.pk))
+        return task, enqueue_coalesced(sync, self.resources, self.kwargs)
+
+    def test_enqueue(self, enqueue_with_reservation):
+        """Test that the first request enqueues the task and records it."""
+        task, result = self.dispatch(enqueue_with_reservation)
+
+        enqueue_with_reservation.assert_called_once_with(sync, self.resources, kwargs=self.kwargs)
+        self.assertEqual(result.id, str(task.pk))
+        self.assertEqual(
+            ChartPendingTask.objects.get(
+                key=coalescing_key(sync, self.resources, self.kwargs)
+            ).task_id,
+            task.pk,
+        )
+
+    def test_waiting(self, enqueue_with_reservation):
+        """Test that a request for a task which is still waiting returns that task."""
+        task, _ = self.dispatch(enqueue_with_reservation)
+        enqueue_with_reservation.reset_mock()
+
+        result = enqueue_coalesced(sync, self.resources, dict(reversed(list(self.kwargs.items()))))
+
+        enqueue_with_reservation.assert_not_called()
+        self.assertEqual(result, CoalescedTask(id=str(task.pk)))
+
+    def test_different_task(self, enqueue_with_reservation):
+        """Test that a request for another task is not coalesced into a waiting one."""
+        self.dispatch(enqueue_with_reservation)
+        self.kwargs["mirror"] = True
+        task, result = self.dispatch(enqueue_with_reservation)
+
+        self.assertEqual(enqueue_with_reservation.call_count, 2)
+        self.assertEqual(result.id, str(task.pk))
+
+    def test_started(self, enqueue_with_reservation):
+        """Test that a task is enqueued again once the recorded one has started or finished."""
+        for state in (TASK_STATES.RUNNING, TASK_STATES.COMPLETED, TASK_STATES.FAILED):
+            with self.subTest(state=state):
+                self.kwargs["remote_pk"] = str(uuid.uuid4())
+                previous, _ = self.dispatch(enqueue_with_reservation)
+                Task.objects.filter(pk=previous.pk).update(state=state)
+
+                task, result = self.dispatch(enqueue_with_reservation)
+
+                self.assertNotEqual(task.pk, previous.pk)
+                self.assertEqual(result.id, str(task.pk))
+                self.assertEqual(
+                    ChartPendingTask.objects.get(
+                        key=coalescing_key(sync, self.resources, self.kwargs)
+                    ).task_id,
+                    task.pk,
+                )
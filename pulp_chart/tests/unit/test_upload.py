@@ -0,0 +1,61 @@
+import io
+import tarfile
+
+import yaml
+from django.test import TestCase
+from rest_framework import serializers
+
+from pulp_chart.app.tasks.upload import read_chart
+
+
+def tarball(files):
+    """Build a gzipped chart tarball of the given file names and contents."""
+    data = io.BytesIO()
+    with tarfile.open(fileobj=data, mode="w:gz") as tar:
+        for name, content in files.items():
+            encoded = content.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(encoded)
+            tar.addfile(info, io.BytesIO(encoded))
+    data.seek(0)
+    return data
+
+
+class TestReadChart(TestCase):
+    """Test upload.read_chart."""
+
+    def test_chart_yaml(self):
+        """The metadata and dependencies are read from the top level Chart.yaml."""
+        chart = {
+            "apiVersion": "v2",
+            "name": "web",
+            "version": "1.2.3",
+            "dependencies": [{"name": "redis", "version": "^9", "repository": "https://x"}],
+        }
+        doc, dependencies = read_chart(tarball({
+            "web/Chart.yaml": yaml.dump(chart),
+            "web/charts/redis/Chart.yaml": yaml.dump({"name": "redis", "version": "9.0.0"}),
+        }))
+        self.assertEqual(doc["name"], "web")
+        self.assertEqual(doc["version"], "1.2.3")
+        self.assertEqual(
+            dependencies, [{"name": "redis", "version": "^9", "repository": "https://x"}]
+        )
+
+    def test_requirements_yaml(self):
+        """The dependencies of v1 charts are read from requirements.yaml."""
+        _, dependencies = read_chart(tarball({
+            "web/Chart.yaml": yaml.dump({"name": "web", "version": "1.0.0"}),
+            "web/requirements.yaml": yaml.dump({"dependencies": [{"name": "redis"}]}),
+        }))
+        self.assertEqual(dependencies, [{"name": "redis", "version": "*", "repository": None}])
+
+    def test_missing_chart_yaml(self):
+        """A tarball without a top level Chart.yaml is rejected."""
+        with self.assertRaises(serializers.ValidationError):
+            read_chart(tarball({"web/charts/redis/Chart.yaml": "name: redis\nversion: 1.0.0\n"}))
+
+    def test_missing_version(self):
+        """A Chart.yaml without a version is rejected."""
+        with self.assertRaises(serializers.ValidationError):
+            read_chart(tarball({"web/Chart.yaml": "name: web\n"}))
@@ -0,0 +1,15 @@
+"""Utilities for unit tests for the chart plugin."""
+import hashlib
+
+from pulp_chart.app.models import ChartContent
+
+
+def create_chart(name, version, *dependencies, **fields):
+    """Create a chart depending on (name, version) pairs, with any other fields given."""
+    return ChartContent.objects.create(
+        name=name,
+        version=version,
+        digest=hashlib.sha256("{}-{}".format(name, version).encode()).hexdigest(),
+        dependencies=[{"name": n, "version": v, "repository": None} for n, v in dependencies],
+        **fields
+    )
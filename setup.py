@@ -2,7 +2,7 @@
 
 from setuptools import find_packages, setup
 
-requirements = ["pulpcore>=3.0.0rc7"]
+requirements = ["pulpcore>=3.0.0"]
 
 setup(
     name="pulp-chart",